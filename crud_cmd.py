@@ -1,7 +1,10 @@
 import os
+import asyncio
 import subprocess
 import platform
 import glob
+import fnmatch
+import re
 import socket
 import time
 import datetime
@@ -10,6 +13,9 @@ import json
 import psutil
 import signal
 import sys
+import shutil
+import queue
+import threading
 from pathlib import Path
 
 # Global variable to track current subprocess
@@ -19,43 +25,506 @@ def is_windows():
     """Check if the current operating system is Windows"""
     return platform.system().lower() == 'windows'
 
-def list_directory(directory='.', include_hidden=False):
+# Output formats accepted by functions that can return structured rows
+RESULT_FORMATS = ('text', 'json', 'csv')
+
+class _Record:
+    """
+    Base for compact result rows. Subclasses name their fields in __slots__, so a row carries
+    no per-instance dictionary and callers can sort, filter and page rows before rendering.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for field, value in zip(self.__slots__, values, strict=True):
+            setattr(self, field, value)
+
+    def __iter__(self):
+        return (getattr(self, field) for field in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and tuple(self) == tuple(other)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{field}={getattr(self, field)!r}' for field in self.__slots__)})"
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+class FileEntry(_Record):
+    """One directory listing row; size is None for directories, modified is a Unix timestamp"""
+    __slots__ = ('name', 'type', 'size', 'modified')
+
+class ProcessEntry(_Record):
+    """One running process"""
+    __slots__ = ('pid', 'name', 'user', 'status', 'memory_percent')
+
+class PortEntry(_Record):
+    """One scan result; state is 'open', or 'unresolved' (with port None) for unknown hosts"""
+    __slots__ = ('host', 'port', 'state', 'service')
+
+class ConnectivityEntry(_Record):
+    """One connectivity check; latency_ms is None and error names the failure class if it failed"""
+    __slots__ = ('host', 'port', 'address', 'latency_ms', 'error')
+
+class HTTPResult(_Record):
+    """Status, timing, connection reuse, cache status and headers of one HTTP response"""
+    __slots__ = ('url', 'status_code', 'elapsed', 'reused', 'cache', 'headers')
+
+def render_records(records, record_type, format='text', text_row=None):
+    """
+    Render result rows at the output edge.
+    Args:
+        records: Iterable of rows of record_type
+        record_type: Row class, whose __slots__ give the JSON keys and CSV columns
+        format: 'text', 'json' or 'csv' (default: text)
+        text_row: Function formatting one row as a line of text (default: the values joined by spaces)
+    Returns:
+        Rendered rows
+    """
+    if format not in RESULT_FORMATS:
+        return f"Error: Invalid format '{format}'. Use one of: {', '.join(RESULT_FORMATS)}"
+    if format == 'json':
+        return json.dumps([record.as_dict() for record in records], indent=2, default=str)
+    if format == 'csv':
+        import csv
+        import io
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerow(record_type.__slots__)
+        writer.writerows([json.dumps(value) if isinstance(value, (dict, list)) else value for value in record]
+                         for record in records)
+        return buffer.getvalue().rstrip('\n')
+    text_row = text_row or (lambda record: " ".join("" if value is None else str(value) for value in record))
+    return "\n".join(map(text_row, records))
+
+# Per-user directory for persistent caches (text indexes, file catalogs)
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".terminal_agent")
+
+def _cache_file(kind, root):
+    """Return the cache file path holding data of the given kind for a root directory"""
+    import hashlib
+    digest = hashlib.sha1(root.encode('utf-8', errors='surrogatepass')).hexdigest()
+    return os.path.join(CACHE_DIR, kind, f"{digest}.pickle")
+
+def _load_cache(kind, root, version):
+    """Return the cached state dictionary for a root, or None if missing, unreadable or outdated"""
+    import pickle
+    try:
+        with open(_cache_file(kind, root), 'rb') as f:
+            state = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    # Plain containers only, so cache files do not depend on how this module was imported
+    if isinstance(state, dict) and state.get('version') == version and state.get('root') == root:
+        return state
+    return None
+
+def _save_cache(kind, root, version, state):
+    """Atomically write a state dictionary to the cache for a root"""
+    import pickle
+    target = _cache_file(kind, root)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temp = f"{target}.{os.getpid()}.tmp"
+    with open(temp, 'wb') as f:
+        pickle.dump(dict(state, version=version, root=root), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp, target)
+
+# Directory listings whose mtime is this close to the scan time are re-read next time,
+# since changes made within the same timestamp tick would not alter the mtime
+CATALOG_MTIME_SLACK_NS = 2 * 10**9
+
+class _FileCatalog:
+    """
+    Cached listing of a directory tree. Each directory stores its mtime, subdirectory names
+    and (name, size, mtime_ns) file rows; a directory is only re-listed when its mtime changes.
+    File sizes and mtimes are therefore as of the last time their directory was listed.
+    """
+
+    VERSION = 1
+
+    def __init__(self, root):
+        self.root = root
+        self.dirs = {}  # relative dir ('.' for root) -> (mtime_ns, scanned_ns, subdirs, files)
+
+    @classmethod
+    def load(cls, root):
+        catalog = cls(root)
+        state = _load_cache("catalog", root, cls.VERSION)
+        if state is not None:
+            catalog.dirs = state['dirs']
+        return catalog
+
+    def save(self):
+        _save_cache("catalog", self.root, self.VERSION, {'dirs': self.dirs})
+
+    def _list(self, rel_dir, dir_mtime_ns):
+        subdirs = []
+        files = []
+        with os.scandir(os.path.join(self.root, rel_dir)) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        # Our own cache directory changes on every save; never catalog it.
+                        # At the root the path reads "<root>/./...", so compare normalized paths
+                        if os.path.normpath(entry.path) != os.path.normpath(CACHE_DIR):
+                            subdirs.append(entry.name)
+                    else:
+                        stat = entry.stat()
+                        files.append((entry.name, stat.st_size, stat.st_mtime_ns))
+                except OSError:
+                    continue
+        subdirs.sort()
+        files.sort()
+        return (dir_mtime_ns, time.time_ns(), tuple(subdirs), tuple(files))
+
+    def refresh(self, start='.', recursive=True):
+        """
+        Revalidate the subtree below start (relative to the root), one stat per directory,
+        or only start itself when recursive is False.
+        Returns:
+            Number of directories that had to be re-listed
+        """
+        relisted = 0
+        live = set()
+        pending = [start]
+        while pending:
+            rel_dir = pending.pop()
+            try:
+                mtime_ns = os.stat(os.path.join(self.root, rel_dir)).st_mtime_ns
+            except OSError:
+                continue
+            cached = self.dirs.get(rel_dir)
+            if cached is None or cached[0] != mtime_ns or cached[1] - mtime_ns < CATALOG_MTIME_SLACK_NS:
+                try:
+                    cached = self.dirs[rel_dir] = self._list(rel_dir, mtime_ns)
+                except OSError:
+                    continue
+                relisted += 1
+            live.add(rel_dir)
+            if recursive:
+                pending.extend(os.path.normpath(os.path.join(rel_dir, name)) for name in reversed(cached[2]))
+
+        # Forget directories under start that no longer exist
+        if recursive:
+            prefix = '' if start == '.' else start + os.sep
+            stale = [d for d in self.dirs if d not in live and (start == '.' or d == start or d.startswith(prefix))]
+        else:
+            stale = [start] if start not in live and start in self.dirs else []
+        for rel_dir in stale:
+            del self.dirs[rel_dir]
+        return relisted + len(stale)
+
+    def walk(self, start='.', recursive=True, include_hidden=True):
+        """Yield (relative dir, subdirs, files) from the cache in depth-first listing order"""
+        pending = [start]
+        while pending:
+            rel_dir = pending.pop()
+            cached = self.dirs.get(rel_dir)
+            if cached is None:
+                continue
+            subdirs = cached[2] if include_hidden else tuple(d for d in cached[2] if not d.startswith('.'))
+            yield rel_dir, subdirs, cached[3]
+            if recursive:
+                pending.extend(os.path.normpath(os.path.join(rel_dir, name)) for name in reversed(subdirs))
+
+# Catalogs loaded in this session, keyed by absolute root directory
+_file_catalogs = {}
+_catalog_lock = threading.Lock()
+
+def _catalog_for(directory, recursive=True):
+    """
+    Return (catalog, start) covering a directory, refreshed below start (or only start itself
+    when recursive is False). An already loaded catalog of an ancestor directory is reused
+    instead of building a new one.
+    """
+    target = os.path.abspath(directory)
+    with _catalog_lock:
+        catalog = _file_catalogs.get(target)
+        if catalog is None:
+            for root, candidate in _file_catalogs.items():
+                if target.startswith(root.rstrip(os.sep) + os.sep):
+                    catalog = candidate
+                    break
+        if catalog is None:
+            catalog = _file_catalogs[target] = _FileCatalog.load(target)
+        start = os.path.relpath(target, catalog.root)
+        if catalog.refresh(start, recursive):
+            catalog.save()
+        return catalog, start
+
+def refresh_file_catalog(directory='.'):
+    """
+    Build or revalidate the cached filename catalog used by find and tree.
+    Args:
+        directory: Directory tree to catalog (default: current directory)
+    Returns:
+        Catalog statistics or error message
+    """
+    if not os.path.isdir(directory):
+        return f"Error: Directory '{directory}' does not exist"
+    try:
+        start_time = time.perf_counter()
+        catalog, start = _catalog_for(directory)
+        dirs = files = total_size = 0
+        for _, _, rows in catalog.walk(start):
+            dirs += 1
+            files += len(rows)
+            total_size += sum(row[1] for row in rows)
+        elapsed = time.perf_counter() - start_time
+        return (f"Catalog for {os.path.abspath(directory)}\n"
+                f"Directories: {dirs}\n"
+                f"Files: {files} ({total_size} bytes)\n"
+                f"Revalidated in {elapsed:.2f} seconds")
+    except Exception as e:
+        return f"Error building file catalog: {str(e)}"
+
+# Sort keys accepted by list_directory
+LIST_SORT_KEYS = ('name', 'size', 'mtime', 'type')
+
+def _iter_dir_entries(directory, include_hidden):
+    """Yield DirEntry objects, skipping hidden files on Windows unless include_hidden is set"""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            # On Windows the attributes come with the directory listing, so this costs no syscall
+            if not include_hidden and is_windows():
+                try:
+                    if entry.is_file() and entry.stat().st_file_attributes & 2:
+                        continue
+                except OSError:
+                    pass
+            yield entry
+
+def _entry_stat(entry):
+    """Stat a DirEntry once (cached by scandir), falling back to the link itself if it is broken"""
+    try:
+        return entry.stat()
+    except OSError:
+        return entry.stat(follow_symlinks=False)
+
+def _file_entry(name, st):
+    """Build a FileEntry row from a name and its stat result"""
+    import stat as stat_module
+    if stat_module.S_ISDIR(st.st_mode):
+        return FileEntry(name, 'directory', None, st.st_mtime)
+    return FileEntry(name, 'file', st.st_size, st.st_mtime)
+
+def _format_dir_row(entry):
+    """Format one list_directory text row from a FileEntry"""
+    item_type = "Directory" if entry.type == 'directory' else "File"
+    size = "<DIR>" if entry.size is None else entry.size
+    modified = datetime.datetime.fromtimestamp(entry.modified).strftime('%Y-%m-%d %H:%M:%S')
+    return f"{entry.name:<30} {item_type:<10} {size:<10} {modified}"
+
+def _directory_page(directory, include_hidden, sort_by, reverse, limit, offset):
+    """Read one page of a directory listing. Returns (FileEntry rows, whether more entries follow)."""
+    import heapq
+    import itertools
+
+    entries = _iter_dir_entries(directory, include_hidden)
+    page_end = offset + limit if limit is not None else None
+
+    if sort_by is None:
+        # Directory order: stop reading as soon as the page is complete
+        page = list(itertools.islice(entries, offset, page_end))
+        has_more = limit is not None and next(entries, None) is not None
+        rows = [(entry.name, _entry_stat(entry)) for entry in page]
+    else:
+        if sort_by == 'name':
+            # Names need no stat, so only the returned page is stat'ed
+            items = [(entry.name, entry) for entry in entries]
+            key = lambda item: item[0]
+        else:
+            items = [(entry.name, _entry_stat(entry)) for entry in entries]
+            if sort_by == 'size':
+                key = lambda item: item[1].st_size
+            elif sort_by == 'mtime':
+                key = lambda item: item[1].st_mtime
+            else:
+                import stat as stat_module
+                key = lambda item: (not stat_module.S_ISDIR(item[1].st_mode), item[0])
+        if page_end is not None and page_end < len(items):
+            # Only the first offset+limit entries are needed, not a full sort
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            items_sorted = select(page_end, items, key=key)
+        else:
+            items_sorted = sorted(items, key=key, reverse=reverse)
+        has_more = page_end is not None and page_end < len(items)
+        rows = [(name, value if isinstance(value, os.stat_result) else _entry_stat(value))
+                for name, value in items_sorted[offset:page_end]]
+    return [_file_entry(name, st) for name, st in rows], has_more
+
+def get_directory_entries(directory='.', include_hidden=False, sort_by=None, reverse=False, limit=None, offset=0):
+    """
+    Read a directory as structured rows.
+    Args:
+        directory: Directory path to list (default: current directory)
+        include_hidden: Whether to include hidden files (default: False)
+        sort_by: Optional sort key: name, size, mtime or type (default: directory order)
+        reverse: Whether to reverse the sort order (default: False)
+        limit: Optional maximum number of entries to return (one page)
+        offset: Number of entries to skip before the page starts (default: 0)
+    Returns:
+        List of FileEntry rows
+    Raises:
+        FileNotFoundError if the directory does not exist, ValueError for an invalid sort key
+    """
+    if not os.path.exists(directory):
+        raise FileNotFoundError(f"Directory '{directory}' does not exist")
+    if sort_by is not None and sort_by not in LIST_SORT_KEYS:
+        raise ValueError(f"Invalid sort key '{sort_by}'. Use one of: {', '.join(LIST_SORT_KEYS)}")
+    return _directory_page(directory, include_hidden, sort_by, reverse, limit, max(0, int(offset or 0)))[0]
+
+def list_directory(directory='.', include_hidden=False, sort_by=None, reverse=False, limit=None, offset=0, format='text'):
     """
     List all files and directories in the specified directory.
     Args:
         directory: Directory path to list (default: current directory)
         include_hidden: Whether to include hidden files (default: False)
+        sort_by: Optional sort key: name, size, mtime or type (default: directory order)
+        reverse: Whether to reverse the sort order (default: False)
+        limit: Optional maximum number of entries to return (one page)
+        offset: Number of entries to skip before the page starts (default: 0)
+        format: 'text', 'json' or 'csv' (default: text)
     Returns:
         List of files and directories
     """
     if not os.path.exists(directory):
         return f"Error: Directory '{directory}' does not exist"
+    if sort_by is not None and sort_by not in LIST_SORT_KEYS:
+        return f"Error: Invalid sort key '{sort_by}'. Use one of: {', '.join(LIST_SORT_KEYS)}"
     
     try:
-        items = os.listdir(directory)
-        if not include_hidden and is_windows():
-            # Filter out hidden files in Windows
-            items = [item for item in items if not os.path.isfile(os.path.join(directory, item)) 
-                    or not bool(os.stat(os.path.join(directory, item)).st_file_attributes & 2)]
-        
-        result = []
-        for item in items:
-            full_path = os.path.join(directory, item)
-            item_type = "Directory" if os.path.isdir(full_path) else "File"
-            size = os.path.getsize(full_path) if os.path.isfile(full_path) else "<DIR>"
-            modified = datetime.datetime.fromtimestamp(os.path.getmtime(full_path)).strftime('%Y-%m-%d %H:%M:%S')
-            result.append(f"{item:<30} {item_type:<10} {size:<10} {modified}")
-            
+        offset = max(0, int(offset or 0))
+        rows, has_more = _directory_page(directory, include_hidden, sort_by, reverse, limit, offset)
+        if format != 'text':
+            return render_records(rows, FileEntry, format)
+
+        result = [_format_dir_row(entry) for entry in rows]
+        if limit is not None:
+            shown = f"{offset + 1}-{offset + len(rows)}" if rows else "none"
+            more = f" (more available: offset={offset + len(rows)})" if has_more else ""
+            result.append(f"\nShowing entries {shown}{more}")
         return "\n".join(result)
     except Exception as e:
         return f"Error listing directory: {str(e)}"
 
-def list_subdirectories(directory='.', recursive=False):
+def list_directory_stream(directory='.', include_hidden=False):
+    """
+    List a directory, yielding each row as soon as its entry is read.
+    Args:
+        directory: Directory path to list (default: current directory)
+        include_hidden: Whether to include hidden files (default: False)
+    Yields:
+        One formatted row per file or directory, in directory order
+    """
+    if not os.path.exists(directory):
+        yield f"Error: Directory '{directory}' does not exist"
+        return
+
+    try:
+        for entry in _iter_dir_entries(directory, include_hidden):
+            try:
+                yield _format_dir_row(_file_entry(entry.name, _entry_stat(entry)))
+            except OSError:
+                continue
+    except Exception as e:
+        yield f"Error listing directory: {str(e)}"
+
+def _format_size(num_bytes):
+    """Format a byte count for display (e.g. 1.5 MB)"""
+    size = float(num_bytes)
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if abs(size) < 1024 or unit == 'TB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+def _list_dir_for_walk(path, exclude, follow_symlinks):
+    """
+    List one directory for the tree walker.
+    Returns:
+        (subdirs, file_count, total_size) where subdirs is a list of (path, (st_dev, st_ino) or None)
+    """
+    subdirs = []
+    file_count = 0
+    total_size = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if exclude and any(fnmatch.fnmatch(entry.name, pattern) for pattern in exclude):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    # Identity is only needed to break symlink loops
+                    key = None
+                    if follow_symlinks:
+                        st = entry.stat()
+                        key = (st.st_dev, st.st_ino)
+                    subdirs.append((entry.path, key))
+                else:
+                    file_count += 1
+                    total_size += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+    subdirs.sort()
+    return subdirs, file_count, total_size
+
+def walk_tree_stream(directory='.', max_depth=None, exclude=None, follow_symlinks=False, max_workers=None):
+    """
+    Walk a directory tree, listing directories in parallel on a thread pool.
+    Args:
+        directory: Root directory to walk (default: current directory)
+        max_depth: Optional deepest level to list; the root is level 0 (default: unlimited)
+        exclude: Optional list of glob patterns; matching files and directories are skipped
+        follow_symlinks: Whether to descend into symlinked directories (loops are detected)
+        max_workers: Number of listing threads (default: based on CPU count)
+    Yields:
+        (path, depth, subdirectory paths, file count, total file size) per directory, as each
+        listing completes; directories that cannot be read are skipped
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    exclude = list(exclude or [])
+    workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+    visited = set()
+    if follow_symlinks:
+        st = os.stat(directory)
+        visited.add((st.st_dev, st.st_ino))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(_list_dir_for_walk, directory, exclude, follow_symlinks): (directory, 0)}
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, depth = pending.pop(future)
+                    try:
+                        subdirs, file_count, total_size = future.result()
+                    except OSError:
+                        continue
+                    yield path, depth, [sub for sub, _ in subdirs], file_count, total_size
+                    if max_depth is not None and depth >= max_depth:
+                        continue
+                    for sub, key in subdirs:
+                        if key is not None:
+                            if key in visited:
+                                continue
+                            visited.add(key)
+                        pending[executor.submit(_list_dir_for_walk, sub, exclude, follow_symlinks)] = (sub, depth + 1)
+        finally:
+            # Consumer stopped early: drop listings that have not started yet
+            for future in pending:
+                future.cancel()
+
+def list_subdirectories(directory='.', recursive=False, max_depth=None, exclude=None, follow_symlinks=False):
     """
     List all subdirectories in the specified directory.
     Args:
         directory: Directory path to list subdirectories from (default: current directory)
         recursive: Whether to recursively list subdirectories (default: False)
+        max_depth: Optional number of levels to list when recursive (default: unlimited)
+        exclude: Optional list of glob patterns of names to skip when recursive
+        follow_symlinks: Whether to descend into symlinked directories when recursive (default: False)
     Returns:
         List of subdirectories
     """
@@ -63,11 +532,17 @@ def list_subdirectories(directory='.', recursive=False):
         return f"Error: Directory '{directory}' does not exist"
     
     try:
-        if recursive:
+        if recursive and (max_depth is not None or exclude or follow_symlinks):
+            subdirs = sorted(list_subdirectories_stream(directory, max_depth, exclude, follow_symlinks))
+            return "\n".join(subdirs) if subdirs else "No subdirectories found"
+        elif recursive:
+            # Answer from the cached catalog; only directories whose mtime changed are re-listed
+            catalog, start = _catalog_for(directory)
             subdirs = []
-            for root, dirs, _ in os.walk(directory):
+            for rel_dir, dirs, _ in catalog.walk(start):
+                base = _catalog_display_dir(directory, rel_dir, start)
                 for d in dirs:
-                    subdirs.append(os.path.join(root, d))
+                    subdirs.append(os.path.join(base, d))
             return "\n".join(subdirs) if subdirs else "No subdirectories found"
         else:
             subdirs = [os.path.join(directory, d) for d in os.listdir(directory) 
@@ -76,9 +551,97 @@ def list_subdirectories(directory='.', recursive=False):
     except Exception as e:
         return f"Error listing subdirectories: {str(e)}"
 
+def list_subdirectories_stream(directory='.', max_depth=None, exclude=None, follow_symlinks=False):
+    """
+    Recursively list subdirectories with the parallel tree walker, yielding paths as found.
+    Args:
+        directory: Directory path to list subdirectories from (default: current directory)
+        max_depth: Optional number of levels to list (default: unlimited)
+        exclude: Optional list of glob patterns of names to skip
+        follow_symlinks: Whether to descend into symlinked directories (default: False)
+    Yields:
+        Subdirectory paths in discovery order
+    """
+    for _, depth, subdirs, _, _ in walk_tree_stream(directory, max_depth, exclude, follow_symlinks):
+        # Directories at the depth limit are listed for the walker, but their children are not shown
+        if max_depth is None or depth < max_depth:
+            yield from subdirs
+
+def summarize_tree(directory='.', max_depth=None, exclude=None, follow_symlinks=False):
+    """
+    Show a directory tree with file counts and sizes per directory and per subtree.
+    Args:
+        directory: Root directory to summarize (default: current directory)
+        max_depth: Optional number of levels to show; totals only cover the levels shown
+        exclude: Optional list of glob patterns of names to skip
+        follow_symlinks: Whether to descend into symlinked directories (default: False)
+    Returns:
+        Indented tree with own and total file counts and sizes
+    """
+    if not os.path.isdir(directory):
+        return f"Error: Directory '{directory}' does not exist"
+
+    try:
+        nodes = {}
+        for path, depth, subdirs, file_count, total_size in walk_tree_stream(directory, max_depth, exclude, follow_symlinks):
+            nodes[path] = [depth, subdirs, file_count, total_size, file_count, total_size]
+
+        # Roll subtree totals up from the deepest directories
+        for path in sorted(nodes, key=lambda p: nodes[p][0], reverse=True):
+            node = nodes[path]
+            for sub in node[1]:
+                child = nodes.get(sub)
+                if child is not None:
+                    node[4] += child[4]
+                    node[5] += child[5]
+
+        width = max(len("Directory"), max(len(os.path.basename(p) or p) + 2 * nodes[p][0] for p in nodes))
+        result = [f"{'Directory':<{width}}  {'Files':>8} {'Size':>10}  {'Total files':>11} {'Total size':>10}"]
+        result.append("-" * (width + 45))
+        pending = [directory]
+        while pending:
+            path = pending.pop()
+            node = nodes.get(path)
+            if node is None:
+                continue
+            depth, subdirs, files, size, total_files, total_bytes = node
+            label = "  " * depth + (path if depth == 0 else os.path.basename(path))
+            result.append(f"{label:<{width}}  {files:>8} {_format_size(size):>10}  {total_files:>11} {_format_size(total_bytes):>10}")
+            pending.extend(reversed(subdirs))
+        return "\n".join(result)
+    except Exception as e:
+        return f"Error summarizing directory tree: {str(e)}"
+
+def _catalog_display_dir(directory, rel_dir, start):
+    """Join a catalog directory (relative to the catalog root) onto the directory the user gave"""
+    rel = os.path.relpath(rel_dir, start)
+    return directory if rel == '.' else os.path.join(directory, rel)
+
+def _iter_find_matches(directory, pattern, recursive):
+    """
+    Yield paths of files and directories whose name matches pattern, with glob semantics:
+    hidden names only match patterns starting with '.', and recursion skips hidden directories.
+    """
+    if '/' in pattern or os.sep in pattern:
+        # Patterns spanning directories are left to glob
+        if recursive:
+            yield from glob.iglob(os.path.join(directory, '**', pattern), recursive=True)
+        else:
+            yield from glob.iglob(os.path.join(directory, pattern))
+        return
+
+    catalog, start = _catalog_for(directory, recursive)
+    match_hidden = pattern.startswith('.')
+    for rel_dir, subdirs, files in catalog.walk(start, recursive, include_hidden=False):
+        base = _catalog_display_dir(directory, rel_dir, start)
+        names = list(catalog.dirs[rel_dir][2]) + [row[0] for row in files]
+        for name in sorted(names):
+            if (match_hidden or not name.startswith('.')) and fnmatch.fnmatch(name, pattern):
+                yield os.path.join(base, name)
+
 def find_files(directory='.', pattern='*', recursive=False):
     """
-    Find files matching a pattern in the specified directory.
+    Find files matching a pattern in the specified directory, using the cached file catalog.
     Args:
         directory: Directory path to search in (default: current directory)
         pattern: File pattern to match (default: all files)
@@ -90,17 +653,35 @@ def find_files(directory='.', pattern='*', recursive=False):
         return f"Error: Directory '{directory}' does not exist"
     
     try:
-        if recursive:
-            search_path = os.path.join(directory, '**', pattern)
-            files = glob.glob(search_path, recursive=True)
-        else:
-            search_path = os.path.join(directory, pattern)
-            files = glob.glob(search_path)
-        
+        files = list(_iter_find_matches(directory, pattern, recursive))
         return "\n".join(files) if files else f"No files matching '{pattern}' found"
     except Exception as e:
         return f"Error finding files: {str(e)}"
 
+def find_files_stream(directory='.', pattern='*', recursive=False):
+    """
+    Find files matching a pattern, yielding each path as soon as it is found.
+    Args:
+        directory: Directory path to search in (default: current directory)
+        pattern: File pattern to match (default: all files)
+        recursive: Whether to search recursively (default: False)
+    Yields:
+        Matching file paths, one per line
+    """
+    if not os.path.exists(directory):
+        yield f"Error: Directory '{directory}' does not exist"
+        return
+
+    try:
+        found = False
+        for path in _iter_find_matches(directory, pattern, recursive):
+            found = True
+            yield path
+        if not found:
+            yield f"No files matching '{pattern}' found"
+    except Exception as e:
+        yield f"Error finding files: {str(e)}"
+
 def create_file(filepath, content=""):
     """
     Create a new file with optional content.
@@ -121,168 +702,2357 @@ def create_file(filepath, content=""):
     except Exception as e:
         return f"Error creating file: {str(e)}"
 
-def read_file(filepath, line_numbers=None):
+# Bytes read from the start of a file to detect its encoding
+ENCODING_SAMPLE_SIZE = 64 * 1024
+# A line-offset checkpoint is kept every LINE_INDEX_STEP lines
+LINE_INDEX_STEP = 1024
+# Number of files whose line-offset index is kept in memory
+LINE_INDEX_CACHE_SIZE = 32
+
+def _detect_encoding(sample):
+    """Guess a file's encoding once from a leading sample: BOM, then UTF-8, then latin-1"""
+    import codecs
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        # Incremental decoding tolerates a multi-byte character cut off at the end of the sample
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+class _LineIndex:
+    """Sparse map from line numbers to byte offsets: the start of every LINE_INDEX_STEP-th line"""
+
+    def __init__(self, size, mtime_ns, encoding):
+        from array import array
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.encoding = encoding
+        self.checkpoints = array('Q', [0])  # checkpoints[i] = offset of line i * LINE_INDEX_STEP (0-based)
+        self.scanned_to = 0                 # offset up to which lines have been counted
+        self.lines_scanned = 0              # complete lines seen before scanned_to
+
+    def extend(self, data, target_line):
+        """Count lines forward until the checkpoint at or before target_line (0-based) is known"""
+        import itertools
+        step = LINE_INDEX_STEP
+        while len(self.checkpoints) * step <= target_line and self.scanned_to < len(data):
+            chunk = data[self.scanned_to:self.scanned_to + 4 * 1024 * 1024]
+            parts = chunk.split(b'\n')
+            # The last part is an incomplete line: stop the chunk at the last newline
+            complete = parts[:-1] if len(parts) > 1 else []
+            if not complete:
+                if self.scanned_to + len(chunk) >= len(data):
+                    break
+                # A single line longer than the chunk: skip to its end
+                newline = data.find(b'\n', self.scanned_to)
+                if newline == -1:
+                    break
+                complete = [None]
+                ends = [newline + 1]
+            else:
+                ends = list(itertools.accumulate((len(part) + 1 for part in complete), initial=self.scanned_to))[1:]
+            for i, end in enumerate(ends):
+                line = self.lines_scanned + i + 1
+                if line % step == 0:
+                    self.checkpoints.append(end)
+            self.lines_scanned += len(ends)
+            self.scanned_to = ends[-1]
+
+    def locate(self, data, line):
+        """Return the byte offset where 0-based line starts, or -1 past the end of the file"""
+        self.extend(data, line)
+        index = min(line // LINE_INDEX_STEP, len(self.checkpoints) - 1)
+        offset = self.checkpoints[index]
+        for _ in range(line - index * LINE_INDEX_STEP):
+            newline = data.find(b'\n', offset)
+            if newline == -1:
+                return -1
+            offset = newline + 1
+        return offset if offset < len(data) else -1
+
+# Line indexes keyed by absolute path, least recently used first
+_line_indexes = {}
+_line_index_lock = threading.Lock()
+
+def _open_mapped(filepath):
     """
-    Read and return the contents of a file.
+    Memory-map a file for reading and return (mmap or b'' for empty files, line index).
+    The cached line index is reused while the file is unchanged or has only grown.
+    """
+    import mmap
+    path = os.path.abspath(filepath)
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else b''
+    with _line_index_lock:
+        index = _line_indexes.pop(path, None)
+        if index is not None and (index.size, index.mtime_ns) != (st.st_size, st.st_mtime_ns):
+            # An appended file keeps its checkpoints if the last counted line still ends where it did
+            grown = st.st_size > index.size and (index.scanned_to == 0 or data[index.scanned_to - 1:index.scanned_to] == b'\n')
+            if grown:
+                index.size, index.mtime_ns = st.st_size, st.st_mtime_ns
+            else:
+                index = None
+        if index is None:
+            index = _LineIndex(st.st_size, st.st_mtime_ns, _detect_encoding(data[:ENCODING_SAMPLE_SIZE]))
+        _line_indexes[path] = index
+        while len(_line_indexes) > LINE_INDEX_CACHE_SIZE:
+            del _line_indexes[next(iter(_line_indexes))]
+    return data, index
+
+def _read_full_text(filepath):
+    """Read a whole file as text with the encoding detected from its first block, reading it once"""
+    with open(filepath, 'rb') as f:
+        raw = f.read()
+    encoding = _detect_encoding(raw[:ENCODING_SAMPLE_SIZE])
+    try:
+        text = raw.decode(encoding)
+    except UnicodeDecodeError:
+        # Invalid UTF-8 beyond the sample: reuse the bytes already read
+        text = raw.decode('latin-1')
+    # Match text-mode reads, which translate Windows line endings
+    return text.replace('\r\n', '\n')
+
+def read_file_range(filepath, start, end):
+    """
+    Read lines start..end (1-based, inclusive) of a file without loading the whole file.
     Args:
         filepath: Path to the file
-        line_numbers: Optional tuple (start, end) to read specific lines
+        start: First line number to return
+        end: Last line number to return
     Returns:
-        File contents or error message
+        The requested lines or error message
     """
     if not os.path.exists(filepath):
         return f"Error: File '{filepath}' does not exist"
-    
+
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            if line_numbers:
-                start, end = line_numbers
-                lines = f.readlines()
-                return ''.join(lines[start-1:end])
-            else:
-                return f.read()
-    except UnicodeDecodeError:
+        start = max(1, int(start))
+        end = int(end)
+        data, index = _open_mapped(filepath)
+        if index.encoding == 'utf-16':
+            # Newlines are not single bytes in UTF-16; fall back to a decoded read
+            return ''.join(_read_full_text(filepath).splitlines(keepends=True)[start - 1:end])
         try:
-            with open(filepath, 'r', encoding='latin-1') as f:
-                if line_numbers:
-                    start, end = line_numbers
-                    lines = f.readlines()
-                    return ''.join(lines[start-1:end])
-                else:
-                    return f.read()
-        except Exception as e:
-            return f"Error reading file with latin-1 encoding: {str(e)}"
+            begin = index.locate(data, start - 1)
+            if begin == -1 or end < start:
+                return ""
+            finish = begin
+            for _ in range(end - start + 1):
+                newline = data.find(b'\n', finish)
+                if newline == -1:
+                    finish = len(data)
+                    break
+                finish = newline + 1
+            return data[begin:finish].decode(index.encoding, errors='replace').replace('\r\n', '\n')
+        finally:
+            if not isinstance(data, bytes):
+                data.close()
+    except ValueError:
+        return "Error: Line numbers must be integers"
     except Exception as e:
         return f"Error reading file: {str(e)}"
 
-def ping_host(host, count=4):
+def read_file_head(filepath, count=10):
     """
-    Ping a host to check connectivity.
+    Read the first lines of a file.
     Args:
-        host: Hostname or IP address to ping
-        count: Number of ping packets to send (default: 4)
+        filepath: Path to the file
+        count: Number of lines to return (default: 10)
     Returns:
-        Ping results
+        The first lines or error message
     """
-    try:
-        if is_windows():
-            cmd = ['ping', '-n', str(count), host]
-        else:
-            cmd = ['ping', '-c', str(count), host]
-            
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        return result.stdout
-    except Exception as e:
-        return f"Error pinging host: {str(e)}"
+    return read_file_range(filepath, 1, count)
 
-def get_network_interfaces():
+def read_file_tail(filepath, count=10):
     """
-    Get information about network interfaces.
+    Read the last lines of a file by scanning backwards from its end.
+    Args:
+        filepath: Path to the file
+        count: Number of lines to return (default: 10)
     Returns:
-        Network interface information
+        The last lines or error message
     """
+    if not os.path.exists(filepath):
+        return f"Error: File '{filepath}' does not exist"
+
     try:
-        if is_windows():
-            result = subprocess.run(['ipconfig', '/all'], capture_output=True, text=True)
-            return result.stdout
-        else:
-            result = subprocess.run(['ifconfig'], capture_output=True, text=True)
-            return result.stdout
+        count = int(count)
+        data, index = _open_mapped(filepath)
+        if index.encoding == 'utf-16':
+            return ''.join(_read_full_text(filepath).splitlines(keepends=True)[-count:] if count > 0 else [])
+        try:
+            if count <= 0 or not data:
+                return ""
+            # Ignore the newline terminating the last line
+            position = len(data) - 1 if data[-1:] == b'\n' else len(data)
+            begin = 0
+            for _ in range(count):
+                newline = data.rfind(b'\n', 0, position)
+                if newline == -1:
+                    begin = 0
+                    break
+                begin = newline + 1
+                position = newline
+            return data[begin:].decode(index.encoding, errors='replace').replace('\r\n', '\n')
+        finally:
+            if not isinstance(data, bytes):
+                data.close()
+    except ValueError:
+        return "Error: Line count must be an integer"
     except Exception as e:
-        return f"Error getting network interfaces: {str(e)}"
+        return f"Error reading file: {str(e)}"
 
-def traceroute(host):
+def read_file(filepath, line_numbers=None):
     """
-    Perform a traceroute to a host.
+    Read and return the contents of a file.
     Args:
-        host: Hostname or IP address to trace
+        filepath: Path to the file
+        line_numbers: Optional tuple (start, end) to read specific lines through the line-offset index
     Returns:
-        Traceroute results
+        File contents or error message
     """
+    if not os.path.exists(filepath):
+        return f"Error: File '{filepath}' does not exist"
+    
+    if line_numbers:
+        start, end = line_numbers
+        return read_file_range(filepath, start, end)
+
     try:
-        if is_windows():
-            cmd = ['tracert', host]
-        else:
-            cmd = ['traceroute', host]
-            
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        return result.stdout
+        return _read_full_text(filepath)
     except Exception as e:
-        return f"Error performing traceroute: {str(e)}"
+        return f"Error reading file: {str(e)}"
 
-def scan_ports(host, start_port=1, end_port=1024, timeout=1):
+# Bounds for the follow poll interval, which backs off while the file is idle
+FOLLOW_MIN_INTERVAL = 0.1
+FOLLOW_MAX_INTERVAL = 1.0
+# Most bytes read per step while catching up, so a burst of growth is streamed, not buffered
+FOLLOW_CHUNK_SIZE = 64 * 1024
+
+def follow_file_stream(filepath, initial_lines=10, stop_event=None, max_interval=FOLLOW_MAX_INTERVAL):
     """
-    Scan open ports on a host.
+    Follow a growing file like tail -f, yielding only newly appended lines.
     Args:
-        host: Hostname or IP address to scan
-        start_port: Starting port number (default: 1)
-        end_port: Ending port number (default: 1024)
-        timeout: Connection timeout in seconds (default: 1)
-    Returns:
-        List of open ports
+        filepath: Path to the file to follow
+        initial_lines: Number of existing lines to show first (default: 10)
+        stop_event: Optional threading.Event that ends following when set
+        max_interval: Longest wait between checks while the file is idle, in seconds
+    Yields:
+        Lines without trailing newlines, plus notices when the file is truncated or rotated
     """
-    open_ports = []
+    import codecs
+
+    if not os.path.exists(filepath):
+        yield f"Error: File '{filepath}' does not exist"
+        return
+
+    stop_event = stop_event or threading.Event()
+    f = None
     try:
-        for port in range(start_port, end_port + 1):
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
-            result = sock.connect_ex((host, port))
-            if result == 0:
-                try:
-                    service = socket.getservbyport(port)
-                    open_ports.append(f"Port {port}: {service}")
-                except:
-                    open_ports.append(f"Port {port}: unknown service")
-            sock.close()
-        
-        return "\n".join(open_ports) if open_ports else f"No open ports found on {host}"
-    except socket.gaierror:
-        return f"Hostname could not be resolved: {host}"
-    except socket.error as e:
-        return f"Could not connect to server: {str(e)}"
+        f = open(filepath, 'rb')
+        st = os.fstat(f.fileno())
+        offset = st.st_size
+
+        # Show the last lines from a bounded block before the current end
+        f.seek(max(0, offset - ENCODING_SAMPLE_SIZE))
+        block = f.read(offset - f.tell()) if offset else b''
+        f.seek(0)
+        encoding = _detect_encoding(f.read(ENCODING_SAMPLE_SIZE))
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        if initial_lines > 0 and block:
+            for line in block.decode(encoding, errors='replace').splitlines()[-initial_lines:]:
+                yield line
+
+        pending = ''
+        interval = FOLLOW_MIN_INTERVAL
+        while not stop_event.is_set():
+            # Rotation: the path now names a different file; truncation: the file shrank
+            try:
+                path_st = os.stat(filepath)
+            except FileNotFoundError:
+                path_st = None
+            if path_st is not None and (path_st.st_dev, path_st.st_ino) != (st.st_dev, st.st_ino):
+                # Drain what was appended to the old file before switching
+                f.seek(offset)
+                while not stop_event.is_set() and (chunk := f.read(FOLLOW_CHUNK_SIZE)):
+                    lines = (pending + decoder.decode(chunk)).split('\n')
+                    pending = lines.pop()
+                    for line in lines:
+                        yield line.rstrip('\r')
+                f.close()
+                f = open(filepath, 'rb')
+                st = os.fstat(f.fileno())
+                offset = 0
+                for line in (pending + decoder.decode(b'', final=True)).splitlines():
+                    yield line
+                pending = ''
+                decoder.reset()
+                yield f"[follow] {filepath} was replaced; following the new file"
+                continue
+            size = os.fstat(f.fileno()).st_size
+            if size < offset:
+                offset = 0
+                pending = ''
+                decoder.reset()
+                yield f"[follow] {filepath} was truncated; reading from the start"
+
+            if size > offset:
+                # One bounded chunk per pass; the loop comes straight back for the rest
+                f.seek(offset)
+                chunk = f.read(min(size - offset, FOLLOW_CHUNK_SIZE))
+                offset += len(chunk)
+                text = pending + decoder.decode(chunk)
+                # Hold back an incomplete last line until its newline arrives
+                lines = text.split('\n')
+                pending = lines.pop()
+                for line in lines:
+                    yield line.rstrip('\r')
+                if len(pending) > FOLLOW_CHUNK_SIZE:
+                    # No newline in sight: emit the partial line rather than buffer it without bound
+                    yield pending
+                    pending = ''
+                interval = FOLLOW_MIN_INTERVAL
+            else:
+                interval = min(max_interval, interval * 2)
+                stop_event.wait(interval)
     except Exception as e:
-        return f"Error scanning ports: {str(e)}"
+        yield f"Error following file: {str(e)}"
+    finally:
+        if f is not None:
+            f.close()
 
-def copy_file(source, destination):
+def ping_host(host, count=4):
     """
-    Copy a file from source to destination.
+    Ping a host to check connectivity.
     Args:
-        source: Source file path
-        destination: Destination file path
+        host: Hostname or IP address to ping, or a CIDR range/host list/@hostsfile
+        count: Number of ping packets to send (default: 4)
     Returns:
-        Success or error message
+        Ping results
     """
-    if not os.path.exists(source):
-        return f"Error: Source file '{source}' does not exist"
-    
-    try:
-        import shutil
-        shutil.copy2(source, destination)
-        return f"File copied successfully from {source} to {destination}"
-    except Exception as e:
-        return f"Error copying file: {str(e)}"
+    return ping_hosts(host, count=count)
 
-def get_system_info():
+def get_network_facts():
     """
-    Get system information.
+    Get per-interface addresses, link state and traffic counters as structured data.
     Returns:
-        System information
+        Dictionary of interface name to a dictionary of its facts
+    """
+    addrs = psutil.net_if_addrs()
+    stats = psutil.net_if_stats()
+    counters = psutil.net_io_counters(pernic=True)
+    duplex_names = {psutil.NIC_DUPLEX_FULL: 'full', psutil.NIC_DUPLEX_HALF: 'half'}
+    facts = {}
+    for name in sorted(set(addrs) | set(stats)):
+        stat = stats.get(name)
+        io = counters.get(name)
+        entry = {
+            'up': stat.isup if stat else None,
+            'speed_mbps': stat.speed if stat and stat.speed else None,
+            'mtu': stat.mtu if stat else None,
+            'duplex': duplex_names.get(stat.duplex) if stat else None,
+            'mac': None,
+            'ipv4': [],
+            'ipv6': [],
+        }
+        for addr in addrs.get(name, []):
+            if addr.family == psutil.AF_LINK:
+                entry['mac'] = addr.address
+            elif addr.family in (socket.AF_INET, socket.AF_INET6):
+                entry['ipv4' if addr.family == socket.AF_INET else 'ipv6'].append(
+                    {'address': addr.address, 'netmask': addr.netmask, 'broadcast': addr.broadcast})
+        if io is not None:
+            entry.update(bytes_sent=io.bytes_sent, bytes_recv=io.bytes_recv,
+                         packets_sent=io.packets_sent, packets_recv=io.packets_recv,
+                         errin=io.errin, errout=io.errout, dropin=io.dropin, dropout=io.dropout)
+        facts[name] = entry
+    return facts
+
+def get_network_interfaces(format='text'):
+    """
+    Get information about network interfaces.
+    Args:
+        format: 'text' or 'json' (default: text)
+    Returns:
+        Network interface information
     """
     try:
+        facts = get_network_facts()
+        if format == 'json':
+            return json.dumps(facts, indent=2)
+
+        result = []
+        for name, entry in facts.items():
+            state = "up" if entry['up'] else "down" if entry['up'] is not None else "unknown"
+            link = [state]
+            if entry['speed_mbps']:
+                link.append(f"{entry['speed_mbps']} Mb/s")
+            if entry['duplex']:
+                link.append(f"{entry['duplex']} duplex")
+            if entry['mtu']:
+                link.append(f"mtu {entry['mtu']}")
+            result.append(f"{name}: {', '.join(link)}")
+            if entry['mac']:
+                result.append(f"  MAC:  {entry['mac']}")
+            for addr in entry['ipv4']:
+                result.append(f"  IPv4: {addr['address']}" + (f" netmask {addr['netmask']}" if addr['netmask'] else "")
+                              + (f" broadcast {addr['broadcast']}" if addr['broadcast'] else ""))
+            for addr in entry['ipv6']:
+                result.append(f"  IPv6: {addr['address']}" + (f" netmask {addr['netmask']}" if addr['netmask'] else ""))
+            if 'bytes_recv' in entry:
+                result.append(f"  RX:   {_format_size(entry['bytes_recv'])} in {entry['packets_recv']} packets, "
+                              f"{entry['errin']} errors, {entry['dropin']} dropped")
+                result.append(f"  TX:   {_format_size(entry['bytes_sent'])} in {entry['packets_sent']} packets, "
+                              f"{entry['errout']} errors, {entry['dropout']} dropped")
+            result.append("")
+        return "\n".join(result).rstrip() if result else "No network interfaces found"
+    except Exception as e:
+        return f"Error getting network interfaces: {str(e)}"
+
+# Default seconds between netstat samples
+NETSTAT_INTERVAL = 1.0
+
+def _format_throughput_frame(previous, current, elapsed, interfaces, include_idle):
+    """Render per-interface rates between two net_io_counters(pernic=True) samples"""
+    lines = [f"{'Interface':<16} {'RX/s':>10} {'TX/s':>10} {'RX pk/s':>9} {'TX pk/s':>9} "
+             f"{'Err/s':>6} {'Drop/s':>6} {'RX total':>10} {'TX total':>10}",
+             "-" * 94]
+    totals = [0.0, 0.0]
+    for name in sorted(current):
+        if interfaces and name not in interfaces:
+            continue
+        now, before = current[name], previous.get(name)
+        if before is None:
+            continue
+        # Counters can reset when an interface is re-created; never show negative rates
+        rate = lambda field: max(0, getattr(now, field) - getattr(before, field)) / elapsed
+        rx, tx = rate('bytes_recv'), rate('bytes_sent')
+        if not include_idle and not rx and not tx:
+            continue
+        totals[0] += rx
+        totals[1] += tx
+        lines.append(f"{name[:16]:<16} {_format_size(rx):>10} {_format_size(tx):>10} "
+                     f"{rate('packets_recv'):>9.0f} {rate('packets_sent'):>9.0f} "
+                     f"{rate('errin') + rate('errout'):>6.0f} {rate('dropin') + rate('dropout'):>6.0f} "
+                     f"{_format_size(now.bytes_recv):>10} {_format_size(now.bytes_sent):>10}")
+    lines.append("-" * 94)
+    lines.append(f"{'Total':<16} {_format_size(totals[0]):>10} {_format_size(totals[1]):>10}")
+    return lines
+
+def netstat_stream(interval=NETSTAT_INTERVAL, interfaces=None, include_idle=True, stop_event=None):
+    """
+    Sample interface counters at a fixed interval and show per-NIC throughput until stopped.
+    Each tick reads all counters with a single psutil call; no processes are started.
+    Args:
+        interval: Seconds between samples (default: 1.0)
+        interfaces: Optional list of interface names to show (default: all)
+        include_idle: Whether to show interfaces without traffic (default: True)
+        stop_event: Optional threading.Event that stops sampling when set
+    Yields:
+        Frames, each a list of lines
+    """
+    interval = max(0.1, float(interval))
+    try:
+        previous = psutil.net_io_counters(pernic=True)
+        previous_time = time.monotonic()
+        next_tick = previous_time + interval
+        while True:
+            delay = max(0.0, next_tick - time.monotonic())
+            if stop_event is not None:
+                if stop_event.wait(delay):
+                    return
+            else:
+                time.sleep(delay)
+            current = psutil.net_io_counters(pernic=True)
+            now = time.monotonic()
+            yield _format_throughput_frame(previous, current, now - previous_time, interfaces, include_idle)
+            previous, previous_time = current, now
+            # Fixed cadence: schedule from the planned tick, not from when rendering finished
+            next_tick = max(next_tick + interval, now)
+    except Exception as e:
+        yield [f"Error sampling network counters: {str(e)}"]
+
+def network_throughput(interval=NETSTAT_INTERVAL, interfaces=None, include_idle=True):
+    """
+    Measure per-interface throughput over one interval.
+    Args:
+        interval: Seconds to measure over (default: 1.0)
+        interfaces: Optional list of interface names to show (default: all)
+        include_idle: Whether to show interfaces without traffic (default: True)
+    Returns:
+        Table of receive/transmit rates per interface
+    """
+    frames = netstat_stream(interval, interfaces, include_idle)
+    try:
+        return "\n".join(next(frames))
+    finally:
+        frames.close()
+
+# Upper bound on simultaneous connection attempts made by the port scanner
+DEFAULT_SCAN_CONCURRENCY = 500
+
+def _new_event_loop():
+    """
+    Create an event loop for the socket engines. Windows defaults to the Proactor loop, which
+    has no add_reader/add_writer, so a selector loop is used there instead.
+    """
+    return asyncio.SelectorEventLoop() if is_windows() else asyncio.new_event_loop()
+
+def _run_async(coro):
+    """Run a coroutine to completion from synchronous (possibly non-main thread) code"""
+    loop = _new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        try:
+            # Like asyncio.run: cancel what is still pending, e.g. shared DNS lookups nobody awaits
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            loop.close()
+
+def _max_open_sockets(requested):
+    """Clamp a requested concurrency to what the process file descriptor limit allows"""
+    try:
+        import resource
+        soft_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+        if soft_limit != resource.RLIM_INFINITY:
+            return max(1, min(requested, soft_limit - 64))
+    except (ImportError, ValueError, OSError):
+        pass
+    return max(1, requested)
+
+def _service_name(port):
+    """Return the registered service name for a TCP port"""
+    try:
+        return socket.getservbyport(port)
+    except OSError:
+        return "unknown service"
+
+class _RateLimiter:
+    """Space out events so that at most `rate` of them start per second (None = unlimited)"""
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_slot = 0.0
+
+    async def wait(self):
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+# Seconds a successful lookup is reused; the system resolver does not expose record TTLs
+DNS_CACHE_TTL = 300
+# Seconds a "no such host" answer is reused
+DNS_NEGATIVE_TTL = 30
+DNS_CACHE_MAX_ENTRIES = 10000
+# Resolver errors that mean the name does not exist (as opposed to a temporary failure)
+_DNS_NEGATIVE_ERRORS = {getattr(socket, name) for name in ('EAI_NONAME', 'EAI_NODATA') if hasattr(socket, name)}
+
+class _DNSCache:
+    """
+    Process-wide cache of getaddrinfo results shared by every network command, with
+    negative caching of unknown names and coalescing of concurrent lookups of one name.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}   # host -> (expires, ((family, address), ...) or None, gaierror args)
+        self.inflight = {}  # host -> threading.Event set when its lookup finishes
+        self.inflight_async = {}  # (event loop, host) -> task running its lookup
+        self.ttl = DNS_CACHE_TTL
+        self.negative_ttl = DNS_NEGATIVE_TTL
+        self.stats = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'literals': 0, 'lookup_seconds': 0.0}
+
+    @staticmethod
+    def _literal(host):
+        import ipaddress
+        try:
+            address = ipaddress.ip_address(host.split('%')[0])
+        except ValueError:
+            return None
+        return ((socket.AF_INET if address.version == 4 else socket.AF_INET6, host),)
+
+    def _cached(self, host):
+        """Return the cached addresses (raising for cached failures), or None on a miss. Lock held."""
+        entry = self.entries.get(host)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        if entry[1] is None:
+            self.stats['negative_hits'] += 1
+            raise socket.gaierror(*entry[2])
+        self.stats['hits'] += 1
+        return entry[1]
+
+    def _store(self, host, infos, error, elapsed):
+        """Record a lookup result. Lock held."""
+        self.stats['misses'] += 1
+        self.stats['lookup_seconds'] += elapsed
+        if len(self.entries) >= DNS_CACHE_MAX_ENTRIES:
+            now = time.monotonic()
+            for key in [key for key, entry in self.entries.items() if entry[0] < now] or list(self.entries)[:1000]:
+                del self.entries[key]
+        if error is not None:
+            if error.errno in _DNS_NEGATIVE_ERRORS:
+                self.entries[host] = (time.monotonic() + self.negative_ttl, None, error.args)
+            return None
+        addresses = []
+        for family, _, _, _, sockaddr in sorted(infos, key=lambda info: info[0] != socket.AF_INET):
+            if (family, sockaddr[0]) not in addresses:
+                addresses.append((family, sockaddr[0]))
+        addresses = tuple(addresses)
+        self.entries[host] = (time.monotonic() + self.ttl, addresses, None)
+        return addresses
+
+    def resolve(self, host):
+        """
+        Resolve a hostname, answering from the cache when possible.
+        Returns:
+            Tuple of (family, address), IPv4 first
+        Raises:
+            socket.gaierror if the name cannot be resolved
+        """
+        literal = self._literal(host)
+        if literal is not None:
+            with self.lock:
+                self.stats['literals'] += 1
+            return literal
+        while True:
+            with self.lock:
+                addresses = self._cached(host)
+                if addresses is not None:
+                    return addresses
+                waiter = self.inflight.get(host)
+                if waiter is None:
+                    self.inflight[host] = threading.Event()
+                    break
+            # Another thread is already looking this name up; use its answer
+            waiter.wait()
+            with self.lock:
+                if host in self.entries:
+                    continue
+            # Its lookup failed temporarily and was not cached: look up ourselves
+            with self.lock:
+                if host in self.inflight:
+                    continue
+                self.inflight[host] = threading.Event()
+                break
+        started = time.perf_counter()
+        infos, error = None, None
+        try:
+            infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            error = e
+        finally:
+            with self.lock:
+                addresses = self._store(host, infos, error, time.perf_counter() - started)
+                self.inflight.pop(host).set()
+        if error is not None:
+            raise error
+        return addresses
+
+    async def resolve_async(self, host):
+        """
+        Resolve a hostname from a coroutine without blocking the event loop. Concurrent lookups
+        of one name share a single resolver query, so a batch of targets on one host costs one lookup.
+        """
+        literal = self._literal(host)
+        loop = asyncio.get_running_loop()
+        key = (loop, host)
+        with self.lock:
+            if literal is not None:
+                self.stats['literals'] += 1
+                return literal
+            addresses = self._cached(host)
+            if addresses is not None:
+                return addresses
+            lookup = self.inflight_async.get(key)
+            if lookup is None:
+                lookup = self.inflight_async[key] = loop.create_task(self._lookup_async(loop, host))
+            else:
+                self.stats['hits'] += 1
+        # Shielded so a caller that times out does not cancel the lookup other callers wait on
+        return await asyncio.shield(lookup)
+
+    async def _lookup_async(self, loop, host):
+        started = time.perf_counter()
+        infos, error = None, None
+        try:
+            infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            error = e
+        finally:
+            with self.lock:
+                self.inflight_async.pop((loop, host), None)
+                if infos is not None or error is not None:
+                    addresses = self._store(host, infos, error, time.perf_counter() - started)
+        if error is not None:
+            raise error
+        return addresses
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            for key in self.stats:
+                self.stats[key] = 0
+
+_dns_cache = _DNSCache()
+
+async def _resolve_address(host):
+    """Resolve a hostname once through the shared DNS cache, preferring IPv4. Returns (family, address)."""
+    return (await _dns_cache.resolve_async(host))[0]
+
+def resolve_hosts(hosts, max_workers=64):
+    """
+    Resolve many hostnames concurrently through the shared DNS cache.
+    Args:
+        hosts: Comma-separated hostnames, a list or @path to a hosts file
+        max_workers: Maximum concurrent lookups (default: 64)
+    Returns:
+        Table of hosts and their addresses
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def lookup(host):
+        started = time.perf_counter()
+        try:
+            addresses = ", ".join(address for _, address in _dns_cache.resolve(host))
+        except (socket.gaierror, UnicodeError) as e:
+            addresses = f"unresolved ({e.strerror if isinstance(e, socket.gaierror) else str(e)})"
+        return host, addresses, (time.perf_counter() - started) * 1000
+
+    try:
+        host_list = expand_targets(hosts)
+        if not host_list:
+            return "Error: No hosts to resolve"
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(host_list)))) as executor:
+            rows = list(executor.map(lookup, host_list))
+        width = max(len("Host"), max(len(host) for host in host_list))
+        result = [f"{'Host':<{width}}  {'ms':>8}  Addresses", "-" * (width + 40)]
+        result.extend(f"{host:<{width}}  {ms:>8.1f}  {addresses}" for host, addresses, ms in rows)
+        result.append("")
+        result.append(f"Resolved {len(host_list)} hosts in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return "\n".join(result)
+    except FileNotFoundError as e:
+        return f"Error: Hosts file not found: {e.filename}"
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        return f"Error resolving hosts: {str(e)}"
+
+def get_dns_cache_stats():
+    """
+    Show how often hostname lookups were answered from the shared DNS cache.
+    Returns:
+        DNS cache statistics
+    """
+    with _dns_cache.lock:
+        stats = dict(_dns_cache.stats)
+        now = time.monotonic()
+        live = [entry for entry in _dns_cache.entries.values() if entry[0] >= now]
+        ttl, negative_ttl = _dns_cache.ttl, _dns_cache.negative_ttl
+    lookups = stats['hits'] + stats['negative_hits'] + stats['misses']
+    hit_rate = 100 * (stats['hits'] + stats['negative_hits']) / lookups if lookups else 0
+    average_ms = 1000 * stats['lookup_seconds'] / stats['misses'] if stats['misses'] else 0
+    negative = sum(1 for entry in live if entry[1] is None)
+    return (f"Cached names: {len(live) - negative} resolved, {negative} unknown "
+            f"(TTL {ttl:g}s, negative TTL {negative_ttl:g}s)\n"
+            f"Lookups: {lookups} ({stats['hits']} hits, {stats['negative_hits']} negative hits, "
+            f"{stats['misses']} resolver queries)\n"
+            f"Hit rate: {hit_rate:.1f}%\n"
+            f"Average resolver query: {average_ms:.1f} ms\n"
+            f"Estimated time saved: {stats['hits'] * average_ms / 1000:.2f} seconds\n"
+            f"IP literals (no lookup needed): {stats['literals']}")
+
+def configure_dns_cache(ttl=None, negative_ttl=None, clear=False):
+    """
+    Change the DNS cache lifetimes or empty the cache.
+    Args:
+        ttl: Seconds successful lookups are reused
+        negative_ttl: Seconds unknown-host answers are reused
+        clear: Whether to drop all cached names and reset statistics
+    Returns:
+        Current DNS cache statistics
+    """
+    if clear:
+        _dns_cache.clear()
+    with _dns_cache.lock:
+        if ttl is not None:
+            _dns_cache.ttl = max(0.0, float(ttl))
+        if negative_ttl is not None:
+            _dns_cache.negative_ttl = max(0.0, float(negative_ttl))
+    return get_dns_cache_stats()
+
+async def _probe_port(family, address, port, timeout):
+    """Attempt a non-blocking TCP connect. Returns True if the port accepted the connection."""
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    try:
+        await asyncio.wait_for(loop.sock_connect(sock, (address, port)), timeout)
+        return True
+    except (OSError, asyncio.TimeoutError):
+        return False
+    finally:
+        sock.close()
+
+async def _iter_open_ports(targets, ports, timeout, concurrency, rate_limit=None):
+    """
+    Probe every (target, port) pair with a fixed pool of workers.
+    Args:
+        targets: List of (name, family, address) tuples
+        ports: Sequence of port numbers to probe on every target
+    Yields:
+        (name, port) for each open port, as soon as it is found
+    """
+    limiters = {name: _RateLimiter(rate_limit) for name, _, _ in targets}
+    found = asyncio.Queue()
+    # Port-major order spreads consecutive probes across hosts instead of hammering one
+    work = ((target, port) for port in ports for target in targets)
+
+    async def worker():
+        # Workers share one generator, so each pair is probed exactly once
+        for (name, family, address), port in work:
+            await limiters[name].wait()
+            if await _probe_port(family, address, port, timeout):
+                found.put_nowait((name, port))
+
+    async def run_workers():
+        try:
+            workers = min(_max_open_sockets(concurrency), len(ports) * len(targets))
+            await asyncio.gather(*(worker() for _ in range(workers)))
+        finally:
+            found.put_nowait(None)
+
+    runner = asyncio.ensure_future(run_workers())
+    try:
+        while (item := await found.get()) is not None:
+            yield item
+        await runner
+    finally:
+        runner.cancel()
+
+async def _scan_targets(targets, ports, timeout, concurrency, rate_limit=None):
+    """Probe every (target, port) pair. Returns a dictionary of target name to sorted open ports."""
+    open_ports = {name: [] for name, _, _ in targets}
+    async for name, port in _iter_open_ports(targets, ports, timeout, concurrency, rate_limit):
+        open_ports[name].append(port)
+    for found in open_ports.values():
+        found.sort()
+    return open_ports
+
+def scan_ports(host, start_port=1, end_port=1024, timeout=1, concurrency=DEFAULT_SCAN_CONCURRENCY, rate_limit=None,
+               format='text'):
+    """
+    Scan open ports on a host using concurrent non-blocking connection attempts.
+    Args:
+        host: Hostname or IP address to scan, or a CIDR range/host list/@hostsfile for a sweep
+        start_port: Starting port number (default: 1)
+        end_port: Ending port number (default: 1024)
+        timeout: Connection timeout in seconds (default: 1)
+        concurrency: Maximum number of simultaneous connection attempts (default: 500)
+        rate_limit: Maximum connection attempts per second against the host (default: unlimited)
+        format: 'text', 'json' or 'csv' (default: text)
+    Returns:
+        List of open ports
+    """
+    if is_multi_target(host):
+        return sweep_ports(host, f"{start_port}-{end_port}", timeout, concurrency, rate_limit, format)
+
+    try:
+        ports = range(max(1, int(start_port)), min(65535, int(end_port)) + 1)
+        if not ports:
+            return f"Error: Invalid port range {start_port}-{end_port}"
+
+        async def scan():
+            family, address = await _resolve_address(host)
+            found = await _scan_targets([(host, family, address)], ports, timeout, concurrency, rate_limit)
+            return found[host]
+
+        rows = [PortEntry(host, port, 'open', _service_name(port)) for port in _run_async(scan())]
+        if format != 'text':
+            return render_records(rows, PortEntry, format)
+        if not rows:
+            return f"No open ports found on {host}"
+        return render_records(rows, PortEntry, text_row=lambda entry: f"Port {entry.port}: {entry.service}")
+    except socket.gaierror:
+        return f"Hostname could not be resolved: {host}"
+    except socket.error as e:
+        return f"Could not connect to server: {str(e)}"
+    except Exception as e:
+        return f"Error scanning ports: {str(e)}"
+
+def _iter_async(agen, stop_event=None):
+    """
+    Drive an async generator on a private event loop thread and yield its items synchronously.
+    Args:
+        agen: Async generator to consume
+        stop_event: Optional threading.Event that cancels the generator when set
+    Yields:
+        Items produced by the async generator
+    """
+    items = queue.Queue()
+    loop = _new_event_loop()
+
+    async def pump():
+        try:
+            async for item in agen:
+                items.put((False, item))
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            items.put((True, e))
+        finally:
+            items.put((True, None))
+
+    task = loop.create_task(pump())
+    thread = threading.Thread(target=loop.run_until_complete, args=(task,), daemon=True)
+    thread.start()
+    try:
+        while True:
+            try:
+                done, item = items.get(timeout=0.2)
+            except queue.Empty:
+                if stop_event is not None and stop_event.is_set():
+                    break
+                continue
+            if done:
+                if item is not None:
+                    raise item
+                break
+            yield item
+    finally:
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join()
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+def scan_ports_stream(host, start_port=1, end_port=1024, timeout=1, concurrency=DEFAULT_SCAN_CONCURRENCY, rate_limit=None, stop_event=None):
+    """
+    Scan open ports on a host, yielding each open port as soon as it is found.
+    Args:
+        host: Hostname or IP address to scan, or a CIDR range/host list/@hostsfile for a sweep
+        start_port: Starting port number (default: 1)
+        end_port: Ending port number (default: 1024)
+        timeout: Connection timeout in seconds (default: 1)
+        concurrency: Maximum number of simultaneous connection attempts (default: 500)
+        rate_limit: Maximum connection attempts per second against the host (default: unlimited)
+        stop_event: Optional threading.Event that stops the scan when set
+    Yields:
+        "Port N: service" lines in discovery order
+    """
+    if is_multi_target(host):
+        # Sweeps are reported as a single table once complete
+        yield from sweep_ports(host, f"{start_port}-{end_port}", timeout, concurrency, rate_limit).splitlines()
+        return
+
+    try:
+        ports = range(max(1, int(start_port)), min(65535, int(end_port)) + 1)
+        if not ports:
+            yield f"Error: Invalid port range {start_port}-{end_port}"
+            return
+
+        async def scan():
+            family, address = await _resolve_address(host)
+            async for _, port in _iter_open_ports([(host, family, address)], ports, timeout, concurrency, rate_limit):
+                yield port
+
+        found = False
+        for port in _iter_async(scan(), stop_event):
+            found = True
+            yield f"Port {port}: {_service_name(port)}"
+        if not found and not (stop_event is not None and stop_event.is_set()):
+            yield f"No open ports found on {host}"
+    except socket.gaierror:
+        yield f"Hostname could not be resolved: {host}"
+    except socket.error as e:
+        yield f"Could not connect to server: {str(e)}"
+    except Exception as e:
+        yield f"Error scanning ports: {str(e)}"
+
+# Largest number of hosts a single sweep may expand to
+MAX_SWEEP_HOSTS = 65536
+
+def is_multi_target(spec):
+    """Check whether a host argument names several targets (CIDR range, list or @hostsfile)"""
+    spec = str(spec)
+    return "," in spec or "/" in spec or spec.startswith("@")
+
+def expand_targets(spec):
+    """
+    Expand a target specification into a list of hosts.
+    Args:
+        spec: Comma-separated hosts and CIDR ranges, a list of them, or @path to a hosts file
+              (one entry per line, '#' starts a comment)
+    Returns:
+        List of unique hosts in the order given
+    """
+    import ipaddress
+
+    items = spec if isinstance(spec, (list, tuple)) else str(spec).split(",")
+    hosts = []
+    seen = set()
+    for item in items:
+        item = item.strip()
+        if not item:
+            continue
+        if item.startswith("@"):
+            with open(item[1:], "r", encoding="utf-8") as f:
+                entries = []
+                for line in f:
+                    entries.extend(line.split("#", 1)[0].replace(",", " ").split())
+            expanded = expand_targets(entries)
+        elif "/" in item:
+            network = ipaddress.ip_network(item, strict=False)
+            if network.num_addresses > MAX_SWEEP_HOSTS:
+                raise ValueError(f"Range {item} has more than {MAX_SWEEP_HOSTS} addresses")
+            expanded = [str(address) for address in network.hosts()] or [str(network.network_address)]
+        else:
+            expanded = [item]
+        for host in expanded:
+            if host not in seen:
+                seen.add(host)
+                hosts.append(host)
+        if len(hosts) > MAX_SWEEP_HOSTS:
+            raise ValueError(f"Sweep is limited to {MAX_SWEEP_HOSTS} hosts")
+    return hosts
+
+def parse_port_spec(spec):
+    """
+    Parse a port specification such as "22,80,8000-8100" into a sorted list of ports.
+    Args:
+        spec: Port specification string, a single port number or an iterable of ports
+    Returns:
+        Sorted list of unique port numbers
+    """
+    if isinstance(spec, int):
+        ports = {spec}
+    elif isinstance(spec, str):
+        ports = set()
+        for part in spec.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if "-" in part:
+                first, last = part.split("-", 1)
+                ports.update(range(int(first), int(last) + 1))
+            else:
+                ports.add(int(part))
+    else:
+        ports = {int(port) for port in spec}
+    if not ports or min(ports) < 1 or max(ports) > 65535:
+        raise ValueError(f"Invalid port specification: {spec}")
+    return sorted(ports)
+
+async def _resolve_targets(hosts, concurrency):
+    """Resolve many hostnames concurrently. Returns (resolved targets, unresolved hosts)."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def resolve(host):
+        async with semaphore:
+            try:
+                return host, await _resolve_address(host)
+            except (socket.gaierror, UnicodeError):
+                return host, None
+
+    resolved = []
+    unresolved = []
+    for host, address in await asyncio.gather(*(resolve(host) for host in hosts)):
+        if address is None:
+            unresolved.append(host)
+        else:
+            resolved.append((host, address[0], address[1]))
+    return resolved, unresolved
+
+def sweep_ports(targets, ports="1-1024", timeout=1, concurrency=DEFAULT_SCAN_CONCURRENCY, rate_limit=None, format='text'):
+    """
+    Scan the same ports on many hosts at once and return one host x port table.
+    Args:
+        targets: CIDR ranges, comma-separated hosts, a list of hosts or @path to a hosts file
+        ports: Port specification such as "22,80,443" or "1-1024" (default: 1-1024)
+        timeout: Connection timeout in seconds (default: 1)
+        concurrency: Maximum number of simultaneous connection attempts across all hosts (default: 500)
+        rate_limit: Maximum connection attempts per second against each host (default: unlimited)
+        format: 'text', or 'json'/'csv' rows of open ports and unresolved hosts (default: text)
+    Returns:
+        Table of hosts and their open ports
+    """
+    try:
+        hosts = expand_targets(targets)
+        port_list = parse_port_spec(ports)
+        if not hosts:
+            return "Error: No hosts to scan"
+
+        async def sweep():
+            resolved, unresolved = await _resolve_targets(hosts, min(concurrency, 64))
+            found = await _scan_targets(resolved, port_list, timeout, concurrency, rate_limit) if resolved else {}
+            return found, set(unresolved)
+
+        found, unresolved = _run_async(sweep())
+        if format != 'text':
+            rows = []
+            for host in hosts:
+                if host in unresolved:
+                    rows.append(PortEntry(host, None, 'unresolved', None))
+                else:
+                    rows.extend(PortEntry(host, port, 'open', _service_name(port)) for port in found[host])
+            return render_records(rows, PortEntry, format)
+
+        width = max(len("Host"), max(len(host) for host in hosts))
+        result = []
+        if len(port_list) <= 16:
+            # Few ports: show a full matrix with one column per port
+            result.append((f"{'Host':<{width}}  " + " ".join(f"{port:<6}" for port in port_list)).rstrip())
+            result.append("-" * (width + 2 + 7 * len(port_list)))
+            for host in hosts:
+                if host in unresolved:
+                    result.append(f"{host:<{width}}  unresolved")
+                    continue
+                open_set = set(found[host])
+                cells = ["open" if port in open_set else "-" for port in port_list]
+                result.append((f"{host:<{width}}  " + " ".join(f"{cell:<6}" for cell in cells)).rstrip())
+        else:
+            # Many ports: list only the open ones per host
+            result.append(f"{'Host':<{width}}  Open ports")
+            result.append("-" * (width + 12))
+            for host in hosts:
+                if host in unresolved:
+                    cell = "unresolved"
+                else:
+                    cell = ", ".join(f"{port}/{_service_name(port)}" for port in found[host]) or "-"
+                result.append(f"{host:<{width}}  {cell}")
+
+        responding = sum(1 for open_ports in found.values() if open_ports)
+        result.append("")
+        result.append(f"Scanned {len(hosts)} hosts x {len(port_list)} ports: "
+                      f"{responding} with open ports, {len(unresolved)} unresolved")
+        return "\n".join(result)
+    except FileNotFoundError as e:
+        return f"Error: Hosts file not found: {e.filename}"
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        return f"Error sweeping ports: {str(e)}"
+
+def expand_endpoints(spec, default_port=23):
+    """
+    Expand a list of host:port targets.
+    Args:
+        spec: Comma-separated host:port entries, a list of them, or @path to a file with one
+              entry per line ('#' starts a comment). Hosts may be CIDR ranges, IPv6 addresses
+              are written as [addr]:port, and entries without a port use default_port
+        default_port: Port for entries that do not name one (default: 23)
+    Returns:
+        List of unique (host, port) pairs in the order given
+    """
+    items = spec if isinstance(spec, (list, tuple)) else str(spec).split(",")
+    endpoints = []
+    seen = set()
+    for item in items:
+        item = item.strip()
+        if not item:
+            continue
+        if item.startswith("@"):
+            with open(item[1:], "r", encoding="utf-8") as f:
+                entries = []
+                for line in f:
+                    entries.extend(line.split("#", 1)[0].replace(",", " ").split())
+            expanded = expand_endpoints(entries, default_port)
+        else:
+            if item.startswith("["):
+                host, _, port = item[1:].partition("]")
+                port = port.lstrip(":")
+            elif item.count(":") == 1:
+                host, port = item.split(":")
+            else:
+                host, port = item, ""
+            port = int(port) if port else int(default_port)
+            if not 1 <= port <= 65535:
+                raise ValueError(f"Invalid port in {item}")
+            expanded = [(host, port) for host in expand_targets([host])]
+        for endpoint in expanded:
+            if endpoint not in seen:
+                seen.add(endpoint)
+                endpoints.append(endpoint)
+        if len(endpoints) > MAX_SWEEP_HOSTS:
+            raise ValueError(f"Connectivity checks are limited to {MAX_SWEEP_HOSTS} targets")
+    return endpoints
+
+def _connect_error_class(error):
+    """Classify a failed connect into a short, stable error class name"""
+    import errno
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    if isinstance(error, socket.gaierror):
+        return "unresolved"
+    if isinstance(error, ConnectionRefusedError):
+        return "refused"
+    if isinstance(error, ConnectionResetError):
+        return "reset"
+    if error.errno in (errno.ENETUNREACH, errno.EHOSTUNREACH):
+        return "unreachable"
+    return errno.errorcode.get(error.errno, type(error).__name__).lower()
+
+async def _check_endpoint(host, port, timeout):
+    """Resolve and connect to one target within one timeout. Returns a ConnectivityEntry."""
+    loop = asyncio.get_running_loop()
+    resolved = []  # the address, once resolution has finished
+    started = [None]
+
+    async def resolve_and_connect():
+        family, address = (await _dns_cache.resolve_async(host))[0]
+        resolved.append(address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        started[0] = time.perf_counter()
+        try:
+            await loop.sock_connect(sock, (address, port))
+        finally:
+            sock.close()
+
+    try:
+        await asyncio.wait_for(resolve_and_connect(), timeout)
+        return ConnectivityEntry(host, port, resolved[0], round((time.perf_counter() - started[0]) * 1000, 2), None)
+    except (OSError, asyncio.TimeoutError, UnicodeError) as e:
+        address = resolved[0] if resolved else None
+        error = "unresolved" if address is None and not isinstance(e, asyncio.TimeoutError) else _connect_error_class(e)
+        return ConnectivityEntry(host, port, address, None, error)
+
+def get_connectivity(targets, port=23, timeout=3, concurrency=DEFAULT_SCAN_CONCURRENCY):
+    """
+    Check TCP connectivity to many host:port targets at once and return structured rows.
+    Args:
+        targets: Comma-separated host:port entries, a list of them, or @path to a targets file
+        port: Port for entries that do not name one (default: 23)
+        timeout: Per-target timeout in seconds, covering resolution and connect (default: 3)
+        concurrency: Maximum number of simultaneous checks (default: 500)
+    Returns:
+        List of ConnectivityEntry rows in the order given
+    """
+    endpoints = expand_endpoints(targets, port)
+    timeout = float(timeout)
+
+    async def check_all():
+        semaphore = asyncio.Semaphore(_max_open_sockets(concurrency))
+
+        async def check(host, target_port):
+            async with semaphore:
+                return await _check_endpoint(host, target_port, timeout)
+
+        return await asyncio.gather(*(check(host, target_port) for host, target_port in endpoints))
+
+    return _run_async(check_all()) if endpoints else []
+
+def check_connectivity(targets, port=23, timeout=3, concurrency=DEFAULT_SCAN_CONCURRENCY, format='text'):
+    """
+    Check TCP connectivity to many host:port targets at once, e.g. every dependency of a service.
+    Args:
+        targets: Comma-separated host:port entries, a list of them, or @path to a targets file
+        port: Port for entries that do not name one (default: 23)
+        timeout: Per-target timeout in seconds, covering resolution and connect (default: 3)
+        concurrency: Maximum number of simultaneous checks (default: 500)
+        format: 'text', 'json' or 'csv' (default: text)
+    Returns:
+        Table of targets with their address, status, connect latency and error class
+    """
+    try:
+        started = time.perf_counter()
+        rows = get_connectivity(targets, port, timeout, concurrency)
+        elapsed = time.perf_counter() - started
+        if not rows:
+            return "Error: No targets to check"
+        if format != 'text':
+            return render_records(rows, ConnectivityEntry, format)
+
+        def label(entry):
+            return f"[{entry.host}]:{entry.port}" if ":" in entry.host else f"{entry.host}:{entry.port}"
+
+        width = max(len("Target"), max(len(label(entry)) for entry in rows))
+        address_width = max(len("Address"), max(len(entry.address or "-") for entry in rows))
+
+        def text_row(entry):
+            if entry.error is None:
+                return f"{label(entry):<{width}}  {entry.address:<{address_width}}  {'open':<6}  {entry.latency_ms:>8.1f}"
+            return f"{label(entry):<{width}}  {entry.address or '-':<{address_width}}  {'failed':<6}  {'-':>8}  {entry.error}"
+
+        result = [f"{'Target':<{width}}  {'Address':<{address_width}}  {'Status':<6}  {'ms':>8}  Error",
+                  "-" * (width + address_width + 32),
+                  render_records(rows, ConnectivityEntry, text_row=text_row)]
+
+        failures = {}
+        for entry in rows:
+            if entry.error is not None:
+                failures[entry.error] = failures.get(entry.error, 0) + 1
+        latencies = [entry.latency_ms for entry in rows if entry.error is None]
+        result.append("")
+        summary = f"Checked {len(rows)} targets in {elapsed:.2f} seconds: {len(latencies)} reachable"
+        if failures:
+            summary += ", " + ", ".join(f"{count} {error}" for error, count in sorted(failures.items()))
+        result.append(summary)
+        if latencies:
+            result.append(f"Connect latency (ms): min {min(latencies):.1f}  "
+                          f"avg {sum(latencies) / len(latencies):.1f}  max {max(latencies):.1f}")
+        return "\n".join(result)
+    except FileNotFoundError as e:
+        return f"Error: Targets file not found: {e.filename}"
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        return f"Error checking connectivity: {str(e)}"
+
+# Defaults for the in-process ping engine
+PING_INTERVAL = 1.0
+PING_TIMEOUT = 1.0
+# Port timed by TCP-connect pings when ICMP sockets are not permitted
+PING_TCP_PORT = 80
+
+def _icmp_checksum(data):
+    """Internet checksum (RFC 1071) of an ICMP message"""
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(int.from_bytes(data[i:i + 2], 'big') for i in range(0, len(data), 2))
+    while total >> 16:
+        total = (total & 0xFFFF) + (total >> 16)
+    return ~total & 0xFFFF
+
+class _PingEngine:
+    """
+    Send echo requests to many hosts over one ICMP socket per address family. Unprivileged
+    ICMP datagram sockets are tried first, then raw sockets; when neither is permitted (or
+    method is 'tcp') round trips are timed with TCP connects instead.
+    """
+
+    def __init__(self, method='auto', tcp_port=PING_TCP_PORT):
+        self.method = method
+        self.tcp_port = tcp_port
+        self.sockets = {}  # family -> (socket, is_raw) or None for TCP fallback
+        self.waiters = {}  # (family, sequence) -> (address, future)
+        self.identifier = os.getpid() & 0xFFFF
+        self.sequence = 0
+
+    def _open(self, family):
+        if family in self.sockets:
+            return
+        sock = None
+        if self.method != 'tcp':
+            proto = socket.IPPROTO_ICMP if family == socket.AF_INET else socket.IPPROTO_ICMPV6
+            for kind in (socket.SOCK_DGRAM, socket.SOCK_RAW):
+                try:
+                    sock = socket.socket(family, kind, proto)
+                    is_raw = kind == socket.SOCK_RAW
+                    break
+                except (OSError, AttributeError):
+                    continue
+            if sock is None and self.method == 'icmp':
+                raise PermissionError("ICMP sockets are not permitted for this user; use method=tcp")
+        if sock is None:
+            self.sockets[family] = None
+            return
+        sock.setblocking(False)
+        try:
+            asyncio.get_running_loop().add_reader(sock.fileno(), self._on_readable, family)
+        except NotImplementedError:
+            # Event loops without readiness callbacks (Windows' Proactor loop) fall back to TCP pings
+            sock.close()
+            if self.method == 'icmp':
+                raise PermissionError("ICMP pings need a selector event loop; use method=tcp")
+            self.sockets[family] = None
+            return
+        self.sockets[family] = (sock, is_raw)
+
+    def method_for(self, family):
+        return 'icmp' if self.sockets.get(family) else f"tcp:{self.tcp_port}"
+
+    def _on_readable(self, family):
+        import struct
+        sock, is_raw = self.sockets[family]
+        reply_type = 0 if family == socket.AF_INET else 129
+        while True:
+            try:
+                data, sender = sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            received = time.perf_counter()
+            if is_raw and family == socket.AF_INET:
+                # Raw IPv4 sockets deliver the IP header too
+                data = data[(data[0] & 0x0F) * 4:]
+            if len(data) < 8:
+                continue
+            icmp_type, _, _, identifier, sequence = struct.unpack('!BBHHH', data[:8])
+            # Datagram sockets rewrite the identifier themselves; raw sockets see every reply
+            if icmp_type != reply_type or (is_raw and identifier != self.identifier):
+                continue
+            waiter = self.waiters.get((family, sequence))
+            if waiter and waiter[0] == sender[0].split('%')[0] and not waiter[1].done():
+                waiter[1].set_result(received)
+
+    async def ping(self, family, address, timeout):
+        """Send one echo request. Returns the round trip in milliseconds, or None on loss."""
+        import struct
+        self._open(family)
+        if self.sockets[family] is None:
+            return await self._tcp_ping(family, address, timeout)
+
+        sock, _ = self.sockets[family]
+        self.sequence = (self.sequence + 1) & 0xFFFF
+        sequence = self.sequence
+        request_type = 8 if family == socket.AF_INET else 128
+        payload = b'terminal-agent'.ljust(32, b'.')
+        header = struct.pack('!BBHHH', request_type, 0, 0, self.identifier, sequence)
+        if family == socket.AF_INET:
+            # The kernel fills in ICMPv6 checksums itself
+            header = struct.pack('!BBHHH', request_type, 0, _icmp_checksum(header + payload), self.identifier, sequence)
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiters[(family, sequence)] = (address, future)
+        try:
+            sent = time.perf_counter()
+            sock.sendto(header + payload, (address, 0))
+            received = await asyncio.wait_for(future, timeout)
+            return (received - sent) * 1000
+        except (OSError, asyncio.TimeoutError):
+            return None
+        finally:
+            self.waiters.pop((family, sequence), None)
+
+    async def _tcp_ping(self, family, address, timeout):
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        try:
+            start = time.perf_counter()
+            await asyncio.wait_for(loop.sock_connect(sock, (address, self.tcp_port)), timeout)
+        except ConnectionRefusedError:
+            # A reset still proves the host answered
+            pass
+        except (OSError, asyncio.TimeoutError):
+            return None
+        finally:
+            sock.close()
+        return (time.perf_counter() - start) * 1000
+
+    def close(self):
+        loop = asyncio.get_running_loop()
+        for entry in self.sockets.values():
+            if entry:
+                loop.remove_reader(entry[0].fileno())
+                entry[0].close()
+        self.sockets.clear()
+
+async def _ping_rounds(hosts, count, interval, timeout, method, tcp_port):
+    """
+    Ping every host once per round, all hosts concurrently.
+    Args:
+        count: Number of rounds, or None to continue until cancelled
+    Yields:
+        ('targets', resolved targets, unresolved hosts, methods by host) first, then
+        ('round', [(host, rtt in ms or None), ...]) once per round
+    """
+    resolved, unresolved = await _resolve_targets(hosts, 64)
+    engine = _PingEngine(method, tcp_port)
+    semaphore = asyncio.Semaphore(_max_open_sockets(1024))
+
+    async def ping(name, family, address):
+        async with semaphore:
+            return name, await engine.ping(family, address, timeout)
+
+    try:
+        for _, family, _ in resolved:
+            engine._open(family)
+        yield 'targets', resolved, unresolved, {name: engine.method_for(family) for name, family, _ in resolved}
+        round_number = 0
+        loop = asyncio.get_running_loop()
+        while resolved and (count is None or round_number < count):
+            started = loop.time()
+            replies = await asyncio.gather(*(ping(*target) for target in resolved))
+            round_number += 1
+            yield 'round', replies
+            if count is None or round_number < count:
+                await asyncio.sleep(max(0.0, started + interval - loop.time()))
+    finally:
+        engine.close()
+
+def _format_ping_table(hosts, targets, unresolved, methods, replies):
+    """Render per-host sent/received/loss and min/avg/max round trip statistics"""
+    addresses = {name: address for name, _, address in targets}
+    width = max(len("Host"), max(len(host) for host in hosts))
+    result = [f"{'Host':<{width}}  {'Address':<15} {'Sent':>5} {'Recv':>5} {'Loss':>6} "
+              f"{'Min ms':>8} {'Avg ms':>8} {'Max ms':>8}  Method"]
+    result.append("-" * (width + 73))
+    for host in hosts:
+        if host in unresolved:
+            result.append(f"{host:<{width}}  unresolved")
+            continue
+        rtts = replies[host]
+        times = [rtt for rtt in rtts if rtt is not None]
+        loss = 100 * (len(rtts) - len(times)) / len(rtts) if rtts else 0
+        if times:
+            stats = f"{min(times):>8.2f} {sum(times) / len(times):>8.2f} {max(times):>8.2f}"
+        else:
+            stats = f"{'-':>8} {'-':>8} {'-':>8}"
+        result.append(f"{host:<{width}}  {addresses[host]:<15} {len(rtts):>5} {len(times):>5} {loss:>5.0f}% "
+                      f"{stats}  {methods[host]}")
+    return "\n".join(result)
+
+def ping_hosts(hosts, count=4, interval=PING_INTERVAL, timeout=PING_TIMEOUT, method='auto', tcp_port=PING_TCP_PORT):
+    """
+    Ping one or many hosts concurrently from within the process.
+    Args:
+        hosts: Hostname or IP address, CIDR range, comma-separated hosts, a list or @path to a hosts file
+        count: Number of echo requests per host (default: 4)
+        interval: Seconds between rounds (default: 1.0)
+        timeout: Seconds to wait for each reply (default: 1.0)
+        method: 'auto' (ICMP, falling back to TCP connect), 'icmp' or 'tcp' (default: auto)
+        tcp_port: Port timed by TCP pings (default: 80)
+    Returns:
+        Table of sent/received/loss and min/avg/max round trip times per host
+    """
+    try:
+        host_list = expand_targets(hosts)
+        if not host_list:
+            return "Error: No hosts to ping"
+
+        async def run():
+            replies = {host: [] for host in host_list}
+            header = None
+            async for event in _ping_rounds(host_list, max(1, int(count)), interval, timeout, method, tcp_port):
+                if event[0] == 'targets':
+                    header = event[1:]
+                else:
+                    for name, rtt in event[1]:
+                        replies[name].append(rtt)
+            return header, replies
+
+        (targets, unresolved, methods), replies = _run_async(run())
+        return _format_ping_table(host_list, targets, unresolved, methods, replies)
+    except FileNotFoundError as e:
+        return f"Error: Hosts file not found: {e.filename}"
+    except (ValueError, PermissionError) as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        return f"Error pinging host: {str(e)}"
+
+def ping_host_stream(host, count=4, interval=PING_INTERVAL, timeout=PING_TIMEOUT, method='auto',
+                     tcp_port=PING_TCP_PORT, monitor=False, stop_event=None):
+    """
+    Ping one or many hosts, yielding replies as they arrive and a statistics table at the end.
+    With a single host every reply is shown; with several hosts only changes between up and
+    down are shown after the first round.
+    Args:
+        host: Hostname or IP address, CIDR range, comma-separated hosts or @path to a hosts file
+        count: Number of echo requests per host (default: 4)
+        interval: Seconds between rounds (default: 1.0)
+        timeout: Seconds to wait for each reply (default: 1.0)
+        method: 'auto' (ICMP, falling back to TCP connect), 'icmp' or 'tcp' (default: auto)
+        tcp_port: Port timed by TCP pings (default: 80)
+        monitor: Whether to keep pinging until stopped instead of sending count requests
+        stop_event: Optional threading.Event that stops pinging when set
+    Yields:
+        Reply and state change lines, then the statistics table
+    """
+    try:
+        host_list = expand_targets(host)
+        if not host_list:
+            yield "Error: No hosts to ping"
+            return
+
+        rounds = None if monitor else max(1, int(count))
+        replies = {name: [] for name in host_list}
+        header = ([], [], {})
+        last_state = {}
+        for event in _iter_async(_ping_rounds(host_list, rounds, interval, timeout, method, tcp_port), stop_event):
+            if event[0] == 'targets':
+                header = event[1:]
+                targets, unresolved, methods = header
+                for name in unresolved:
+                    yield f"{name}: hostname could not be resolved"
+                if targets:
+                    yield (f"Pinging {len(targets)} host{'s' if len(targets) != 1 else ''} "
+                           f"via {', '.join(sorted(set(methods.values())))}:")
+                continue
+            stamp = datetime.datetime.now().strftime('%H:%M:%S')
+            addresses = {name: address for name, _, address in header[0]}
+            for name, rtt in event[1]:
+                replies[name].append(rtt)
+                if len(host_list) == 1:
+                    yield (f"Reply from {addresses[name]}: time={rtt:.2f} ms" if rtt is not None
+                           else f"Request to {addresses[name]} timed out")
+                elif last_state.get(name) != (rtt is not None):
+                    yield f"[{stamp}] {name} {'up' if rtt is not None else 'down'}" + (f" ({rtt:.2f} ms)" if rtt is not None else "")
+                last_state[name] = rtt is not None
+
+        if header[0] or header[1]:
+            yield ""
+            yield from _format_ping_table(host_list, *header, replies).splitlines()
+    except FileNotFoundError as e:
+        yield f"Error: Hosts file not found: {e.filename}"
+    except (ValueError, PermissionError) as e:
+        yield f"Error: {str(e)}"
+    except Exception as e:
+        yield f"Error pinging host: {str(e)}"
+
+# Defaults for the in-process traceroute
+TRACE_MAX_HOPS = 30
+TRACE_PROBES = 3
+TRACE_TIMEOUT = 2.0
+# First destination port of UDP probes; each probe uses the next one
+TRACE_UDP_BASE_PORT = 33434
+TRACE_TCP_PORT = 80
+# Linux socket options that queue ICMP errors on an ordinary (unprivileged) UDP socket
+_IP_RECVERR = 11
+_IPV6_RECVERR = 25
+_MSG_ERRQUEUE = 0x2000
+# Linux option attaching the kernel receive time to each message, for accurate round trips
+_SO_TIMESTAMPNS = 35
+
+class _TraceUnsupported(Exception):
+    """Raised when neither raw ICMP sockets nor Linux ICMP error queues are available"""
+
+def _open_icmp_listener(family):
+    """Open a raw socket receiving ICMP errors, or None if not permitted"""
+    proto = socket.IPPROTO_ICMP if family == socket.AF_INET else socket.IPPROTO_ICMPV6
+    try:
+        sock = socket.socket(family, socket.SOCK_RAW, proto)
+    except (OSError, AttributeError):
+        return None
+    sock.setblocking(False)
+    _enable_receive_timestamps(sock)
+    return sock
+
+def _enable_receive_timestamps(sock):
+    if sys.platform.startswith('linux'):
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, _SO_TIMESTAMPNS, 1)
+        except OSError:
+            pass
+
+def _receive_time(ancdata):
+    """Kernel receive time of a message from its ancillary data, falling back to now"""
+    import struct
+    for level, kind, data in ancdata:
+        if level == socket.SOL_SOCKET and kind == _SO_TIMESTAMPNS and len(data) >= 16:
+            seconds, nanoseconds = struct.unpack('=qq', data[:16])
+            return seconds + nanoseconds / 1e9
+    return time.time()
+
+def _set_probe_ttl(sock, family, ttl):
+    if family == socket.AF_INET:
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+    else:
+        sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_UNICAST_HOPS, ttl)
+
+def _parse_icmp_error(data, family):
+    """
+    Parse an ICMP time exceeded / unreachable message read from a raw socket.
+    Returns:
+        (source port of the quoted probe, whether it was an unreachable error) or None for other messages
+    """
+    import struct
+    if family == socket.AF_INET:
+        data = data[(data[0] & 0x0F) * 4:]
+        exceeded, unreachable = 11, 3
+    else:
+        exceeded, unreachable = 3, 1
+    if len(data) < 8 or data[0] not in (exceeded, unreachable):
+        return None
+    inner = data[8:]
+    header_length = (inner[0] & 0x0F) * 4 if family == socket.AF_INET else 40
+    if len(inner) < header_length + 4:
+        return None
+    source_port = struct.unpack('!H', inner[header_length:header_length + 2])[0]
+    return source_port, data[0] == unreachable
+
+def _read_error_queue(sock, family):
+    """
+    Read one ICMP error queued on a UDP socket with IP_RECVERR.
+    Returns:
+        (offending node address, whether it was an unreachable error, receive time) or None
+        if the queue is empty
+    """
+    import struct
+    try:
+        _, ancdata, _, _ = sock.recvmsg(512, 512, _MSG_ERRQUEUE)
+    except (BlockingIOError, InterruptedError):
+        return None
+    received = _receive_time(ancdata)
+    for level, kind, data in ancdata:
+        if (level, kind) not in ((socket.IPPROTO_IP, _IP_RECVERR), (socket.IPPROTO_IPV6, _IPV6_RECVERR)):
+            continue
+        # struct sock_extended_err followed by the sockaddr of the node that sent the error
+        _, _, icmp_type, _, _, _, _ = struct.unpack('=IBBBBII', data[:16])
+        offender = data[16:]
+        if family == socket.AF_INET:
+            address = socket.inet_ntop(socket.AF_INET, offender[4:8])
+            unreachable = icmp_type == 3
+        else:
+            address = socket.inet_ntop(socket.AF_INET6, offender[8:24])
+            unreachable = icmp_type == 1
+        return address, unreachable, received
+    return None
+
+async def _trace_hops(host, mode='udp', max_hops=TRACE_MAX_HOPS, probes=TRACE_PROBES,
+                      timeout=TRACE_TIMEOUT, port=None):
+    """
+    Send probes for every TTL at once and report hops in TTL order as they complete.
+    Yields:
+        ('target', address, method) first, then ('hop', ttl, [(address or None, rtt ms or None), ...], status)
+        for each hop, where status is 'reached' at the destination, 'unreachable' when a router
+        reports the destination unreachable, and None in between
+    """
+    # At least one probe per hop, and TTLs stay within the IP header's 8 bits
+    probes = max(1, int(probes))
+    max_hops = max(1, min(int(max_hops), 255))
+    loop = asyncio.get_running_loop()
+    if not isinstance(loop, asyncio.selector_events.BaseSelectorEventLoop):
+        # Probes are driven by add_reader/add_writer, which Windows' Proactor loop lacks
+        raise _TraceUnsupported()
+    family, address = await _resolve_address(host)
+    is_linux = sys.platform.startswith('linux')
+
+    listener = _open_icmp_listener(family) if mode == 'tcp' or not is_linux else None
+    if mode == 'tcp' and listener is None:
+        if not is_linux:
+            raise PermissionError("TCP traceroute needs raw ICMP sockets; run as administrator or use mode=udp")
+        # Unprivileged fallback: UDP probes with ICMP errors read from the socket error queue
+        mode = 'udp'
+        method = "udp (unprivileged fallback for tcp)"
+    else:
+        method = mode
+    if mode == 'udp' and listener is None and not is_linux:
+        raise _TraceUnsupported()
+
+    sockets = []
+    by_port = {}  # probe source port -> probe, for raw ICMP matching
+    # Each probe is [future, send time]; times are wall clock to match kernel receive timestamps
+    hops = [[[loop.create_future(), None] for _ in range(probes)] for _ in range(max_hops)]
+
+    def resolve(probe, source, unreachable, received=None):
+        future, sent = probe
+        if not future.done() and sent is not None:
+            rtt = max(0.0, ((received or time.time()) - sent) * 1000)
+            future.set_result((source, rtt, unreachable))
+
+    def on_listener_readable():
+        while True:
+            try:
+                data, ancdata, _, sender = listener.recvmsg(2048, 256)
+            except (BlockingIOError, InterruptedError, OSError):
+                return
+            parsed = _parse_icmp_error(data, family)
+            if parsed and parsed[0] in by_port:
+                resolve(by_port[parsed[0]], sender[0].split('%')[0], parsed[1], _receive_time(ancdata))
+
+    def on_error_queue(sock, probe):
+        try:
+            reply = _read_error_queue(sock, family)
+        except (OSError, ValueError):
+            reply = (None, False, None)
+        if reply is not None:
+            loop.remove_reader(sock.fileno())
+            if reply[0] is not None:
+                resolve(probe, *reply)
+
+    def on_connect_done(sock, probe):
+        import errno
+        loop.remove_writer(sock.fileno())
+        # Connected or reset: the SYN reached the destination itself
+        if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) in (0, errno.ECONNREFUSED):
+            resolve(probe, address, False)
+
+    try:
+        if listener is not None:
+            loop.add_reader(listener.fileno(), on_listener_readable)
+
+        # Set every probe socket up first so the probes themselves leave back to back
+        prepared = []
+        sequence = 0
+        for ttl in range(1, max_hops + 1):
+            for probe in hops[ttl - 1]:
+                sock = socket.socket(family, socket.SOCK_STREAM if mode == 'tcp' else socket.SOCK_DGRAM)
+                sockets.append(sock)
+                sock.setblocking(False)
+                _set_probe_ttl(sock, family, ttl)
+                if mode == 'tcp':
+                    sock.bind(('', 0) if family == socket.AF_INET else ('::', 0))
+                else:
+                    if listener is None:
+                        level, option = ((socket.IPPROTO_IP, _IP_RECVERR) if family == socket.AF_INET
+                                         else (socket.IPPROTO_IPV6, _IPV6_RECVERR))
+                        sock.setsockopt(level, option, 1)
+                        _enable_receive_timestamps(sock)
+                        loop.add_reader(sock.fileno(), on_error_queue, sock, probe)
+                    sock.connect((address, (port or TRACE_UDP_BASE_PORT) + sequence))
+                    sequence += 1
+                by_port[sock.getsockname()[1]] = probe
+                prepared.append((sock, probe))
+
+        for sock, probe in prepared:
+            probe[1] = time.time()
+            try:
+                if mode == 'tcp':
+                    sock.connect_ex((address, port))
+                    loop.add_writer(sock.fileno(), on_connect_done, sock, probe)
+                else:
+                    sock.send(b'terminal-agent')
+            except OSError:
+                pass
+
+        yield 'target', address, method
+
+        # Every probe is already in flight, so the whole trace is bounded by one timeout
+        deadline = loop.time() + timeout
+        for ttl, probes_for_hop in enumerate(hops, start=1):
+            futures = [future for future, _ in probes_for_hop]
+            await asyncio.wait(futures, timeout=max(0.0, deadline - loop.time()))
+            replies = [future.result() if future.done() else (None, None, False) for future in futures]
+            if any(source == address for source, _, _ in replies):
+                status = 'reached'
+            elif any(unreachable for _, _, unreachable in replies):
+                status = 'unreachable'
+            else:
+                status = None
+            yield 'hop', ttl, [(source, rtt) for source, rtt, _ in replies], status
+            if status:
+                break
+    finally:
+        for sock in sockets + ([listener] if listener is not None else []):
+            try:
+                loop.remove_reader(sock.fileno())
+                loop.remove_writer(sock.fileno())
+            except (ValueError, OSError):
+                pass
+            sock.close()
+
+def _format_hop(ttl, replies, status, names):
+    """Format one hop like traceroute: each responding address followed by its round trip times"""
+    parts = []
+    current = None
+    for source, rtt in replies:
+        if source is None:
+            parts.append("*")
+            continue
+        if source != current:
+            current = source
+            name = names.get(source)
+            parts.append(f"{name} ({source})" if name and name != source else source)
+        parts.append(f"{rtt:.2f} ms")
+    if status == 'unreachable':
+        parts.append("(destination unreachable)")
+    return f"{ttl:>2}  " + "  ".join(parts)
+
+async def _reverse_names(addresses, timeout=1.0):
+    """Look up host names for addresses concurrently, giving up after timeout seconds"""
+    loop = asyncio.get_running_loop()
+
+    async def lookup(address):
+        try:
+            name = await asyncio.wait_for(loop.run_in_executor(None, socket.gethostbyaddr, address), timeout)
+            return address, name[0]
+        except (OSError, asyncio.TimeoutError):
+            return address, None
+
+    return dict(await asyncio.gather(*(lookup(address) for address in addresses)))
+
+def trace_hops(host, mode='udp', max_hops=TRACE_MAX_HOPS, probes=TRACE_PROBES, timeout=TRACE_TIMEOUT, port=None):
+    """
+    Trace the route to a host and return the hops as data.
+    Args:
+        host: Hostname or IP address to trace
+        mode: Probe type, 'udp' or 'tcp' (TCP SYN probes need raw socket privileges) (default: udp)
+        max_hops: Maximum TTL probed (default: 30)
+        probes: Probes sent per hop (default: 3)
+        timeout: Seconds to wait for replies to all probes (default: 2.0)
+        port: Destination port (default: 33434 upwards for udp, 80 for tcp)
+    Returns:
+        List of hops, each a dictionary with 'ttl', 'probes' ([(address, rtt ms)], None for no reply)
+        and 'status' ('reached', 'unreachable' or None)
+    """
+    if mode == 'tcp' and port is None:
+        port = TRACE_TCP_PORT
+
+    async def run():
+        hops = []
+        async for event in _trace_hops(host, mode, max_hops, probes, timeout, port):
+            if event[0] == 'hop':
+                hops.append({'ttl': event[1], 'probes': event[2], 'status': event[3]})
+        return hops
+
+    return _run_async(run())
+
+def traceroute_stream(host, mode='udp', max_hops=TRACE_MAX_HOPS, probes=TRACE_PROBES, timeout=TRACE_TIMEOUT,
+                      port=None, resolve_names=False, stop_event=None):
+    """
+    Trace the route to a host, probing every hop at once and yielding hops in order as they complete.
+    Falls back to the system traceroute/tracert where no suitable sockets are available.
+    Args:
+        host: Hostname or IP address to trace
+        mode: Probe type, 'udp' or 'tcp' (default: udp)
+        max_hops: Maximum TTL probed (default: 30)
+        probes: Probes sent per hop (default: 3)
+        timeout: Seconds to wait for replies to all probes (default: 2.0)
+        port: Destination port (default: 33434 upwards for udp, 80 for tcp)
+        resolve_names: Whether to look up host names of the routers (default: False)
+        stop_event: Optional threading.Event that stops the trace when set
+    Yields:
+        Traceroute output lines
+    """
+    if mode not in ('udp', 'tcp'):
+        yield f"Error: Unknown traceroute mode '{mode}' (use udp or tcp)"
+        return
+    try:
+        probes = max(1, int(probes))
+        max_hops = max(1, min(int(max_hops), 255))
+    except ValueError:
+        yield "Error: max_hops and probes must be integers"
+        return
+    if mode == 'tcp' and port is None:
+        port = TRACE_TCP_PORT
+
+    async def trace():
+        async for event in _trace_hops(host, mode, max_hops, probes, timeout, port):
+            if event[0] == 'hop' and resolve_names:
+                names = await _reverse_names({source for source, _ in event[2] if source})
+                event = event + (names,)
+            yield event
+
+    try:
+        for event in _iter_async(trace(), stop_event):
+            if event[0] == 'target':
+                yield f"traceroute to {host} ({event[1]}), {max_hops} hops max, {event[2]} probes"
+            else:
+                yield _format_hop(event[1], event[2], event[3], event[4] if len(event) > 4 else {})
+    except _TraceUnsupported:
+        cmd = ['tracert', host] if is_windows() else ['traceroute', host]
+        yield from _stream_process(cmd, error_prefix="Error performing traceroute")
+    except socket.gaierror:
+        yield f"Hostname could not be resolved: {host}"
+    except PermissionError as e:
+        yield f"Error: {str(e)}"
+    except Exception as e:
+        yield f"Error performing traceroute: {str(e)}"
+
+def traceroute(host, mode='udp', max_hops=TRACE_MAX_HOPS, probes=TRACE_PROBES, timeout=TRACE_TIMEOUT, port=None):
+    """
+    Perform a traceroute to a host.
+    Args:
+        host: Hostname or IP address to trace
+        mode: Probe type, 'udp' or 'tcp' (default: udp)
+        max_hops: Maximum TTL probed (default: 30)
+        probes: Probes sent per hop (default: 3)
+        timeout: Seconds to wait for replies to all probes (default: 2.0)
+        port: Destination port (default: 33434 upwards for udp, 80 for tcp)
+    Returns:
+        Traceroute results
+    """
+    return "\n".join(traceroute_stream(host, mode, max_hops, probes, timeout, port))
+
+# Bytes moved per kernel copy call or buffered read while copying
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+# Files whose sizes match and whose mtimes differ by at most this many seconds count as identical
+# (2 seconds covers FAT timestamp resolution)
+COPY_MTIME_TOLERANCE = 2.0
+# Default number of files copied at once
+COPY_WORKERS = 8
+
+def _copy_file_data(src, dst, on_bytes):
+    """
+    Copy file contents using the fastest path available: copy_file_range, then sendfile,
+    then a buffered chunk loop. on_bytes(count) is called as data is copied.
+    """
+    import errno
+    # Errors meaning "this fast path is unsupported here", as long as nothing was copied yet
+    unsupported = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+        copied = 0
+
+        if hasattr(os, 'copy_file_range'):
+            try:
+                while True:
+                    sent = os.copy_file_range(in_fd, out_fd, COPY_CHUNK_SIZE)
+                    if not sent:
+                        return
+                    copied += sent
+                    on_bytes(sent)
+            except OSError as e:
+                if copied or e.errno not in unsupported:
+                    raise
+
+        if hasattr(os, 'sendfile') and not is_windows():
+            try:
+                while True:
+                    sent = os.sendfile(out_fd, in_fd, copied, COPY_CHUNK_SIZE)
+                    if not sent:
+                        return
+                    copied += sent
+                    on_bytes(sent)
+            except OSError as e:
+                if copied or e.errno not in unsupported:
+                    raise
+
+        buffer = bytearray(min(COPY_CHUNK_SIZE, 1024 * 1024))
+        view = memoryview(buffer)
+        while True:
+            count = fsrc.readinto(buffer)
+            if not count:
+                return
+            fdst.write(view[:count])
+            on_bytes(count)
+
+def _is_identical_copy(src_stat, dst):
+    """Check whether dst already holds a copy of a file (same size, mtime within tolerance)"""
+    try:
+        dst_stat = os.stat(dst)
+    except OSError:
+        return False
+    return (dst_stat.st_size == src_stat.st_size
+            and abs(dst_stat.st_mtime - src_stat.st_mtime) <= COPY_MTIME_TOLERANCE)
+
+def _plan_copy(source, destination):
+    """
+    Expand a copy request into (source file, destination file, stat) jobs and create the
+    destination directories. Globs and directories copy into destination as a directory.
+    """
+    jobs = []
+    is_glob = any(ch in source for ch in '*?[')
+    sources = sorted(glob.glob(source)) if is_glob else [source]
+    if not sources:
+        raise FileNotFoundError(f"No files match '{source}'")
+
+    into_directory = is_glob or len(sources) > 1 or os.path.isdir(destination)
+    if into_directory:
+        os.makedirs(destination, exist_ok=True)
+
+    for src in sources:
+        if os.path.isdir(src):
+            # Like cp -r: an existing destination directory receives a copy named after the source
+            target_root = os.path.join(destination, os.path.basename(os.path.normpath(src))) if into_directory else destination
+            for root, _, files in os.walk(src):
+                target_dir = os.path.join(target_root, os.path.relpath(root, src))
+                os.makedirs(target_dir, exist_ok=True)
+                for name in files:
+                    path = os.path.join(root, name)
+                    jobs.append((path, os.path.join(target_dir, name), os.stat(path)))
+        else:
+            target = os.path.join(destination, os.path.basename(src)) if into_directory else destination
+            jobs.append((src, target, os.stat(src)))
+    return jobs, into_directory or os.path.isdir(sources[0])
+
+def copy_file(source, destination, skip_identical=False, max_workers=COPY_WORKERS, progress=None):
+    """
+    Copy a file, a directory tree or every match of a glob pattern.
+    Args:
+        source: Source file path, directory or glob pattern (e.g. logs/*.log)
+        destination: Destination file path, or directory for directories, globs and existing directories
+        skip_identical: Whether to skip files whose destination has the same size and mtime (default: False)
+        max_workers: Number of files copied concurrently (default: 8)
+        progress: Optional callback receiving a progress message while copying
+    Returns:
+        Success or error message
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    is_glob = any(ch in source for ch in '*?[')
+    if not is_glob and not os.path.exists(source):
+        return f"Error: Source file '{source}' does not exist"
+    
+    try:
+        jobs, bulk = _plan_copy(source, destination)
+        total_files = len(jobs)
+        total_bytes = sum(st.st_size for _, _, st in jobs)
+
+        lock = threading.Lock()
+        state = {'bytes': 0, 'skipped_bytes': 0, 'files': 0, 'reported': 0.0}
+        start = time.perf_counter()
+
+        def report(force=False):
+            # Called with the lock held; throttled to a few updates per second
+            now = time.perf_counter()
+            if progress is None or (not force and now - state['reported'] < 0.2):
+                return
+            state['reported'] = now
+            rate = state['bytes'] / max(now - start, 1e-6)
+            done_bytes = state['bytes'] + state['skipped_bytes']
+            progress(f"Copying: {state['files']}/{total_files} files, "
+                     f"{_format_size(done_bytes)}/{_format_size(total_bytes)}, {_format_size(rate)}/s")
+
+        def on_bytes(count):
+            with lock:
+                state['bytes'] += count
+                report()
+
+        def copy_one(src, dst, st):
+            if skip_identical and _is_identical_copy(st, dst):
+                with lock:
+                    state['skipped_bytes'] += st.st_size
+                    state['files'] += 1
+                return 'skipped'
+            _copy_file_data(src, dst, on_bytes)
+            shutil.copystat(src, dst)
+            with lock:
+                state['files'] += 1
+                report()
+            return 'copied'
+
+        copied = skipped = 0
+        failures = []
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(copy_one, *job): job for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    if future.result() == 'skipped':
+                        skipped += 1
+                    else:
+                        copied += 1
+                except Exception as e:
+                    failures.append((futures[future][0], e))
+        with lock:
+            report(force=True)
+
+        elapsed = time.perf_counter() - start
+        if not bulk and copied == 1:
+            return f"File copied successfully from {source} to {destination}"
+        if not bulk and skipped == 1:
+            return f"Skipped identical file: {destination}"
+        if not bulk and failures:
+            return f"Error copying file: {str(failures[0][1])}"
+
+        result = [f"Copied {copied} of {total_files} files ({_format_size(state['bytes'])}) to {destination} "
+                  f"in {elapsed:.2f} seconds ({_format_size(state['bytes'] / max(elapsed, 1e-6))}/s)"]
+        if skipped:
+            result.append(f"Skipped {skipped} identical files")
+        if failures:
+            result.append(f"Failed to copy {len(failures)} files:")
+            result.extend(f"  {path}: {str(error)}" for path, error in failures)
+        return "\n".join(result)
+    except Exception as e:
+        return f"Error copying file: {str(e)}"
+
+# Optional sysinfo sections that are slow to collect, loaded only when requested
+SYSINFO_SECTIONS = ('disks', 'users', 'sensors', 'details')
+
+def _cpu_model():
+    """CPU model name; platform.processor() is empty or just the architecture on many systems"""
+    if sys.platform.startswith('linux'):
+        try:
+            with open('/proc/cpuinfo', 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    if line.lower().startswith(('model name', 'hardware', 'cpu model')):
+                        return line.split(':', 1)[1].strip()
+        except OSError:
+            pass
+    return platform.processor() or platform.machine()
+
+class _SystemFacts:
+    """
+    Collect static system facts once per session, dynamic facts cheaply through psutil on
+    every call, and expensive optional sections lazily on first request.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.static = None
+        self.sections = {}
+
+    def _collect_static(self):
+        uname = platform.uname()
+        return {
+            'system': uname.system,
+            'node': uname.node,
+            'release': uname.release,
+            'version': uname.version,
+            'machine': uname.machine,
+            'processor': _cpu_model(),
+            'physical_cores': psutil.cpu_count(logical=False),
+            'logical_cores': psutil.cpu_count(logical=True),
+            'memory_total': psutil.virtual_memory().total,
+            'boot_time': psutil.boot_time(),
+            'python': platform.python_version(),
+        }
+
+    def _collect_dynamic(self):
+        memory = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+        facts = {
+            'uptime': time.time() - self.static['boot_time'],
+            'cpu_percent': psutil.cpu_percent(None),
+            'memory_used': memory.total - memory.available,
+            'memory_available': memory.available,
+            'memory_percent': memory.percent,
+            'swap_used': swap.used,
+            'swap_total': swap.total,
+            'load_average': None,
+            'cpu_freq_mhz': None,
+        }
+        try:
+            facts['load_average'] = list(psutil.getloadavg())
+        except (AttributeError, OSError):
+            pass
+        try:
+            freq = psutil.cpu_freq()
+            facts['cpu_freq_mhz'] = round(freq.current) if freq else None
+        except (AttributeError, OSError, NotImplementedError):
+            pass
+        return facts
+
+    def _collect_section(self, name):
+        if name == 'disks':
+            disks = []
+            for part in psutil.disk_partitions(all=False):
+                try:
+                    usage = psutil.disk_usage(part.mountpoint)
+                except (OSError, PermissionError):
+                    continue
+                disks.append({'device': part.device, 'mountpoint': part.mountpoint, 'fstype': part.fstype,
+                              'total': usage.total, 'used': usage.used, 'percent': usage.percent})
+            return disks
+        if name == 'users':
+            return [{'name': user.name, 'terminal': user.terminal, 'host': user.host, 'started': user.started}
+                    for user in psutil.users()]
+        if name == 'sensors':
+            sensors = {'temperatures': {}, 'battery': None}
+            if hasattr(psutil, 'sensors_temperatures'):
+                try:
+                    for chip, readings in psutil.sensors_temperatures().items():
+                        sensors['temperatures'][chip] = [{'label': r.label or chip, 'current': r.current}
+                                                         for r in readings]
+                except (OSError, NotImplementedError):
+                    pass
+            if hasattr(psutil, 'sensors_battery'):
+                battery = psutil.sensors_battery()
+                if battery is not None:
+                    sensors['battery'] = {'percent': battery.percent, 'plugged': battery.power_plugged}
+            return sensors
+        if name == 'details':
+            if is_windows():
+                result = subprocess.run(['systeminfo'], capture_output=True, text=True)
+                return result.stdout
+            if hasattr(platform, 'freedesktop_os_release'):
+                try:
+                    return platform.freedesktop_os_release().get('PRETTY_NAME', '')
+                except OSError:
+                    pass
+            return platform.platform()
+        raise ValueError(f"Unknown sysinfo section '{name}'. Use one of: {', '.join(SYSINFO_SECTIONS)}")
+
+    def facts(self, sections=(), refresh=False):
+        """Return a dictionary with 'static', 'dynamic' and each requested section"""
+        with self.lock:
+            if self.static is None or refresh:
+                self.static = self._collect_static()
+            result = {'static': self.static, 'dynamic': self._collect_dynamic()}
+            for name in sections:
+                if name not in self.sections or refresh:
+                    self.sections[name] = self._collect_section(name)
+                result[name] = self.sections[name]
+        return result
+
+_system_facts = _SystemFacts()
+
+def get_system_facts(sections=(), refresh=False):
+    """
+    Get system facts as structured data. Static facts are collected once per session and
+    optional sections on first request; pass refresh=True to collect them again.
+    Args:
+        sections: Optional sections to include: disks, users, sensors, details
+        refresh: Whether to re-collect cached facts (default: False)
+    Returns:
+        Dictionary with 'static', 'dynamic' and one key per requested section
+    """
+    return _system_facts.facts(tuple(sections or ()), refresh)
+
+def _format_duration(seconds):
+    days, seconds = divmod(int(seconds), 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes = seconds // 60
+    return f"{days}d {hours}h {minutes}m" if days else f"{hours}h {minutes}m"
+
+def get_system_info(sections=(), format='text', refresh=False):
+    """
+    Get system information.
+    Args:
+        sections: Optional sections to include: disks, users, sensors, details (or 'all')
+        format: 'text' or 'json' (default: text)
+        refresh: Whether to re-collect cached facts (default: False)
+    Returns:
+        System information
+    """
+    try:
+        if sections == 'all' or 'all' in (sections or ()):
+            sections = SYSINFO_SECTIONS
+        facts = get_system_facts(sections, refresh)
+        if format == 'json':
+            return json.dumps(facts, indent=2, default=str)
+
+        static, dynamic = facts['static'], facts['dynamic']
         info = []
-        info.append(f"System: {platform.system()}")
-        info.append(f"Node: {platform.node()}")
-        info.append(f"Release: {platform.release()}")
-        info.append(f"Version: {platform.version()}")
-        info.append(f"Machine: {platform.machine()}")
-        info.append(f"Processor: {platform.processor()}")
-        
-        if is_windows():
-            result = subprocess.run(['systeminfo'], capture_output=True, text=True)
+        info.append(f"System: {static['system']}")
+        info.append(f"Node: {static['node']}")
+        info.append(f"Release: {static['release']}")
+        info.append(f"Version: {static['version']}")
+        info.append(f"Machine: {static['machine']}")
+        info.append(f"Processor: {static['processor']}")
+        info.append(f"Cores: {static['physical_cores']} physical, {static['logical_cores']} logical")
+        info.append(f"Python: {static['python']}")
+        info.append(f"Uptime: {_format_duration(dynamic['uptime'])}")
+        cpu = f"CPU: {dynamic['cpu_percent']:.1f}%"
+        if dynamic['cpu_freq_mhz']:
+            cpu += f" at {dynamic['cpu_freq_mhz']} MHz"
+        info.append(cpu)
+        if dynamic['load_average'] is not None:
+            info.append("Load average: " + " ".join(f"{load:.2f}" for load in dynamic['load_average']))
+        info.append(f"Memory: {_format_size(dynamic['memory_used'])} used of {_format_size(static['memory_total'])} "
+                    f"({dynamic['memory_percent']:.1f}%), {_format_size(dynamic['memory_available'])} available")
+        if dynamic['swap_total']:
+            info.append(f"Swap: {_format_size(dynamic['swap_used'])} used of {_format_size(dynamic['swap_total'])}")
+
+        if 'disks' in facts:
+            info.append("\nDisks:")
+            for disk in facts['disks']:
+                info.append(f"  {disk['mountpoint']:<20} {disk['fstype']:<8} {_format_size(disk['used']):>10} of "
+                            f"{_format_size(disk['total']):>10} ({disk['percent']:.0f}%)  {disk['device']}")
+        if 'users' in facts:
+            info.append("\nLogged in users:")
+            for user in facts['users'] or []:
+                started = datetime.datetime.fromtimestamp(user['started']).strftime('%Y-%m-%d %H:%M')
+                info.append(f"  {user['name']:<16} {user['terminal'] or '-':<10} {user['host'] or '-':<20} {started}")
+            if not facts['users']:
+                info.append("  (none)")
+        if 'sensors' in facts:
+            info.append("\nSensors:")
+            for chip, readings in facts['sensors']['temperatures'].items():
+                for reading in readings:
+                    info.append(f"  {reading['label']:<24} {reading['current']:.1f} C")
+            battery = facts['sensors']['battery']
+            if battery:
+                info.append(f"  Battery: {battery['percent']:.0f}%{' (plugged in)' if battery['plugged'] else ''}")
+            if not facts['sensors']['temperatures'] and not battery:
+                info.append("  (no sensors available)")
+        if 'details' in facts:
             info.append("\nDetailed System Information:")
-            info.append(result.stdout)
-            
+            info.append(facts['details'])
+
         return "\n".join(info)
+    except ValueError as e:
+        return f"Error: {str(e)}"
     except Exception as e:
         return f"Error getting system information: {str(e)}"
 
@@ -319,12 +3089,237 @@ def get_disk_usage(path='.'):
     except Exception as e:
         return f"Error getting disk usage: {str(e)}"
 
-def list_processes():
+# Number of entries shown in each section of the disk usage report
+DU_TOP = 10
+# Largest files remembered per directory; bounds how many files the report can list
+DU_FILES_PER_DIR = 100
+DU_CACHE_VERSION = 3
+
+def _usage_listing(path, apparent):
+    """
+    Size the files of one directory.
+    Returns:
+        (subdirectory names, file count, bytes of singly linked files,
+         (st_dev, st_ino, bytes) of hard-linked files, largest (bytes, name) files, biggest first)
+    """
+    import heapq
+    subdirs = []
+    file_count = 0
+    own_bytes = 0
+    links = []
+    largest = []
+    cache_dir = os.path.normpath(CACHE_DIR)
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    # Scan paths may contain "." components, so compare normalized paths
+                    if os.path.normpath(entry.path) != cache_dir:
+                        subdirs.append(entry.name)
+                    continue
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            # Allocated blocks like du, unless apparent sizes were asked for (or unavailable)
+            blocks = getattr(st, 'st_blocks', None)
+            size = st.st_size if apparent or blocks is None else blocks * 512
+            file_count += 1
+            if st.st_nlink > 1:
+                links.append((st.st_dev, st.st_ino, size))
+            else:
+                own_bytes += size
+            if len(largest) < DU_FILES_PER_DIR:
+                heapq.heappush(largest, (size, entry.name))
+            elif size > largest[0][0]:
+                heapq.heapreplace(largest, (size, entry.name))
+    return (tuple(sorted(subdirs)), file_count, own_bytes, tuple(links), tuple(sorted(largest, reverse=True)))
+
+def _scan_usage(directory, apparent=False, max_workers=None, stop_event=None, verify=False):
+    """
+    Size a directory tree in parallel, re-listing only directories that changed since the
+    cached scan. Yields progress messages.
+    Args:
+        verify: Whether to re-list every directory instead of trusting directory mtimes, catching
+                files that grew or shrank in place (a directory's mtime only changes when entries
+                are added or removed)
+    Returns:
+        (listings by relative directory, statistics dictionary, whether the scan completed)
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    root = os.path.abspath(directory)
+    kind = "usage-apparent" if apparent else "usage"
+    state = _load_cache(kind, root, DU_CACHE_VERSION)
+    cached_dirs = state['dirs'] if state is not None else {}
+    dirs = {}  # relative dir -> (mtime_ns, scanned_ns, listing)
+    stats = {'dirs': 0, 'relisted': 0, 'files': 0, 'bytes': 0, 'elapsed': 0.0}
+
+    def visit(rel_dir):
+        path = os.path.join(root, rel_dir)
+        mtime_ns = os.stat(path).st_mtime_ns
+        cached = cached_dirs.get(rel_dir)
+        if (not verify and cached is not None and cached[0] == mtime_ns
+                and cached[1] - mtime_ns >= CATALOG_MTIME_SLACK_NS):
+            return cached, False
+        return (mtime_ns, time.time_ns(), _usage_listing(path, apparent)), True
+
+    start = time.perf_counter()
+    reported = start
+    complete = False
+    workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(visit, '.'): '.'}
+        try:
+            while pending:
+                if stop_event is not None and stop_event.is_set():
+                    break
+                done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rel_dir = pending.pop(future)
+                    try:
+                        entry, relisted = future.result()
+                    except OSError:
+                        continue
+                    dirs[rel_dir] = entry
+                    listing = entry[2]
+                    stats['dirs'] += 1
+                    stats['relisted'] += relisted
+                    stats['files'] += listing[1]
+                    stats['bytes'] += listing[2] + sum(link[2] for link in listing[3])
+                    for name in listing[0]:
+                        child = os.path.normpath(os.path.join(rel_dir, name))
+                        pending[executor.submit(visit, child)] = child
+                now = time.perf_counter()
+                if now - reported >= 1.0:
+                    reported = now
+                    yield (f"Scanning: {stats['dirs']} directories ({stats['relisted']} re-listed), "
+                           f"{stats['files']} files, {_format_size(stats['bytes'])} so far")
+            else:
+                complete = True
+        finally:
+            for future in pending:
+                future.cancel()
+
+    stats['elapsed'] = time.perf_counter() - start
+    # A complete scan replaces the cache, dropping deleted directories; a partial one only adds to it.
+    # Nothing to write when every listing came from the cache and no directory disappeared.
+    if stats['relisted'] or (complete and len(dirs) != len(cached_dirs)):
+        _save_cache(kind, root, DU_CACHE_VERSION, {'dirs': dirs if complete else dict(cached_dirs, **dirs)})
+    return dirs, stats, complete
+
+def _usage_report(directory, dirs, stats, top):
+    """Aggregate subtree totals (hard links counted once) and render the top-N report"""
+    import heapq
+
+    def display(rel_dir):
+        return os.path.normpath(os.path.join(directory, rel_dir))
+
+    own = {}
+    seen_links = set()
+    file_count = 0
+    for rel_dir in sorted(dirs):
+        listing = dirs[rel_dir][2]
+        size = listing[2]
+        for dev, ino, link_size in listing[3]:
+            if (dev, ino) not in seen_links:
+                seen_links.add((dev, ino))
+                size += link_size
+        own[rel_dir] = size
+        file_count += listing[1]
+
+    # Fold subtree totals upwards, deepest directories first
+    totals = dict(own)
+    for rel_dir in sorted(dirs, key=lambda d: 0 if d == '.' else d.count(os.sep) + 1, reverse=True):
+        if rel_dir != '.':
+            parent = os.path.dirname(rel_dir) or '.'
+            if parent in totals:
+                totals[parent] += totals[rel_dir]
+    total = totals.get('.', 0)
+
+    def share(size):
+        return f"{100 * size / total:5.1f}%" if total else "    -"
+
+    result = [f"Disk usage of {os.path.abspath(directory)}: {_format_size(total)} in {file_count} files, "
+              f"{len(dirs)} directories (hard links counted once)",
+              f"Scanned in {stats['elapsed']:.2f} seconds, {stats['relisted']} of {stats['dirs']} directories re-listed"]
+
+    children = [d for d in dirs if d != '.' and (os.path.dirname(d) or '.') == '.']
+    result.append("\nLargest subdirectories:")
+    for rel_dir in heapq.nlargest(top, children, key=totals.get):
+        result.append(f"  {_format_size(totals[rel_dir]):>10} {share(totals[rel_dir])}  {display(rel_dir)}")
+
+    result.append("\nDirectories holding the most data directly:")
+    for rel_dir, size in heapq.nlargest(top, own.items(), key=lambda item: item[1]):
+        result.append(f"  {_format_size(size):>10} {share(size)}  {display(rel_dir)}")
+
+    # Bounded heap over each directory's largest files, which are stored biggest first
+    largest = []
+    for rel_dir, entry in dirs.items():
+        for size, name in entry[2][4]:
+            if len(largest) < top:
+                heapq.heappush(largest, (size, rel_dir, name))
+            elif size > largest[0][0]:
+                heapq.heapreplace(largest, (size, rel_dir, name))
+            else:
+                break
+    result.append("\nLargest files:")
+    for size, rel_dir, name in sorted(largest, reverse=True):
+        result.append(f"  {_format_size(size):>10} {share(size)}  {os.path.join(display(rel_dir), name)}")
+    return result
+
+def disk_usage_stream(directory='.', top=DU_TOP, apparent=False, max_workers=None, stop_event=None, verify=False):
+    """
+    Find what is using space below a directory, streaming progress while it scans.
+    Directory listings are cached by mtime, so repeated scans only re-list what changed.
+    Args:
+        directory: Directory to analyze (default: current directory)
+        top: Number of entries in each section of the report (default: 10)
+        apparent: Whether to report file sizes instead of allocated disk space (default: False)
+        max_workers: Number of scanning threads (default: based on CPU count)
+        stop_event: Optional threading.Event that stops the scan when set
+        verify: Whether to re-list every directory to catch files that grew or shrank in place
+                (default: False); otherwise such files keep their cached size until their directory changes
+    Yields:
+        Progress lines, then the report
+    """
+    if not os.path.isdir(directory):
+        yield f"Error: Directory '{directory}' does not exist"
+        return
+    try:
+        top = max(1, min(int(top), DU_FILES_PER_DIR))
+        dirs, stats, complete = yield from _scan_usage(directory, apparent, max_workers, stop_event, verify)
+        if not complete:
+            return
+        yield from _usage_report(directory, dirs, stats, top)
+    except Exception as e:
+        yield f"Error analyzing disk usage: {str(e)}"
+
+def analyze_disk_usage(directory='.', top=DU_TOP, apparent=False, max_workers=None, verify=False):
+    """
+    Find what is using space below a directory: the largest subdirectories and files.
+    Args:
+        directory: Directory to analyze (default: current directory)
+        top: Number of entries in each section of the report (default: 10)
+        apparent: Whether to report file sizes instead of allocated disk space (default: False)
+        max_workers: Number of scanning threads (default: based on CPU count)
+        verify: Whether to re-list every directory to catch in-place size changes (default: False)
+    Returns:
+        Disk usage report
+    """
+    lines = [line for line in disk_usage_stream(directory, top, apparent, max_workers, verify=verify)
+             if not line.startswith("Scanning: ")]
+    return "\n".join(lines)
+
+def list_processes(format='text'):
     """
     List running processes.
+    Args:
+        format: 'text' for the system's own listing (ps aux or tasklist), or 'json'/'csv' rows
     Returns:
         List of running processes
     """
+    if format != 'text':
+        return get_running_processes(format)
     try:
         if is_windows():
             result = subprocess.run(['tasklist'], capture_output=True, text=True)
@@ -429,21 +3424,30 @@ def telnet(host, port=23, timeout=10):
     """
     Connect to a remote host using telnet protocol.
     Args:
-        host: Hostname or IP address to connect to
-        port: Port number to connect to (default: 23)
+        host: Hostname or IP address to connect to, or a CIDR range/host:port list/@targetsfile
+        port: Port number to connect to (default: 23, or the port of targets that name none)
         timeout: Connection timeout in seconds (default: 10)
     Returns:
-        Connection status message
+        Connection status message, or a connectivity table when several targets are given
     """
+    if is_multi_target(host):
+        return check_connectivity(host, port, timeout)
+    if host.count(":") == 1 or host.startswith("["):
+        try:
+            (host, port), = expand_endpoints(host, port)
+        except ValueError:
+            return f"Invalid port number in {host}"
+
     try:
-        import socket
-        
+        port = int(port)
+        family, address = _dns_cache.resolve(host)[0]
+
         # Create a socket connection
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock = socket.socket(family, socket.SOCK_STREAM)
         sock.settimeout(timeout)
         
         # Attempt to connect
-        result = sock.connect_ex((host, int(port)))
+        result = sock.connect_ex((address, port))
         
         if result == 0:
             sock.close()
@@ -466,178 +3470,1334 @@ def telnet(host, port=23, timeout=10):
         except:
             pass
 
-def http_get_request(url, params=None, headers=None, timeout=30):
+# Defaults for the pooled HTTP session layer shared by the get/post commands
+HTTP_POOL_SIZE = 10
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.3
+HTTP_RETRY_STATUSES = (502, 503, 504)
+HTTP_IDLE_TIMEOUT = 300
+
+_dns_pool_classes = None
+
+def _dns_cached_pool_classes():
+    """urllib3 connection pool classes whose connections resolve hosts through the shared DNS cache"""
+    global _dns_pool_classes
+    if _dns_pool_classes is not None:
+        return _dns_pool_classes
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+    from urllib3.exceptions import NewConnectionError
+    try:
+        from urllib3.exceptions import NameResolutionError
+    except ImportError:
+        # urllib3 1.x reports resolution failures as NewConnectionError
+        NameResolutionError = None
+
+    class CachedDNSMixin:
+        def _new_conn(self):
+            # urllib3 connects to self._dns_host; point it at the cached address for this
+            # connect only, so the Host header, SNI and certificate checks still use the name
+            hostname = getattr(self, '_dns_host', None)
+            if not hostname:
+                return super()._new_conn()
+            try:
+                self._dns_host = _dns_cache.resolve(hostname.rstrip('.'))[0][1]
+            except socket.gaierror as e:
+                if NameResolutionError is None:
+                    raise NewConnectionError(self, f"Failed to establish a new connection: {e}") from e
+                raise NameResolutionError(hostname, self, e) from e
+            try:
+                return super()._new_conn()
+            finally:
+                self._dns_host = hostname
+
+    class CachedDNSHTTPConnection(CachedDNSMixin, HTTPConnection):
+        pass
+
+    class CachedDNSHTTPSConnection(CachedDNSMixin, HTTPSConnection):
+        pass
+
+    class CachedDNSHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = CachedDNSHTTPConnection
+
+    class CachedDNSHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = CachedDNSHTTPSConnection
+
+    _dns_pool_classes = {'http': CachedDNSHTTPConnectionPool, 'https': CachedDNSHTTPSConnectionPool}
+    return _dns_pool_classes
+
+class _HTTPSessionPool:
+    """Keep one requests.Session per scheme://host:port so repeated requests reuse connections"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sessions = {}  # origin -> {'session', 'last_used', 'requests', 'reused'}
+        self.pool_size = HTTP_POOL_SIZE
+        self.retries = HTTP_RETRIES
+        self.backoff_factor = HTTP_BACKOFF_FACTOR
+        self.idle_timeout = HTTP_IDLE_TIMEOUT
+        self.seen_connections = {}  # id(urllib3 pool) -> connections it had opened so far
+
+    @staticmethod
+    def origin(url):
+        from urllib.parse import urlsplit
+        parts = urlsplit(url)
+        return f"{parts.scheme.lower()}://{(parts.netloc or '').lower()}"
+
+    def _new_session(self):
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        # Retry connection failures and gateway errors with exponential backoff; POST is not
+        # in urllib3's default idempotent methods, so it is never resent automatically
+        retry = Retry(total=self.retries, backoff_factor=self.backoff_factor,
+                      status_forcelist=HTTP_RETRY_STATUSES, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        adapter.poolmanager.pool_classes_by_scheme = _dns_cached_pool_classes()
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def evict_idle(self):
+        """Close sessions that have not been used within the idle timeout"""
+        now = time.monotonic()
+        with self.lock:
+            idle = [origin for origin, entry in self.sessions.items() if now - entry['last_used'] > self.idle_timeout]
+            for origin in idle:
+                self.sessions.pop(origin)['session'].close()
+        return len(idle)
+
+    def request(self, method, url, **kwargs):
+        """Send a request through the origin's pooled session. Returns (response, reused)."""
+        self.evict_idle()
+        origin = self.origin(url)
+        with self.lock:
+            entry = self.sessions.get(origin)
+            if entry is None:
+                entry = self.sessions[origin] = {'session': self._new_session(), 'requests': 0, 'reused': 0}
+            entry['last_used'] = time.monotonic()
+            session = entry['session']
+
+        response = session.request(method, url, **kwargs)
+
+        # A request reused a keep-alive connection if its pool opened no new connection for it
+        pool = getattr(response.raw, '_pool', None)
+        reused = None
+        if pool is not None:
+            with self.lock:
+                opened = getattr(pool, 'num_connections', 0)
+                reused = opened == self.seen_connections.get(id(pool), 0)
+                self.seen_connections[id(pool)] = opened
+        with self.lock:
+            entry['requests'] += 1
+            entry['reused'] += 1 if reused else 0
+        return response, reused
+
+    def close_all(self):
+        with self.lock:
+            for entry in self.sessions.values():
+                entry['session'].close()
+            self.sessions.clear()
+            self.seen_connections.clear()
+
+_http_sessions = _HTTPSessionPool()
+
+def configure_http_sessions(pool_size=None, retries=None, backoff_factor=None, idle_timeout=None):
+    """
+    Change the settings of the pooled HTTP sessions. Existing sessions are closed so the
+    new settings apply to the next request.
+    Args:
+        pool_size: Maximum keep-alive connections kept per host
+        retries: Number of retries for connection errors and 502/503/504 responses
+        backoff_factor: Exponential backoff factor between retries, in seconds
+        idle_timeout: Seconds after which an unused host session is closed
+    Returns:
+        Current session settings
+    """
+    with _http_sessions.lock:
+        if pool_size is not None:
+            _http_sessions.pool_size = max(1, int(pool_size))
+        if retries is not None:
+            _http_sessions.retries = max(0, int(retries))
+        if backoff_factor is not None:
+            _http_sessions.backoff_factor = max(0.0, float(backoff_factor))
+        if idle_timeout is not None:
+            _http_sessions.idle_timeout = max(0.0, float(idle_timeout))
+    _http_sessions.close_all()
+    return (f"Pool size: {_http_sessions.pool_size}\n"
+            f"Retries: {_http_sessions.retries} (backoff factor {_http_sessions.backoff_factor})\n"
+            f"Idle timeout: {_http_sessions.idle_timeout:.0f} seconds")
+
+def get_http_session_stats():
+    """
+    Show the pooled HTTP sessions and how often their connections were reused.
+    Returns:
+        Table of hosts with request and connection reuse counts
+    """
+    _http_sessions.evict_idle()
+    now = time.monotonic()
+    with _http_sessions.lock:
+        entries = sorted(_http_sessions.sessions.items())
+        if not entries:
+            return "No open HTTP sessions"
+        result = [f"{'Host':<40} {'Requests':>8} {'Reused':>8} {'Idle':>8}"]
+        result.append("-" * 67)
+        for origin, entry in entries:
+            result.append(f"{origin:<40} {entry['requests']:>8} {entry['reused']:>8} {now - entry['last_used']:>7.0f}s")
+    return "\n".join(result)
+
+def _format_http_response(url, response, reused, cache_status=None, format='text'):
+    """Format status, timing, connection reuse, cache status and headers of an HTTP response"""
+    record = HTTPResult(url, response.status_code, round(response.elapsed.total_seconds(), 4), reused,
+                        cache_status, dict(response.headers))
+    if format != 'text':
+        return render_records([record], HTTPResult, format)
+
+    result = []
+    result.append(f"Status Code: {record.status_code}")
+    result.append(f"Response Time: {record.elapsed:.2f} seconds")
+    if reused is not None:
+        result.append(f"Connection: {'reused (keep-alive)' if reused else 'new'}")
+    if cache_status is not None:
+        result.append(f"Cache: {cache_status}")
+    
+    # Add headers to the result
+    result.append("\nResponse Headers:")
+    for key, value in record.headers.items():
+        result.append(f"  {key}: {value}")
+    
+    return "\n".join(result)
+
+# Maximum total size of cached GET responses (bodies plus headers), in bytes
+HTTP_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Status codes whose responses may be stored
+HTTP_CACHEABLE_STATUSES = (200, 203, 300, 301, 410)
+# Cap on heuristic freshness for responses that only carry Last-Modified, in seconds
+HTTP_HEURISTIC_MAX_AGE = 24 * 3600
+
+class _CachedResponse:
+    """Stored GET response; also stands in for a requests.Response when formatting cache hits"""
+
+    __slots__ = ('status_code', 'headers', 'content', 'elapsed', 'stored_at', 'lifetime', 'vary', 'size')
+
+    def __init__(self, response, request_headers, lifetime):
+        self.status_code = response.status_code
+        self.headers = requests.structures.CaseInsensitiveDict(response.headers)
+        self.content = response.content
+        self.elapsed = datetime.timedelta(0)
+        self.lifetime = lifetime
+        # Initial age reported by upstream caches counts against freshness
+        try:
+            initial_age = max(0, int(self.headers.get('Age', 0)))
+        except ValueError:
+            initial_age = 0
+        self.stored_at = time.time() - initial_age
+        self.vary = _vary_values(self.headers, request_headers)
+        self.size = len(self.content) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+    @property
+    def age(self):
+        return time.time() - self.stored_at
+
+    def is_fresh(self):
+        return self.age < self.lifetime
+
+def _cache_directives(headers):
+    """Parse a Cache-Control header into a dictionary of lowercase directives"""
+    directives = {}
+    for part in headers.get('Cache-Control', '').split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+def _vary_values(response_headers, request_headers):
+    """Return the request header values a response varies on, or None if it varies on everything"""
+    names = [n.strip().lower() for n in response_headers.get('Vary', '').split(',') if n.strip()]
+    if '*' in names:
+        return None
+    request_headers = {k.lower(): v for k, v in (request_headers or {}).items()}
+    return tuple((name, request_headers.get(name)) for name in names)
+
+def _freshness_lifetime(response):
+    """Seconds a response stays fresh per Cache-Control, Expires or the Last-Modified heuristic"""
+    from email.utils import parsedate_to_datetime
+
+    directives = _cache_directives(response.headers)
+    if 'no-cache' in directives:
+        return 0
+    if 'max-age' in directives:
+        try:
+            return max(0, int(directives['max-age']))
+        except ValueError:
+            return 0
+    try:
+        date = parsedate_to_datetime(response.headers['Date']) if 'Date' in response.headers else None
+        if 'Expires' in response.headers:
+            expires = parsedate_to_datetime(response.headers['Expires'])
+            base = date or datetime.datetime.now(expires.tzinfo)
+            return max(0, (expires - base).total_seconds())
+        if 'Last-Modified' in response.headers:
+            # RFC 9111 heuristic: a tenth of the time since the last modification
+            modified = parsedate_to_datetime(response.headers['Last-Modified'])
+            base = date or datetime.datetime.now(modified.tzinfo)
+            return min(HTTP_HEURISTIC_MAX_AGE, max(0, (base - modified).total_seconds() / 10))
+    except (TypeError, ValueError, IndexError):
+        return 0
+    return 0
+
+class _HTTPCache:
+    """LRU cache of GET responses bounded by total size in bytes"""
+
+    def __init__(self, max_bytes=HTTP_CACHE_MAX_BYTES):
+        from collections import OrderedDict
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.stats = {'hit': 0, 'revalidated': 0, 'miss': 0}
+
+    def get(self, url, request_headers):
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is None or entry.vary is None:
+                return None
+            request_headers = {k.lower(): v for k, v in (request_headers or {}).items()}
+            if any(request_headers.get(name) != value for name, value in entry.vary):
+                return None
+            self.entries.move_to_end(url)
+            return entry
+
+    def store(self, url, response, request_headers):
+        """Store a response if its status and Cache-Control allow it. Returns the entry or None."""
+        directives = _cache_directives(response.headers)
+        if response.status_code not in HTTP_CACHEABLE_STATUSES or 'no-store' in directives:
+            return None
+        lifetime = _freshness_lifetime(response)
+        has_validator = 'ETag' in response.headers or 'Last-Modified' in response.headers
+        if lifetime <= 0 and not has_validator:
+            return None
+        entry = _CachedResponse(response, request_headers, lifetime)
+        if entry.vary is None or entry.size > self.max_bytes:
+            return None
+        with self.lock:
+            self._remove(url)
+            self.entries[url] = entry
+            self.total_bytes += entry.size
+            while self.total_bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+        return entry
+
+    def refresh(self, url, entry, response):
+        """Apply a 304 Not Modified: merge its headers and restart the freshness clock"""
+        with self.lock:
+            for key, value in response.headers.items():
+                if key.lower() not in ('content-length', 'transfer-encoding', 'content-encoding'):
+                    entry.headers[key] = value
+            entry.lifetime = _freshness_lifetime(entry)
+            entry.stored_at = time.time()
+            if url in self.entries:
+                self.entries.move_to_end(url)
+
+    def _remove(self, url):
+        entry = self.entries.pop(url, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def count(self, outcome):
+        with self.lock:
+            self.stats[outcome] += 1
+
+_http_cache = _HTTPCache()
+
+def get_http_cache_stats():
+    """
+    Show HTTP cache usage and hit, revalidation and miss counts.
+    Returns:
+        HTTP cache statistics
+    """
+    with _http_cache.lock:
+        stats = dict(_http_cache.stats)
+        entries = len(_http_cache.entries)
+        used = _http_cache.total_bytes
+    lookups = sum(stats.values())
+    hit_rate = 100 * (stats['hit'] + stats['revalidated']) / lookups if lookups else 0
+    return (f"Entries: {entries} ({_format_size(used)} of {_format_size(_http_cache.max_bytes)})\n"
+            f"Hits: {stats['hit']}\n"
+            f"Revalidated (304): {stats['revalidated']}\n"
+            f"Misses: {stats['miss']}\n"
+            f"Served from cache: {hit_rate:.1f}%")
+
+def clear_http_cache():
+    """
+    Remove all cached HTTP responses.
+    Returns:
+        Confirmation message
+    """
+    _http_cache.clear()
+    return "HTTP cache cleared"
+
+def http_get_request(url, params=None, headers=None, timeout=30, use_cache=True, format='text'):
+    """
+    Send an HTTP GET request to the specified URL.
+    Args:
+        url: URL to send the request to
+        params: Optional query parameters as a dictionary
+        headers: Optional HTTP headers as a dictionary
+        timeout: Request timeout in seconds (default: 30)
+        use_cache: Whether to answer from and revalidate the HTTP response cache (default: True)
+        format: 'text', 'json' or 'csv' (default: text)
+    Returns:
+        Response content and status information
+    """
+    try:
+        # Convert headers string to dictionary if provided as a string
+        if headers and isinstance(headers, str):
+            try:
+                headers = json.loads(headers)
+            except json.JSONDecodeError:
+                return "Error: Invalid headers format. Please provide valid JSON."
+        
+        # Convert params string to dictionary if provided as a string
+        if params and isinstance(params, str):
+            try:
+                params = json.loads(params)
+            except json.JSONDecodeError:
+                return "Error: Invalid params format. Please provide valid JSON."
+        
+        if not use_cache:
+            # Send the GET request through the host's pooled session
+            response, reused = _http_sessions.request('GET', url, params=params, headers=headers, timeout=timeout)
+            return _format_http_response(response.url, response, reused, format=format)
+
+        cache_key = requests.Request('GET', url, params=params).prepare().url
+        entry = _http_cache.get(cache_key, headers)
+        if entry is not None and entry.is_fresh():
+            _http_cache.count('hit')
+            return _format_http_response(cache_key, entry, None, f"HIT (age {entry.age:.0f}s of {entry.lifetime:.0f}s)",
+                                         format)
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            # Stale entry: ask the server whether our copy is still current
+            if 'ETag' in entry.headers:
+                request_headers['If-None-Match'] = entry.headers['ETag']
+            if 'Last-Modified' in entry.headers:
+                request_headers['If-Modified-Since'] = entry.headers['Last-Modified']
+
+        response, reused = _http_sessions.request('GET', url, params=params, headers=request_headers, timeout=timeout)
+        if entry is not None and response.status_code == 304:
+            _http_cache.refresh(cache_key, entry, response)
+            _http_cache.count('revalidated')
+            entry.elapsed = response.elapsed
+            return _format_http_response(cache_key, entry, reused, "REVALIDATED (304 Not Modified)", format)
+
+        _http_cache.count('miss')
+        stored = _http_cache.store(cache_key, response, headers)
+        return _format_http_response(response.url, response, reused, "MISS (stored)" if stored is not None else "MISS",
+                                     format)
+    except requests.exceptions.RequestException as e:
+        return f"Error sending GET request: {str(e)}"
+    except Exception as e:
+        return f"Unexpected error during GET request: {str(e)}"
+
+def http_post_request(url, data=None, json_data=None, headers=None, timeout=30, format='text'):
+    """
+    Send an HTTP POST request to the specified URL.
+    Args:
+        url: URL to send the request to
+        data: Optional form data as a dictionary or string
+        json_data: Optional JSON data as a dictionary or string
+        headers: Optional HTTP headers as a dictionary
+        timeout: Request timeout in seconds (default: 30)
+        format: 'text', 'json' or 'csv' (default: text)
+    Returns:
+        Response content and status information
+    """
+    try:
+        # Convert headers string to dictionary if provided as a string
+        if headers and isinstance(headers, str):
+            try:
+                headers = json.loads(headers)
+            except json.JSONDecodeError:
+                return "Error: Invalid headers format. Please provide valid JSON."
+        
+        # Convert data string to dictionary if provided as a string
+        if data and isinstance(data, str):
+            try:
+                data = json.loads(data)
+            except json.JSONDecodeError:
+                # If it's not valid JSON, treat it as form data
+                pass
+        
+        # Convert json_data string to dictionary if provided as a string
+        if json_data and isinstance(json_data, str):
+            try:
+                json_data = json.loads(json_data)
+            except json.JSONDecodeError:
+                return "Error: Invalid JSON data format. Please provide valid JSON."
+        
+        # Send the POST request through the host's pooled session
+        if json_data:
+            response, reused = _http_sessions.request('POST', url, json=json_data, headers=headers, timeout=timeout)
+        else:
+            response, reused = _http_sessions.request('POST', url, data=data, headers=headers, timeout=timeout)
+        return _format_http_response(response.url, response, reused, format=format)
+    except requests.exceptions.RequestException as e:
+        return f"Error sending POST request: {str(e)}"
+    except Exception as e:
+        return f"Unexpected error during POST request: {str(e)}"
+
+# Bytes read from the network and written to disk per step while downloading
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Default number of parallel Range segments for large downloads
+DOWNLOAD_SEGMENTS = 4
+# Downloads are only split when every segment gets at least this many bytes
+DOWNLOAD_MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+# Seconds between checkpoints of segment progress to the resume file
+DOWNLOAD_CHECKPOINT_INTERVAL = 1.0
+
+def _download_target(url, destination):
+    """Resolve the file a download is saved to; directories receive the URL's file name"""
+    from urllib.parse import urlsplit, unquote
+    name = os.path.basename(unquote(urlsplit(url).path)) or 'index.html'
+    if not destination:
+        return os.path.abspath(name)
+    if os.path.isdir(destination) or destination.endswith(('/', os.sep)):
+        os.makedirs(destination, exist_ok=True)
+        return os.path.abspath(os.path.join(destination, name))
+    return os.path.abspath(destination)
+
+def _probe_download(url, headers, timeout):
+    """
+    Ask the server for the size, range support and validator of a resource.
+    Returns:
+        (size or None, accepts_ranges, validator or None)
+    """
+    try:
+        response, _ = _http_sessions.request('HEAD', url, headers=headers, timeout=timeout, allow_redirects=True)
+        response.close()
+    except requests.exceptions.RequestException:
+        return None, False, None
+    if response.status_code >= 400:
+        return None, False, None
+    try:
+        size = int(response.headers['Content-Length'])
+    except (KeyError, ValueError):
+        size = None
+    if 'Content-Encoding' in response.headers and response.headers['Content-Encoding'] != 'identity':
+        # Ranges address the encoded bytes, which requests would transparently decode
+        return size, False, None
+    accepts_ranges = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+    validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+    return size, accepts_ranges, validator
+
+def _load_download_state(state_path, url, size, validator):
+    """Load saved segment progress if it belongs to the same resource, else None"""
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('url') != url or state.get('size') != size or state.get('validator') != validator:
+        return None
+    return state
+
+def _save_download_state(state_path, state):
+    temp_path = state_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(temp_path, state_path)
+
+def download_file(url, destination=None, segments=DOWNLOAD_SEGMENTS, resume=True, headers=None,
+                  timeout=30, progress=None, stop_event=None):
+    """
+    Download a URL to disk in fixed-size chunks. Large files on servers that accept byte
+    ranges are fetched as parallel Range segments; interrupted downloads resume from the
+    partial file.
+    Args:
+        url: URL to download
+        destination: Target file or directory (default: the URL's file name in the current directory)
+        segments: Maximum number of parallel Range requests (default: 4)
+        resume: Whether to continue from a previous partial download (default: True)
+        headers: Optional HTTP headers as a dictionary or JSON string
+        timeout: Connection and read timeout in seconds (default: 30)
+        progress: Optional callback receiving a progress message while downloading
+        stop_event: Optional threading.Event that interrupts the download, keeping the partial file
+    Returns:
+        Download summary or error message
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    try:
+        if headers and isinstance(headers, str):
+            try:
+                headers = json.loads(headers)
+            except json.JSONDecodeError:
+                return "Error: Invalid headers format. Please provide valid JSON."
+        headers = dict(headers or {})
+
+        target = _download_target(url, destination)
+        part_path = target + '.part'
+        state_path = target + '.part.json'
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        size, accepts_ranges, validator = _probe_download(url, headers, timeout)
+        if not resume:
+            for path in (part_path, state_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        lock = threading.Lock()
+        stats = {'bytes': 0, 'reported': 0.0, 'checkpoint': time.monotonic()}
+        start = time.perf_counter()
+
+        def stopped():
+            return stop_event is not None and stop_event.is_set()
+
+        def report(done, force=False):
+            # Called with the lock held; throttled to a few updates per second
+            now = time.perf_counter()
+            if progress is None or (not force and now - stats['reported'] < 0.2):
+                return
+            stats['reported'] = now
+            rate = stats['bytes'] / max(now - start, 1e-6)
+            total = f"/{_format_size(size)}" if size is not None else ""
+            progress(f"Downloading: {_format_size(done)}{total}, {_format_size(rate)}/s")
+
+        segment_count = max(1, int(segments))
+        if size is not None and accepts_ranges:
+            segment_count = max(1, min(segment_count, size // DOWNLOAD_MIN_SEGMENT_SIZE))
+        else:
+            segment_count = 1
+
+        resumed_from = 0
+        if segment_count > 1:
+            # Each segment is [start, end, next byte to fetch]; progress is checkpointed to
+            # the state file so any subset of segments can be resumed later
+            state = _load_download_state(state_path, url, size, validator) if resume else None
+            if state is None or not os.path.exists(part_path):
+                step = -(-size // segment_count)
+                ranges = [[offset, min(offset + step, size) - 1, offset] for offset in range(0, size, step)]
+                state = {'url': url, 'size': size, 'validator': validator, 'segments': ranges}
+                with open(part_path, 'wb') as f:
+                    f.truncate(size)
+            else:
+                resumed_from = sum(seg[2] - seg[0] for seg in state['segments'])
+            _save_download_state(state_path, state)
+
+            def fetch_segment(segment):
+                if segment[2] > segment[1]:
+                    return
+                range_headers = dict(headers, Range=f"bytes={segment[2]}-{segment[1]}")
+                if validator:
+                    range_headers['If-Range'] = validator
+                response, _ = _http_sessions.request('GET', url, headers=range_headers, timeout=timeout, stream=True)
+                with response, open(part_path, 'r+b') as f:
+                    if response.status_code != 206:
+                        raise IOError(f"Server answered range request with status {response.status_code}")
+                    f.seek(segment[2])
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        if stopped():
+                            return
+                        chunk = chunk[:segment[1] + 1 - segment[2]]
+                        f.write(chunk)
+                        with lock:
+                            segment[2] += len(chunk)
+                            stats['bytes'] += len(chunk)
+                            report(resumed_from + stats['bytes'])
+                            if time.monotonic() - stats['checkpoint'] >= DOWNLOAD_CHECKPOINT_INTERVAL:
+                                stats['checkpoint'] = time.monotonic()
+                                f.flush()
+                                _save_download_state(state_path, state)
+                        if segment[2] > segment[1]:
+                            return
+
+            errors = []
+            with ThreadPoolExecutor(max_workers=segment_count) as executor:
+                for future in [executor.submit(fetch_segment, seg) for seg in state['segments']]:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        errors.append(e)
+            with lock:
+                _save_download_state(state_path, state)
+                complete = all(seg[2] > seg[1] for seg in state['segments'])
+            if errors and not complete:
+                raise errors[0]
+            downloaded = size
+        else:
+            # Single stream, resuming from the partial file's length when the server allows it
+            offset = os.path.getsize(part_path) if resume and os.path.exists(part_path) else 0
+            if os.path.exists(state_path):
+                # Leftover from a segmented attempt: the partial file is preallocated, not contiguous
+                os.remove(state_path)
+                offset = 0
+            request_headers = dict(headers)
+            if offset and accepts_ranges and (size is None or offset < size):
+                request_headers['Range'] = f"bytes={offset}-"
+                if validator:
+                    request_headers['If-Range'] = validator
+            else:
+                offset = 0
+            response, _ = _http_sessions.request('GET', url, headers=request_headers, timeout=timeout, stream=True)
+            with response:
+                if response.status_code >= 400:
+                    return f"Error downloading file: server returned status {response.status_code}"
+                if response.status_code != 206:
+                    # Range ignored or resource changed (If-Range failed): start over
+                    offset = 0
+                resumed_from = offset
+                if size is None and response.headers.get('Content-Length', '').isdigit():
+                    size = offset + int(response.headers['Content-Length'])
+                with open(part_path, 'ab' if offset else 'wb') as f:
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        if stopped():
+                            break
+                        f.write(chunk)
+                        with lock:
+                            stats['bytes'] += len(chunk)
+                            report(offset + stats['bytes'])
+            downloaded = resumed_from + stats['bytes']
+            complete = not stopped() and (size is None or downloaded >= size)
+
+        elapsed = time.perf_counter() - start
+        rate = stats['bytes'] / max(elapsed, 1e-6)
+        with lock:
+            report(resumed_from + stats['bytes'], force=True)
+        if not complete:
+            return (f"Download stopped after {_format_size(resumed_from + stats['bytes'])}"
+                    f"{f' of {_format_size(size)}' if size is not None else ''}. "
+                    f"Partial file kept at {part_path}; run the download again to resume.")
+
+        os.replace(part_path, target)
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        result = [f"Downloaded {url} to {target}",
+                  f"Size: {_format_size(downloaded)}",
+                  f"Time: {elapsed:.2f} seconds ({_format_size(rate)}/s)",
+                  f"Segments: {segment_count}" + ("" if accepts_ranges else " (server does not accept ranges)")]
+        if resumed_from:
+            result.append(f"Resumed from: {_format_size(resumed_from)}")
+        return "\n".join(result)
+    except requests.exceptions.RequestException as e:
+        return f"Error downloading file: {str(e)}"
+    except Exception as e:
+        return f"Error downloading file: {str(e)}"
+
+# Latency histogram bucket upper bounds for HTTP benchmarks, in milliseconds
+BENCH_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+async def _read_http_response(reader, method):
+    """
+    Read one HTTP/1.x response from a stream.
+    Returns:
+        (status code, keep_alive) once the body has been fully consumed
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed by server")
+    version, status = status_line.split(None, 2)[:2]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    status = int(status)
+    keep_alive = version == b'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+    if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+        return status, keep_alive
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                # Skip trailers up to the blank line
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+            await reader.readexactly(size + 2)
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    else:
+        # Body delimited by connection close
+        while await reader.read(65536):
+            pass
+        keep_alive = False
+    return status, keep_alive
+
+async def _run_http_benchmark(url, total, concurrency, rate, method, body, headers, timeout):
+    """Send total requests from concurrency keep-alive connections. Returns (samples, connections opened)."""
+    import ssl
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ValueError(f"Unsupported URL: {url}")
+    secure = parts.scheme == 'https'
+    port = parts.port or (443 if secure else 80)
+    ssl_context = ssl.create_default_context() if secure else None
+    # Resolve once for every connection instead of once per connect
+    _, address = await _resolve_address(parts.hostname)
+    target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+    # IPv6 literals keep their brackets in the Host header, as in the URL
+    host_name = f"[{parts.hostname}]" if ':' in parts.hostname else parts.hostname
+    host_header = host_name if parts.port is None else f"{host_name}:{parts.port}"
+
+    request_headers = {'Host': host_header, 'User-Agent': 'terminal-agent-bench', 'Accept': '*/*',
+                       'Connection': 'keep-alive'}
+    request_headers.update(headers or {})
+    if body is not None:
+        request_headers['Content-Length'] = str(len(body))
+    request = (f"{method} {target} HTTP/1.1\r\n"
+               + "".join(f"{k}: {v}\r\n" for k, v in request_headers.items())
+               + "\r\n").encode('latin-1') + (body or b'')
+
+    limiter = _RateLimiter(rate)
+    remaining = iter(range(total))
+    samples = []  # (latency seconds, status code or None, error class name or None)
+    connections = [0]
+
+    async def worker():
+        reader = writer = None
+        for _ in remaining:
+            await limiter.wait()
+            started = time.perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.wait_for(
+                        asyncio.open_connection(address, port, ssl=ssl_context,
+                                                server_hostname=parts.hostname if ssl_context else None), timeout)
+                    connections[0] += 1
+                writer.write(request)
+                await writer.drain()
+                status, keep_alive = await asyncio.wait_for(_read_http_response(reader, method), timeout)
+                samples.append((time.perf_counter() - started, status, None))
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, ssl.SSLError) as e:
+                samples.append((time.perf_counter() - started, None, type(e).__name__))
+                keep_alive = False
+            if not keep_alive and writer is not None:
+                writer.close()
+                reader = writer = None
+        if writer is not None:
+            writer.close()
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, total)))))
+    return samples, connections[0]
+
+def http_benchmark(url, requests_count=100, concurrency=10, rate=None, method='GET', data=None, headers=None, timeout=30):
+    """
+    Load-test an HTTP endpoint with concurrent keep-alive requests using async I/O.
+    Args:
+        url: URL to send the requests to
+        requests_count: Total number of requests to send (default: 100)
+        concurrency: Number of concurrent connections (default: 10)
+        rate: Optional target rate in requests per second (default: as fast as possible)
+        method: HTTP method, GET or POST (default: GET)
+        data: Optional request body for POST, sent as given (dicts and JSON strings are sent as JSON)
+        headers: Optional HTTP headers as a dictionary or JSON string
+        timeout: Per-request timeout in seconds (default: 30)
+    Returns:
+        Throughput, latency percentiles and histogram, status code breakdown and error rate
+    """
+    try:
+        method = method.upper()
+        if headers and isinstance(headers, str):
+            try:
+                headers = json.loads(headers)
+            except json.JSONDecodeError:
+                return "Error: Invalid headers format. Please provide valid JSON."
+        headers = dict(headers or {})
+
+        body = None
+        if data is not None:
+            if isinstance(data, str):
+                try:
+                    data = json.loads(data)
+                except json.JSONDecodeError:
+                    pass
+            if isinstance(data, (dict, list)):
+                body = json.dumps(data).encode('utf-8')
+                headers.setdefault('Content-Type', 'application/json')
+            else:
+                body = str(data).encode('utf-8')
+                headers.setdefault('Content-Type', 'application/x-www-form-urlencoded')
+        elif method == 'POST':
+            body = b''
+
+        total = int(requests_count)
+        if total < 1:
+            return "Error: Number of requests must be at least 1"
+
+        started = time.perf_counter()
+        samples, connections = _run_async(_run_http_benchmark(
+            url, total, int(concurrency), float(rate) if rate else None, method, body, headers, float(timeout)))
+        duration = time.perf_counter() - started
+
+        latencies = sorted(sample[0] * 1000 for sample in samples)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, max(0, int(round(p / 100 * len(latencies))) - 1))]
+
+        statuses = {}
+        errors = {}
+        for _, status, error in samples:
+            if error is not None:
+                errors[error] = errors.get(error, 0) + 1
+            else:
+                statuses[status] = statuses.get(status, 0) + 1
+        error_count = sum(errors.values())
+
+        result = [f"Benchmark: {method} {url}"]
+        result.append(f"Requests: {total} (concurrency {concurrency}, rate {f'{float(rate):g}/s' if rate else 'unlimited'})")
+        result.append(f"Duration: {duration:.2f} seconds")
+        result.append(f"Throughput: {total / max(duration, 1e-9):.1f} requests/second")
+        result.append(f"Connections opened: {connections}")
+        result.append(f"Latency (ms): min {latencies[0]:.2f}  p50 {percentile(50):.2f}  p90 {percentile(90):.2f}  "
+                      f"p99 {percentile(99):.2f}  max {latencies[-1]:.2f}")
+
+        result.append("\nLatency histogram:")
+        counts = [0] * (len(BENCH_BUCKETS_MS) + 1)
+        for latency in latencies:
+            for i, bound in enumerate(BENCH_BUCKETS_MS):
+                if latency <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+        largest = max(counts)
+        labels = [f"<= {bound} ms" for bound in BENCH_BUCKETS_MS] + [f"> {BENCH_BUCKETS_MS[-1]} ms"]
+        for label, count in zip(labels, counts):
+            if count:
+                result.append(f"  {label:>11} {'#' * max(1, round(40 * count / largest)):<40} {count}")
+
+        result.append("\nStatus codes:")
+        for status, count in sorted(statuses.items()):
+            result.append(f"  {status}: {count}")
+        if not statuses:
+            result.append("  (none)")
+        result.append(f"\nErrors: {error_count} ({100 * error_count / total:.1f}%)")
+        for error, count in sorted(errors.items(), key=lambda item: -item[1]):
+            result.append(f"  {error}: {count}")
+        return "\n".join(result)
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        return f"Error running benchmark: {str(e)}"
+
+# Files up to this size are read in one call; larger files are memory-mapped
+SEARCH_READ_LIMIT = 4 * 1024 * 1024
+# Leading bytes inspected to decide whether a file is binary
+BINARY_SNIFF_SIZE = 8192
+
+def _iter_matching_files(directory, file_patterns, recursive):
+    """Walk a directory with os.scandir and yield paths of regular files matching any pattern"""
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                subdirs = []
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            if any(fnmatch.fnmatch(entry.name, p) for p in file_patterns):
+                                yield entry.path
+                        elif recursive and entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        # Reverse so directories are visited in listing order
+        pending.extend(reversed(subdirs))
+
+def _compile_text_search(text, case_sensitive, whole_word, regex):
+    """
+    Build a matcher for a search string.
+    Returns:
+        (literal, pattern): literal bytes for the bytes.find fast path (or None) and a
+        compiled regex used when the fast path does not apply. The regex is a bytes pattern,
+        except for case-insensitive searches with non-ASCII text: bytes patterns only fold
+        ASCII case, so those get a str pattern matched against the decoded file.
+    """
+    if not case_sensitive and not text.isascii():
+        source = text if regex else re.escape(text)
+        if whole_word:
+            source = r'\b(?:' + source + r')\b'
+        return None, re.compile(source, re.IGNORECASE)
+    needle = text.encode('utf-8')
+    source = needle if regex else re.escape(needle)
+    if whole_word:
+        source = rb'\b(?:' + source + rb')\b'
+    pattern = re.compile(source, 0 if case_sensitive else re.IGNORECASE)
+    literal = needle if case_sensitive and not whole_word and not regex else None
+    return literal, pattern
+
+def _search_file(path, literal, pattern, line_numbers):
+    """
+    Search one file and return its formatted matching lines (one per matching line).
+    Binary files (NUL byte in the first block) are skipped.
+    """
+    import mmap
+
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return []
+            if size <= SEARCH_READ_LIMIT:
+                data = f.read()
+            else:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                if b'\0' in data[:BINARY_SNIFF_SIZE]:
+                    return []
+
+                # str patterns search the decoded file; the line handling below works on either type
+                haystack = data
+                newline, carriage_return = b'\n', b'\r'
+                if isinstance(pattern.pattern, str):
+                    haystack = data[:].decode('utf-8', errors='replace')
+                    newline, carriage_return = '\n', '\r'
+
+                if literal is not None:
+                    find = lambda start: haystack.find(literal, start)
+                else:
+                    def find(start):
+                        match = pattern.search(haystack, start)
+                        return match.start() if match else -1
+
+                results = []
+                line_no = 1
+                counted_to = 0
+                position = find(0)
+                while position != -1:
+                    line_start = haystack.rfind(newline, 0, position) + 1
+                    line_end = haystack.find(newline, position)
+                    if line_end == -1:
+                        line_end = len(haystack)
+                    if line_numbers:
+                        # mmap has no count(); slicing keeps the total work linear in the file size
+                        line_no += haystack[counted_to:line_start].count(newline)
+                        counted_to = line_start
+                    line = haystack[line_start:line_end].rstrip(carriage_return)
+                    if isinstance(line, bytes):
+                        line = line.decode('utf-8', errors='replace')
+                    results.append(f"{path}:{line_no}:{line}" if line_numbers else f"{path}:{line}")
+                    # At most one result per line: continue after the end of this line
+                    position = find(line_end + 1) if line_end < len(haystack) else -1
+                return results
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+    except (OSError, ValueError):
+        return []
+
+# Files larger than this are not indexed and are always searched directly
+INDEX_MAX_FILE_SIZE = 256 * 1024 * 1024
+# Non-overlapping 3-byte windows; passes starting at offsets 0, 1 and 2 together yield every trigram
+_TRIGRAM_RE = re.compile(b'...', re.S)
+
+def _word_trigrams(words):
+    """Return the set of trigrams inside the given byte strings (none spanning two of them)"""
+    joined = b'\0'.join(words)
+    trigrams = set(_TRIGRAM_RE.findall(joined))
+    trigrams.update(_TRIGRAM_RE.findall(joined, 1))
+    trigrams.update(_TRIGRAM_RE.findall(joined, 2))
+    return {trigram for trigram in trigrams if b'\0' not in trigram}
+
+def _file_trigrams(path):
+    """
+    Return the sorted, concatenated lowercase trigrams found inside the whitespace-separated
+    words of a text file, or None if the file is binary. Trigrams are taken from the file's
+    distinct words, so repeated identifiers are only broken up once.
+    """
+    words = set()
+    with open(path, 'rb') as f:
+        chunk = f.read(BINARY_SNIFF_SIZE)
+        if b'\0' in chunk:
+            return None
+        carry = b''
+        while chunk:
+            block = carry + chunk.lower()
+            block_words = block.split()
+            words.update(block_words)
+            # A word cut at the chunk boundary continues in the next block; keep its last two bytes
+            carry = block_words[-1][-2:] if block_words and not block[-1:].isspace() else b''
+            chunk = f.read(1024 * 1024)
+    return b''.join(sorted(_word_trigrams(words)))
+
+def _query_trigrams(text, case_sensitive):
+    """
+    Return the trigrams every file matching text must contain. The index only folds ASCII
+    case, so case-insensitive searches skip trigrams with non-ASCII bytes.
+    """
+    trigrams = _word_trigrams(text.encode('utf-8').lower().split())
+    if not case_sensitive:
+        trigrams = {trigram for trigram in trigrams if trigram.isascii()}
+    return trigrams
+
+def _has_trigram(data, trigram):
+    """Check a concatenation of trigrams for one trigram, ignoring hits that straddle two of them"""
+    position = data.find(trigram)
+    while position > 0 and position % 3:
+        position = data.find(trigram, position + 1)
+    return position != -1
+
+class _TrigramShard:
     """
-    Send an HTTP GET request to the specified URL.
+    Trigrams of the files directly inside one directory. Every directory is cached in its
+    own file, so re-indexing a changed file only rewrites the shard of its directory.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path):
+        self.path = path
+        # name -> (size, mtime_ns, trigrams); trigrams is None for binary files and
+        # True for files that could not be indexed (always candidates)
+        self.files = {}
+        self.packed = {}  # name -> zlib-compressed trigrams as stored on disk
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        import zlib
+
+        shard = cls(path)
+        state = _load_cache("index", path, cls.VERSION)
+        if state is not None:
+            for name, (size, mtime_ns, data) in state['files'].items():
+                if isinstance(data, bytes):
+                    shard.packed[name] = data
+                    data = zlib.decompress(data)
+                shard.files[name] = (size, mtime_ns, data)
+        return shard
+
+    def save(self):
+        import zlib
+
+        files = {}
+        for name, (size, mtime_ns, data) in self.files.items():
+            if isinstance(data, bytes):
+                if name not in self.packed:
+                    self.packed[name] = zlib.compress(data, 1)
+                data = self.packed[name]
+            files[name] = (size, mtime_ns, data)
+        _save_cache("index", self.path, self.VERSION, {'files': files})
+
+    def update(self, rows, verify=False):
+        """
+        Re-index the files whose size or mtime differ from the catalog rows and drop files
+        that are gone, saving the shard if anything changed.
+        Args:
+            rows: (name, size, mtime_ns) of the files in the directory
+            verify: Whether to stat each file instead of trusting the catalog rows
+        Returns:
+            (updated, removed) file counts
+        """
+        names = set()
+        updated = 0
+        for name, size, mtime_ns in rows:
+            path = os.path.join(self.path, name)
+            if verify:
+                try:
+                    stats = os.stat(path)
+                except OSError:
+                    continue
+                size, mtime_ns = stats.st_size, stats.st_mtime_ns
+            names.add(name)
+            known = self.files.get(name)
+            if known is not None and known[0] == size and known[1] == mtime_ns:
+                continue
+            if size > INDEX_MAX_FILE_SIZE:
+                data = True
+            elif not os.path.isfile(path):
+                # Fifos and other special files are never searched
+                data = None
+            else:
+                try:
+                    data = _file_trigrams(path)
+                except OSError:
+                    data = True
+            self.files[name] = (size, mtime_ns, data)
+            self.packed.pop(name, None)
+            updated += 1
+
+        removed = [name for name in self.files if name not in names]
+        for name in removed:
+            del self.files[name]
+            self.packed.pop(name, None)
+        if updated or removed:
+            self.save()
+        return updated, len(removed)
+
+    def candidates(self, trigrams):
+        """Yield the names of files containing every trigram or that could not be indexed"""
+        for name, (_, _, data) in self.files.items():
+            if data is True or (data is not None and all(_has_trigram(data, t) for t in trigrams)):
+                yield name
+
+# Shards loaded in this session, keyed by absolute directory
+_trigram_shards = {}
+_trigram_lock = threading.Lock()
+
+def _trigram_shard(path):
+    """Return the trigram shard of a directory, loading it from disk if needed"""
+    with _trigram_lock:
+        shard = _trigram_shards.get(path)
+        if shard is None:
+            shard = _trigram_shards[path] = _TrigramShard.load(path)
+        return shard
+
+def _refreshed_shards(directory, recursive=True, verify=False):
+    """
+    Bring the trigram shards a search covers up to date. The file catalog finds the
+    directories whose mtime changed, so only their files are compared against the shards;
+    when recursive is False only the directory itself is looked at.
+    Returns:
+        ([(display directory, shard)], updated, removed)
+    """
+    catalog, start = _catalog_for(directory, recursive)
+    shards = []
+    updated = removed = 0
+    for rel_dir, _, rows in catalog.walk(start, recursive):
+        shard = _trigram_shard(os.path.normpath(os.path.join(catalog.root, rel_dir)))
+        with shard.lock:
+            counts = shard.update(rows, verify)
+        updated += counts[0]
+        removed += counts[1]
+        shards.append((_catalog_display_dir(directory, rel_dir, start), shard))
+    return shards, updated, removed
+
+def _indexed_candidates(text, directory, file_patterns, recursive, case_sensitive):
+    """Yield paths of files that may contain text according to the directory's trigram shards"""
+    trigrams = _query_trigrams(text, case_sensitive)
+    shards, _, _ = _refreshed_shards(directory, recursive)
+    for display_dir, shard in shards:
+        with shard.lock:
+            names = sorted(shard.candidates(trigrams))
+        for name in names:
+            if any(fnmatch.fnmatch(name, p) for p in file_patterns):
+                yield os.path.join(display_dir, name)
+
+def build_text_index(directory='.'):
+    """
+    Build or refresh the persistent trigram index used by indexed text searches. Unlike a
+    search, which trusts directory modification times, every file is checked for changes.
     Args:
-        url: URL to send the request to
-        params: Optional query parameters as a dictionary
-        headers: Optional HTTP headers as a dictionary
-        timeout: Request timeout in seconds (default: 30)
+        directory: Directory tree to index (default: current directory)
     Returns:
-        Response content and status information
+        Index statistics or error message
     """
+    if not os.path.isdir(directory):
+        return f"Error: Directory '{directory}' does not exist"
     try:
-        # Convert headers string to dictionary if provided as a string
-        if headers and isinstance(headers, str):
-            try:
-                headers = json.loads(headers)
-            except json.JSONDecodeError:
-                return "Error: Invalid headers format. Please provide valid JSON."
-        
-        # Convert params string to dictionary if provided as a string
-        if params and isinstance(params, str):
-            try:
-                params = json.loads(params)
-            except json.JSONDecodeError:
-                return "Error: Invalid params format. Please provide valid JSON."
-        
-        # Send the GET request
-        response = requests.get(url, params=params, headers=headers, timeout=timeout)
-        
-        # Prepare the response details
-        result = []
-        result.append(f"Status Code: {response.status_code}")
-        result.append(f"Response Time: {response.elapsed.total_seconds():.2f} seconds")
-        
-        # Add headers to the result
-        result.append("\nResponse Headers:")
-        for key, value in response.headers.items():
-            result.append(f"  {key}: {value}")
-        
-        return "\n".join(result)
-    except requests.exceptions.RequestException as e:
-        return f"Error sending GET request: {str(e)}"
+        start = time.perf_counter()
+        shards, updated, removed = _refreshed_shards(directory, verify=True)
+        elapsed = time.perf_counter() - start
+        files = unindexed = stored = 0
+        for _, shard in shards:
+            with shard.lock:
+                files += len(shard.files)
+                unindexed += sum(1 for _, _, data in shard.files.values() if data is True)
+                stored += sum(len(data) for data in shard.packed.values())
+        return (f"Index for {os.path.abspath(directory)}\n"
+                f"Directories: {len(shards)}\n"
+                f"Files: {files} ({updated} updated, {removed} removed)\n"
+                f"Unindexed large files: {unindexed}\n"
+                f"Stored trigram data: {_format_size(stored)}\n"
+                f"Refreshed in {elapsed:.2f} seconds")
     except Exception as e:
-        return f"Unexpected error during GET request: {str(e)}"
+        return f"Error building text index: {str(e)}"
 
-def http_post_request(url, data=None, json_data=None, headers=None, timeout=30):
+def find_text_in_files_stream(text, directory='.', file_pattern='*.*', recursive=False, case_sensitive=False, whole_word=False, line_numbers=True, regex=False, max_workers=None, use_index=False):
     """
-    Send an HTTP POST request to the specified URL.
+    Search for text within files, yielding matching lines as each file is searched.
     Args:
-        url: URL to send the request to
-        data: Optional form data as a dictionary or string
-        json_data: Optional JSON data as a dictionary or string
-        headers: Optional HTTP headers as a dictionary
-        timeout: Request timeout in seconds (default: 30)
-    Returns:
-        Response content and status information
+        text: Text to search for in files
+        directory: Directory path to search in (default: current directory)
+        file_pattern: File pattern(s) to search in, separated by ';' or ',' (default: all files)
+        recursive: Whether to search recursively in subdirectories (default: False)
+        case_sensitive: Whether the search is case-sensitive (default: False)
+        whole_word: Whether to match whole words only (default: False)
+        line_numbers: Whether to display line numbers in results (default: True)
+        regex: Whether text is a regular expression instead of a literal (default: False)
+        max_workers: Number of search threads (default: based on CPU count)
+        use_index: Whether to narrow the files with the directory's trigram index (default: False).
+                   Ignored for regular expressions and search text shorter than 3 characters.
+    Yields:
+        "file:line:text" results in directory walk order
     """
+    if not os.path.exists(directory):
+        yield f"Error: Directory '{directory}' does not exist"
+        return
+
     try:
-        # Convert headers string to dictionary if provided as a string
-        if headers and isinstance(headers, str):
-            try:
-                headers = json.loads(headers)
-            except json.JSONDecodeError:
-                return "Error: Invalid headers format. Please provide valid JSON."
-        
-        # Convert data string to dictionary if provided as a string
-        if data and isinstance(data, str):
-            try:
-                data = json.loads(data)
-            except json.JSONDecodeError:
-                # If it's not valid JSON, treat it as form data
-                pass
-        
-        # Convert json_data string to dictionary if provided as a string
-        if json_data and isinstance(json_data, str):
-            try:
-                json_data = json.loads(json_data)
-            except json.JSONDecodeError:
-                return "Error: Invalid JSON data format. Please provide valid JSON."
-        
-        # Send the POST request
-        if json_data:
-            response = requests.post(url, json=json_data, headers=headers, timeout=timeout)
+        from concurrent.futures import ThreadPoolExecutor
+        from collections import deque
+
+        literal, pattern = _compile_text_search(text, case_sensitive, whole_word, regex)
+        # '*.*' means "every file" as it does for findstr, including names without a dot
+        file_patterns = ['*' if p.strip() == '*.*' else p.strip()
+                         for p in re.split(r'[;,]', file_pattern) if p.strip()] or ['*']
+        workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+
+        if use_index and not regex and len(text.encode('utf-8')) >= 3:
+            paths = _indexed_candidates(text, directory, file_patterns, recursive, case_sensitive)
         else:
-            response = requests.post(url, data=data, headers=headers, timeout=timeout)
-        
-        # Prepare the response details
-        result = []
-        result.append(f"Status Code: {response.status_code}")
-        result.append(f"Response Time: {response.elapsed.total_seconds():.2f} seconds")
-        
-        # Add headers to the result
-        result.append("\nResponse Headers:")
-        for key, value in response.headers.items():
-            result.append(f"  {key}: {value}")
-        
-        return "\n".join(result)
-    except requests.exceptions.RequestException as e:
-        return f"Error sending POST request: {str(e)}"
+            paths = _iter_matching_files(directory, file_patterns, recursive)
+
+        found = False
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Keep a bounded window of in-flight files so huge trees do not queue every path
+            in_flight = deque()
+            for path in paths:
+                in_flight.append(executor.submit(_search_file, path, literal, pattern, line_numbers))
+                if len(in_flight) >= workers * 4:
+                    for line in in_flight.popleft().result():
+                        found = True
+                        yield line
+            while in_flight:
+                for line in in_flight.popleft().result():
+                    found = True
+                    yield line
+
+        if not found:
+            yield f"No files containing '{text}' found in {directory}"
+    except re.error as e:
+        yield f"Error: Invalid regular expression: {str(e)}"
     except Exception as e:
-        return f"Unexpected error during POST request: {str(e)}"
+        yield f"Error searching for text: {str(e)}"
 
-def find_text_in_files(text, directory='.', file_pattern='*.*', recursive=False, case_sensitive=False, whole_word=False, line_numbers=True):
+def find_text_in_files(text, directory='.', file_pattern='*.*', recursive=False, case_sensitive=False, whole_word=False, line_numbers=True, regex=False, max_workers=None, use_index=False):
     """
-    Search for text within files using Windows findstr command.
+    Search for text within files using a parallel in-process search engine.
     Args:
         text: Text to search for in files
         directory: Directory path to search in (default: current directory)
-        file_pattern: File pattern to search in (default: all files)
+        file_pattern: File pattern(s) to search in, separated by ';' or ',' (default: all files)
         recursive: Whether to search recursively in subdirectories (default: False)
         case_sensitive: Whether the search is case-sensitive (default: False)
         whole_word: Whether to match whole words only (default: False)
         line_numbers: Whether to display line numbers in results (default: True)
+        regex: Whether text is a regular expression instead of a literal (default: False)
+        max_workers: Number of search threads (default: based on CPU count)
+        use_index: Whether to narrow the files with the directory's trigram index (default: False)
     Returns:
         Results of text search with file names, line numbers, and matching lines
     """
-    if not is_windows():
-        return "This function is only available on Windows systems. Use grep on Unix/Linux."
-    
-    if not os.path.exists(directory):
-        return f"Error: Directory '{directory}' does not exist"
-    
-    try:
-        # Build findstr command with appropriate options
-        cmd = ['findstr']
-        options = []
-        
-        if recursive:
-            options.append('/S')  # Recursive search
-        
-        if not case_sensitive:
-            options.append('/I')  # Case-insensitive
-        
-        if line_numbers:
-            options.append('/N')  # Show line numbers
-        
-        if whole_word:
-            options.append('/W')  # Match whole words
-        
-        options.append('/P')  # Skip files with non-printable characters
-        
-        # Combine options
-        cmd.extend(options)
-        
-        # Add the search string
-        cmd.append(text)
-        
-        # Add file pattern
-        file_path = os.path.join(directory, file_pattern)
-        cmd.append(file_path)
-        
-        # Run command
-        result = subprocess.run(cmd, capture_output=True, text=True, errors='replace')
-        
-        # Process and format the output
-        if result.returncode == 0 or result.returncode == 1:  # 0=found matches, 1=no matches
-            output = result.stdout.strip()
-            
-            if not output:
-                return f"No files containing '{text}' found in {directory}"
-            
-            # Format output for better readability
-            formatted_lines = []
-            for line in output.split('\n'):
-                if line.strip():
-                    formatted_lines.append(line)
-            
-            return '\n'.join(formatted_lines)
-        else:
-            return f"Error searching files: {result.stderr}"
-    except Exception as e:
-        return f"Error searching for text: {str(e)}"
+    return '\n'.join(find_text_in_files_stream(text, directory, file_pattern, recursive, case_sensitive,
+                                               whole_word, line_numbers, regex, max_workers, use_index))
 
 def run_long_command(cmd, shell=False, timeout=None):
     """
@@ -681,6 +4841,87 @@ def run_long_command(cmd, shell=False, timeout=None):
     finally:
         current_process = None
 
+def _stream_process(cmd, shell=False, timeout=None, error_prefix="Error executing command"):
+    """
+    Run a command and yield its combined stdout/stderr line by line as it is produced.
+    Args:
+        cmd: Command to run (list or string)
+        shell: Whether to run the command in a shell
+        timeout: Optional timeout in seconds after which the command is killed
+        error_prefix: Prefix used for the message yielded if the command cannot be run
+    Yields:
+        Output lines without trailing newlines
+    """
+    global current_process
+
+    timer = None
+    timed_out = threading.Event()
+    try:
+        current_process = process = subprocess.Popen(
+            cmd,
+            shell=shell,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1
+        )
+
+        if timeout:
+            def expire():
+                timed_out.set()
+                process.kill()
+            timer = threading.Timer(timeout, expire)
+            timer.daemon = True
+            timer.start()
+
+        for line in process.stdout:
+            yield line.rstrip('\r\n')
+        process.wait()
+
+        if timed_out.is_set():
+            yield f"Command timed out after {timeout} seconds."
+        elif process.returncode and process.returncode > 0:
+            yield f"Command failed with exit code {process.returncode}."
+    except Exception as e:
+        yield f"{error_prefix}: {str(e)}"
+    finally:
+        if timer is not None:
+            timer.cancel()
+        if current_process is not None and current_process.poll() is None:
+            # The consumer stopped early: do not leave the child running
+            current_process.kill()
+            current_process.wait()
+        current_process = None
+
+def run_long_command_stream(cmd, shell=False, timeout=None):
+    """
+    Run a command that could take a long time, yielding its output line by line.
+    Args:
+        cmd: Command to run (list or string)
+        shell: Whether to run the command in a shell
+        timeout: Optional timeout in seconds
+    Yields:
+        Command output lines, followed by a status line on failure or timeout
+    """
+    yield from _stream_process(cmd, shell=shell, timeout=timeout)
+
+def stop_current_process():
+    """
+    Terminate the subprocess started by the currently running command, if any.
+    Returns:
+        True if a process was terminated, False otherwise
+    """
+    process = current_process
+    if process is None or process.poll() is not None:
+        return False
+    try:
+        process.terminate()
+        return True
+    except OSError:
+        return False
+
 def terminate_process(pid):
     """
     Terminate a process by its PID.
@@ -712,41 +4953,465 @@ def terminate_process(pid):
     except Exception as e:
         return f"Error terminating process: {str(e)}"
 
-def get_running_processes():
+def get_process_entries():
+    """
+    Get running processes as structured rows.
+    Returns:
+        List of ProcessEntry rows sorted by PID
+    """
+    processes = []
+    for proc in psutil.process_iter(['pid', 'name', 'username', 'status', 'memory_percent']):
+        try:
+            pinfo = proc.info
+            memory = pinfo['memory_percent']
+            processes.append(ProcessEntry(pinfo['pid'], pinfo['name'], pinfo['username'], pinfo['status'],
+                                          round(memory, 2) if memory is not None else None))
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+    
+    # Sort by PID for consistent output
+    processes.sort(key=lambda entry: entry.pid)
+    return processes
+
+def _format_process_row(entry):
+    """Format one get_running_processes text row from a ProcessEntry"""
+    memory = f"{entry.memory_percent:.2f}%" if entry.memory_percent is not None else "-"
+    return f"{entry.pid:<8} {entry.name or '':<30} {entry.user or '':<20} {entry.status:<8} {memory}"
+
+def get_running_processes(format='text'):
     """
     Get a list of running processes with their PIDs and names.
+    Args:
+        format: 'text', 'json' or 'csv' (default: text)
     Returns:
         List of running processes
     """
     try:
-        processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'username', 'status', 'memory_percent']):
-            try:
-                pinfo = proc.info
-                processes.append({
-                    'pid': pinfo['pid'],
-                    'name': pinfo['name'],
-                    'username': pinfo['username'],
-                    'status': pinfo['status'],
-                    'memory': f"{pinfo['memory_percent']:.2f}%"
-                })
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
-        
-        # Sort by PID for consistent output
-        processes.sort(key=lambda x: x['pid'])
+        processes = get_process_entries()
+        if format != 'text':
+            return render_records(processes, ProcessEntry, format)
         
         # Format the output
         result = ["PID      Name                           User                Status   Memory"]
         result.append("-" * 75)
-        
-        for proc in processes:
-            result.append(f"{proc['pid']:<8} {proc['name']:<30} {proc['username']:<20} {proc['status']:<8} {proc['memory']}")
-        
+        result.append(render_records(processes, ProcessEntry, text_row=_format_process_row))
         return "\n".join(result)
     except Exception as e:
         return f"Error listing processes: {str(e)}"
 
+# Columns the top command can sort by; numeric columns sort largest first
+TOP_SORT_KEYS = ('cpu', 'rss', 'io', 'threads', 'pid', 'name')
+# Default seconds between top refreshes
+TOP_INTERVAL = 2.0
+
+class _ProcessSampler:
+    """
+    Keep psutil.Process objects across refreshes. psutil measures cpu_percent(None) against the
+    previous call on the same object, so reusing them turns each refresh into a real CPU delta;
+    I/O rates are computed the same way from the cached counters.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}  # pid -> {'proc', 'created', 'name', 'user', 'io', 'io_time'}
+
+    def _entry(self, pid):
+        entry = self.entries.get(pid)
+        if entry is not None:
+            return entry
+        proc = psutil.Process(pid)
+        with proc.oneshot():
+            # Name, user and start time do not change, so they are fetched once per process
+            entry = {'proc': proc, 'created': proc.create_time(), 'name': proc.name(), 'user': None,
+                     'io': None, 'io_time': None}
+            try:
+                entry['user'] = proc.username()
+            except (psutil.AccessDenied, KeyError):
+                entry['user'] = '?'
+            proc.cpu_percent(None)
+        self.entries[pid] = entry
+        return entry
+
+    def sample(self, name=None, user=None, with_io=True):
+        """
+        Refresh all processes matching the filters.
+        Args:
+            name: Optional name filter, a substring or glob pattern (case-insensitive)
+            user: Optional user name filter (case-insensitive)
+            with_io: Whether to read I/O counters
+        Returns:
+            List of row dictionaries (pid, name, user, cpu, rss, threads, io, status)
+        """
+        name = name.lower() if name else None
+        name_is_glob = bool(name) and any(ch in name for ch in '*?[')
+        user = user.lower() if user else None
+        rows = []
+        with self.lock:
+            pids = set(psutil.pids())
+            for pid in list(self.entries):
+                if pid not in pids:
+                    del self.entries[pid]
+            now = time.monotonic()
+            for pid in pids:
+                try:
+                    entry = self._entry(pid)
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
+                # Cheap cached filters first, so excluded processes cost nothing per refresh
+                process_name = entry['name'].lower()
+                if name and not (fnmatch.fnmatch(process_name, name) if name_is_glob else name in process_name):
+                    continue
+                if user and (entry['user'] or '').lower().split('\\')[-1] != user.split('\\')[-1]:
+                    continue
+                proc = entry['proc']
+                try:
+                    with proc.oneshot():
+                        if proc.create_time() != entry['created']:
+                            # PID reused by a new process
+                            del self.entries[pid]
+                            continue
+                        row = {'pid': pid, 'name': entry['name'], 'user': entry['user'],
+                               'cpu': proc.cpu_percent(None), 'rss': proc.memory_info().rss,
+                               'threads': proc.num_threads(), 'status': proc.status(), 'io': None}
+                        if with_io and entry['io'] is not False:
+                            try:
+                                counters = proc.io_counters()
+                                total = counters.read_bytes + counters.write_bytes
+                                if entry['io'] is not None:
+                                    row['io'] = (total - entry['io']) / max(now - entry['io_time'], 1e-6)
+                                entry['io'], entry['io_time'] = total, now
+                            except (psutil.AccessDenied, AttributeError, NotImplementedError):
+                                # Not readable for this process; do not try again
+                                entry['io'] = False
+                except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                    self.entries.pop(pid, None)
+                    continue
+                except psutil.AccessDenied:
+                    continue
+                rows.append(row)
+        return rows
+
+_process_sampler = _ProcessSampler()
+
+def _sort_process_rows(rows, sort_by):
+    if sort_by in ('pid', 'name'):
+        return sorted(rows, key=lambda row: (row[sort_by].lower() if sort_by == 'name' else row[sort_by]))
+    return sorted(rows, key=lambda row: row[sort_by] or 0, reverse=True)
+
+def _format_top_frame(rows, sort_by, limit, total):
+    """Render a top frame as a list of fixed-width lines so unchanged rows compare equal"""
+    memory = psutil.virtual_memory()
+    lines = [f"Processes: {total} shown of {len(_process_sampler.entries)}  "
+             f"CPU: {psutil.cpu_percent(None):.1f}%  "
+             f"Memory: {_format_size(memory.used)}/{_format_size(memory.total)} ({memory.percent:.1f}%)  "
+             f"Sort: {sort_by}",
+             f"{'PID':>7} {'User':<12} {'CPU%':>6} {'RSS':>10} {'Thr':>4} {'I/O/s':>10} {'State':<9} Name",
+             "-" * 80]
+    for row in _sort_process_rows(rows, sort_by)[:limit]:
+        io = f"{_format_size(row['io'])}" if row['io'] is not None else "-"
+        user = (row['user'] or '?').split('\\')[-1][:12]
+        lines.append(f"{row['pid']:>7} {user:<12} {row['cpu']:>6.1f} {_format_size(row['rss']):>10} "
+                     f"{row['threads']:>4} {io:>10} {row['status'][:9]:<9} {row['name']}")
+    return lines
+
+def top_processes(sort_by='cpu', limit=20, name=None, user=None, interval=1.0):
+    """
+    Show the busiest processes, top-style. CPU and I/O figures are measured over interval
+    seconds (or since the previous call, when processes are already being tracked).
+    Args:
+        sort_by: Column to sort by: cpu, rss, io, threads, pid or name (default: cpu)
+        limit: Maximum number of processes shown (default: 20)
+        name: Optional name filter, a substring or glob pattern
+        user: Optional user name filter
+        interval: Seconds to measure over on the first call (default: 1.0)
+    Returns:
+        Table of processes
+    """
+    if sort_by not in TOP_SORT_KEYS:
+        return f"Error: Invalid sort key '{sort_by}'. Use one of: {', '.join(TOP_SORT_KEYS)}"
+    try:
+        if not _process_sampler.entries:
+            # First call: prime the CPU and I/O counters, then measure over the interval
+            _process_sampler.sample(name, user)
+            psutil.cpu_percent(None)
+            time.sleep(max(0.1, float(interval)))
+        rows = _process_sampler.sample(name, user)
+        return "\n".join(_format_top_frame(rows, sort_by, max(1, int(limit)), len(rows)))
+    except Exception as e:
+        return f"Error listing processes: {str(e)}"
+
+def top_stream(sort_by='cpu', limit=20, name=None, user=None, interval=TOP_INTERVAL, stop_event=None):
+    """
+    Refresh a top-style process table until stopped.
+    Args:
+        sort_by: Column to sort by: cpu, rss, io, threads, pid or name (default: cpu)
+        limit: Maximum number of processes shown (default: 20)
+        name: Optional name filter, a substring or glob pattern
+        user: Optional user name filter
+        interval: Seconds between refreshes (default: 2.0)
+        stop_event: Optional threading.Event that stops refreshing when set
+    Yields:
+        Frames, each a list of lines; consecutive frames share unchanged lines
+    """
+    if sort_by not in TOP_SORT_KEYS:
+        yield [f"Error: Invalid sort key '{sort_by}'. Use one of: {', '.join(TOP_SORT_KEYS)}"]
+        return
+    interval = max(0.5, float(interval))
+    try:
+        if not _process_sampler.entries:
+            _process_sampler.sample(name, user)
+            psutil.cpu_percent(None)
+            if stop_event is not None and stop_event.wait(min(interval, 1.0)):
+                return
+        while True:
+            started = time.monotonic()
+            rows = _process_sampler.sample(name, user)
+            yield _format_top_frame(rows, sort_by, max(1, int(limit)), len(rows))
+            remaining = max(0.0, interval - (time.monotonic() - started))
+            if stop_event is None:
+                time.sleep(remaining)
+            elif stop_event.wait(remaining):
+                return
+    except Exception as e:
+        yield [f"Error listing processes: {str(e)}"]
+
+# Defaults for per-process resource recordings
+RECORD_INTERVAL = 1.0
+RECORD_CAPACITY = 600
+# Characters used to draw sparklines, lowest to highest
+SPARK_CHARS = "\u2581\u2582\u2583\u2584\u2585\u2586\u2587\u2588"
+SPARK_WIDTH = 60
+
+class _ProcessRecorder:
+    """
+    Sample one process into fixed-size ring buffers, one typed array per metric, on a
+    background thread. Memory use is fixed at creation: about 28 bytes per sample.
+    """
+
+    METRICS = (('cpu', 'f'), ('rss', 'Q'), ('files', 'I'), ('threads', 'I'))
+
+    def __init__(self, pid, interval=RECORD_INTERVAL, capacity=RECORD_CAPACITY):
+        from array import array
+        self.proc = psutil.Process(pid)
+        self.pid = pid
+        self.name = self.proc.name()
+        self.interval = interval
+        self.capacity = capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.series = {metric: array(code, bytes(array(code).itemsize * capacity)) for metric, code in self.METRICS}
+        self.head = 0   # next slot to write
+        self.count = 0  # valid samples, up to capacity
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.ended = None
+        self.proc.cpu_percent(None)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _open_files(self):
+        # Descriptor/handle counts are cheap; enumerating open_files() is not
+        if hasattr(self.proc, 'num_fds'):
+            return self.proc.num_fds()
+        return self.proc.num_handles()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                with self.proc.oneshot():
+                    if self.proc.status() == psutil.STATUS_ZOMBIE:
+                        self.ended = "process exited"
+                        return
+                    sample = (self.proc.cpu_percent(None), self.proc.memory_info().rss,
+                              self._open_files(), self.proc.num_threads())
+            except psutil.NoSuchProcess:
+                self.ended = "process exited"
+                return
+            except psutil.AccessDenied:
+                self.ended = "access denied"
+                return
+            with self.lock:
+                self.times[self.head] = time.time()
+                for (metric, _), value in zip(self.METRICS, sample):
+                    self.series[metric][self.head] = value
+                self.head = (self.head + 1) % self.capacity
+                self.count = min(self.count + 1, self.capacity)
+
+    def stop(self):
+        self.stop_event.set()
+        if self.ended is None:
+            self.ended = "stopped"
+
+    @property
+    def running(self):
+        return self.thread.is_alive() and not self.stop_event.is_set()
+
+    def snapshot(self):
+        """Return (times, {metric: values}) in chronological order as lists"""
+        with self.lock:
+            start = (self.head - self.count) % self.capacity
+            order = [(start + i) % self.capacity for i in range(self.count)]
+            times = [self.times[i] for i in order]
+            series = {metric: [values[i] for i in order] for metric, values in self.series.items()}
+        return times, series
+
+_recorders = {}
+_recorders_lock = threading.Lock()
+
+def _sparkline(values, width=SPARK_WIDTH):
+    """Draw values as a one-line sparkline, averaging them into at most width buckets"""
+    if not values:
+        return ""
+    if len(values) > width:
+        step = len(values) / width
+        values = [sum(chunk) / len(chunk) for chunk in
+                  (values[int(i * step):max(int((i + 1) * step), int(i * step) + 1)] for i in range(width))]
+    low, high = min(values), max(values)
+    span = (high - low) or 1
+    return "".join(SPARK_CHARS[int((value - low) / span * (len(SPARK_CHARS) - 1))] for value in values)
+
+def start_recording(pid, interval=RECORD_INTERVAL, capacity=RECORD_CAPACITY):
+    """
+    Start sampling a process's CPU, RSS, open files and threads in the background.
+    Args:
+        pid: Process ID to record
+        interval: Seconds between samples (default: 1.0)
+        capacity: Number of samples kept; older samples are overwritten (default: 600)
+    Returns:
+        Success or error message
+    """
+    try:
+        pid = int(pid)
+        interval = max(0.05, float(interval))
+        capacity = max(2, int(capacity))
+        with _recorders_lock:
+            existing = _recorders.get(pid)
+            if existing is not None and existing.running:
+                return f"Already recording process {pid} ({existing.name})"
+            recorder = _recorders[pid] = _ProcessRecorder(pid, interval, capacity)
+        window = capacity * interval
+        window = f"{window / 60:.1f} minutes" if window >= 120 else f"{window:.0f} seconds"
+        return (f"Recording process {pid} ({recorder.name}) every {interval:g}s, "
+                f"keeping the last {capacity} samples ({window})")
+    except psutil.NoSuchProcess:
+        return f"No such process: {pid}"
+    except psutil.AccessDenied:
+        return f"Access denied when trying to record process {pid}"
+    except ValueError:
+        return "Error: pid, interval and capacity must be numbers"
+    except Exception as e:
+        return f"Error recording process: {str(e)}"
+
+def _selected_recorders(pid):
+    """
+    Look up the recorder of one process, or every recorder when pid is None.
+    Returns:
+        (recorders sorted by pid, None) or (None, error message)
+    """
+    if pid is not None:
+        try:
+            pid = int(pid)
+        except (TypeError, ValueError):
+            return None, "Error: pid must be a number"
+    with _recorders_lock:
+        if pid is None:
+            return sorted(_recorders.values(), key=lambda recorder: recorder.pid), None
+        recorder = _recorders.get(pid)
+    if recorder is None:
+        return None, f"Process {pid} is not being recorded"
+    return [recorder], None
+
+def stop_recording(pid=None):
+    """
+    Stop recording one process, or all of them. Recorded samples stay available.
+    Args:
+        pid: Process ID to stop recording (default: all)
+    Returns:
+        Success or error message
+    """
+    targets, error = _selected_recorders(pid)
+    if error:
+        return error
+    for recorder in targets:
+        recorder.stop()
+    return f"Stopped {len(targets)} recording{'s' if len(targets) != 1 else ''}"
+
+def recording_report(pid=None):
+    """
+    Summarize recorded samples with min/avg/max/last values and sparklines.
+    Args:
+        pid: Process ID to report on (default: all recordings)
+    Returns:
+        Recording summary
+    """
+    recorders, error = _selected_recorders(pid)
+    if error:
+        return error
+    if not recorders:
+        return "No recordings. Use 'record <pid>' to start one."
+
+    formats = {'cpu': lambda v: f"{v:.1f}%", 'rss': _format_size, 'files': lambda v: f"{v:.0f}",
+               'threads': lambda v: f"{v:.0f}"}
+    result = []
+    for recorder in recorders:
+        times, series = recorder.snapshot()
+        state = "recording" if recorder.running else recorder.ended or "stopped"
+        duration = times[-1] - times[0] if len(times) > 1 else 0
+        result.append(f"PID {recorder.pid} ({recorder.name}) - {state}, {len(times)} samples "
+                      f"over {duration:.0f}s every {recorder.interval:g}s")
+        if not times:
+            result.append("  (no samples yet)")
+            result.append("")
+            continue
+        result.append(f"  {'Metric':<8} {'Min':>10} {'Avg':>10} {'Max':>10} {'Last':>10}  History")
+        for metric, values in series.items():
+            show = formats[metric]
+            result.append(f"  {metric:<8} {show(min(values)):>10} {show(sum(values) / len(values)):>10} "
+                          f"{show(max(values)):>10} {show(values[-1]):>10}  {_sparkline(values)}")
+        result.append("")
+    return "\n".join(result).rstrip()
+
+def export_recording(pid, filepath, format=None):
+    """
+    Write the samples recorded for a process to a CSV or JSON file.
+    Args:
+        pid: Process ID whose recording to export
+        filepath: Output file path
+        format: 'csv' or 'json' (default: from the file extension, else csv)
+    Returns:
+        Success or error message
+    """
+    import csv
+    if pid is None:
+        return "Error: pid must be a number"
+    recorders, error = _selected_recorders(pid)
+    if error:
+        return error
+    recorder = recorders[0]
+    format = (format or os.path.splitext(filepath)[1].lstrip('.') or 'csv').lower()
+    if format not in ('csv', 'json'):
+        return f"Error: Unsupported export format '{format}'. Use csv or json."
+
+    try:
+        times, series = recorder.snapshot()
+        metrics = list(series)
+        # CPU is stored as float32; round away the representation noise
+        series['cpu'] = [round(value, 2) for value in series['cpu']]
+        if format == 'json':
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump({'pid': recorder.pid, 'name': recorder.name, 'interval': recorder.interval,
+                           'samples': [dict(time=t, **{m: series[m][i] for m in metrics}) for i, t in enumerate(times)]},
+                          f, indent=2)
+        else:
+            with open(filepath, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['time'] + metrics)
+                for i, t in enumerate(times):
+                    writer.writerow([datetime.datetime.fromtimestamp(t).isoformat(timespec='milliseconds')]
+                                    + [series[m][i] for m in metrics])
+        return f"Exported {len(times)} samples of process {recorder.pid} to {filepath}"
+    except Exception as e:
+        return f"Error exporting recording: {str(e)}"
+
 # Example usage
 if __name__ == "__main__":
     res=find_text_in_files("example", directory=".", file_pattern="*.txt", recursive=True, case_sensitive=False, whole_word=False, line_numbers=True)
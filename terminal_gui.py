@@ -1,8 +1,9 @@
 import tkinter as tk
 from tkinter import scrolledtext, ttk, font
-from threading import Thread, Event
+from threading import Thread, Event, Lock
 import datetime
 import os
+import re
 import crud_cmd
 import psutil
 
@@ -26,6 +27,11 @@ class TerminalGUI:
         self.stop_event = Event()
         self.current_process = None
         
+        # Output produced by streaming commands, flushed to the widget in batches
+        self.output_lock = Lock()
+        self.pending_output = []
+        self.flush_scheduled = False
+        
         # Configure styles
         self.configure_styles()
         
@@ -113,6 +119,10 @@ class TerminalGUI:
         self.execute_btn = ttk.Button(button_frame, text="Execute", command=self.execute_command)
         self.execute_btn.pack(side=tk.LEFT, padx=(0, 5))
         
+        # Stop button
+        self.stop_btn = ttk.Button(button_frame, text="Stop", command=self.kill_command)
+        self.stop_btn.pack(side=tk.LEFT, padx=(0, 5))
+        
         # Clear button
         self.clear_btn = ttk.Button(button_frame, text="Clear", command=self.clear_output)
         self.clear_btn.pack(side=tk.LEFT)
@@ -152,6 +162,9 @@ class TerminalGUI:
         # Add Ctrl+l to clear the output
         self.root.bind("<Control-l>", lambda e: self.clear_output())
         
+        # Add Escape to stop the running command
+        self.root.bind("<Escape>", lambda e: self.kill_command())
+        
     def execute_command(self, event=None):
         """Execute the command from the entry field"""
         command = self.command_entry.get().strip()
@@ -174,6 +187,7 @@ class TerminalGUI:
         self.update_output(f"\n[{timestamp}] > {command}\n")
         
         # Execute in separate thread to keep GUI responsive
+        self.stop_event.clear()
         self.current_command_thread = Thread(target=self.process_command, args=(command,))
         self.current_command_thread.start()
         self.command_running = True
@@ -191,12 +205,40 @@ class TerminalGUI:
             cmd = command_parts[0].lower() if command_parts else ""
             args = command_parts[1] if len(command_parts) > 1 else ""
             
+            # Long-running commands return a line generator instead of a result string
+            stream = None
+            # Refreshing displays (top) return a generator of frames that are redrawn in place
+            live = None
+            
             match cmd:
                 case "list" | "ls" | "dir" | "directory" | "Show":
-                    if not args:
-                        result = crud_cmd.list_directory()
+                    # Named parameters select sorting/paging; everything else is the directory
+                    directory_parts = []
+                    options = {}
+                    for arg in args.split():
+                        name, _, value = arg.partition("=")
+                        if value and name.lower() in ("sort", "limit", "offset", "reverse", "hidden", "format"):
+                            options[name.lower()] = value
+                        else:
+                            directory_parts.append(arg)
+                    directory = " ".join(directory_parts) or "."
+                    include_hidden = options.get("hidden", "").lower() in ("true", "yes", "1")
+                    if "sort" in options or "limit" in options or "offset" in options or "format" in options:
+                        try:
+                            result = crud_cmd.list_directory(
+                                directory,
+                                include_hidden=include_hidden,
+                                sort_by=options.get("sort", "").lower() or None,
+                                reverse=options.get("reverse", "").lower() in ("true", "yes", "1"),
+                                limit=int(options["limit"]) if "limit" in options else None,
+                                offset=int(options.get("offset", 0)),
+                                format=options.get("format", "text").lower()
+                            )
+                        except ValueError:
+                            result = "Error: limit and offset must be integers"
                     else:
-                        result = crud_cmd.list_directory(args)
+                        # Unsorted listings stream so huge directories show their first rows at once
+                        stream = crud_cmd.list_directory_stream(directory, include_hidden=include_hidden)
                 
                 case "find" | "search":
                     if not args:
@@ -208,19 +250,71 @@ class TerminalGUI:
                         if len(pattern_parts) > 1:
                             directory = pattern_parts[0]
                             pattern = pattern_parts[1]
-                        result = crud_cmd.find_files(directory, pattern)
+                        stream = crud_cmd.find_files_stream(directory, pattern)
                 
                 case "read":
+                    parts = args.rsplit(maxsplit=1)
                     if not args:
                         result = "Error: Please specify a file to read"
+                    elif len(parts) == 2 and re.fullmatch(r"\d+-\d+", parts[1]) and not os.path.exists(args):
+                        # Trailing start-end selects a line range
+                        start, end = parts[1].split("-")
+                        result = crud_cmd.read_file(parts[0], line_numbers=(int(start), int(end)))
                     else:
                         result = crud_cmd.read_file(args)
                 
-                case "tree" | "structure":
+                case "follow" | "tail" if cmd == "follow" or args.split(maxsplit=1)[:1] == ["-f"]:
+                    if cmd == "tail":
+                        # tail -f file [lines] is an alias for follow
+                        args = args[2:].strip()
+                    parts = args.rsplit(maxsplit=1)
+                    if not args:
+                        result = "Error: Please specify a file to follow"
+                    else:
+                        filepath, count = args, 10
+                        if len(parts) == 2 and parts[1].isdigit() and not os.path.exists(args):
+                            filepath, count = parts[0], int(parts[1])
+                        stream = crud_cmd.follow_file_stream(filepath, count, stop_event=self.stop_event)
+                
+                case "head" | "tail":
+                    parts = args.rsplit(maxsplit=1)
                     if not args:
-                        result = crud_cmd.list_subdirectories(".", recursive=True)
+                        result = f"Error: Please specify a file for {cmd}"
                     else:
-                        result = crud_cmd.list_subdirectories(args, recursive=True)
+                        filepath, count = args, 10
+                        if len(parts) == 2 and parts[1].isdigit() and not os.path.exists(args):
+                            filepath, count = parts[0], int(parts[1])
+                        if cmd == "head":
+                            result = crud_cmd.read_file_head(filepath, count)
+                        else:
+                            result = crud_cmd.read_file_tail(filepath, count)
+                
+                case "tree" | "structure":
+                    # Named parameters select the parallel walker; everything else is the directory
+                    directory_parts = []
+                    options = {}
+                    for arg in args.split():
+                        name, _, value = arg.partition("=")
+                        if value and name.lower() in ("depth", "exclude", "links", "summary"):
+                            options[name.lower()] = value
+                        else:
+                            directory_parts.append(arg)
+                    directory = " ".join(directory_parts) or "."
+                    try:
+                        max_depth = int(options["depth"]) if "depth" in options else None
+                        exclude = [p for p in options.get("exclude", "").split(",") if p]
+                        follow_symlinks = options.get("links", "").lower() in ("true", "yes", "1")
+                        if options.get("summary", "").lower() in ("true", "yes", "1"):
+                            result = crud_cmd.summarize_tree(directory, max_depth, exclude, follow_symlinks)
+                        elif options:
+                            if not os.path.isdir(directory):
+                                result = f"Error: Directory '{directory}' does not exist"
+                            else:
+                                stream = crud_cmd.list_subdirectories_stream(directory, max_depth, exclude, follow_symlinks)
+                        else:
+                            result = crud_cmd.list_subdirectories(directory, recursive=True)
+                    except ValueError:
+                        result = "Error: depth must be an integer"
                 
                 case "disk" | "storage":
                     if not args:
@@ -228,25 +322,108 @@ class TerminalGUI:
                     else:
                         result = crud_cmd.get_disk_usage(args)
                 
+                case "du" | "usage":
+                    options = {}
+                    directory_parts = []
+                    for arg in args.split():
+                        name, sep, value = arg.partition("=")
+                        if sep and name.lower() in ("top", "apparent", "workers", "verify"):
+                            options[name.lower()] = value
+                        else:
+                            directory_parts.append(arg)
+                    try:
+                        stream = crud_cmd.disk_usage_stream(
+                            " ".join(directory_parts) or ".",
+                            top=int(options.get("top", crud_cmd.DU_TOP)),
+                            apparent=options.get("apparent", "").lower() in ("true", "yes", "1"),
+                            max_workers=int(options["workers"]) if options.get("workers") else None,
+                            stop_event=self.stop_event,
+                            verify=options.get("verify", "").lower() in ("true", "yes", "1")
+                        )
+                    except ValueError:
+                        result = "Error: top and workers must be integers"
+                
                 case "sysinfo" | "system":
-                    result = crud_cmd.get_system_info()
+                    # Optional section names plus the "json" and "refresh" flags
+                    words = [word.lower() for word in args.split()]
+                    sections = [word for word in words if word not in ("json", "refresh")]
+                    result = crud_cmd.get_system_info(
+                        sections,
+                        format="json" if "json" in words else "text",
+                        refresh="refresh" in words
+                    )
                 
                 case "network":
-                    result = crud_cmd.get_network_interfaces()
+                    result = crud_cmd.get_network_interfaces("json" if args.strip().lower() == "json" else "text")
+                
+                case "netstat" | "bandwidth":
+                    options = {}
+                    for arg in args.split():
+                        name, _, value = arg.partition("=")
+                        options[name.lower()] = value
+                    try:
+                        interval = float(options.get("interval", crud_cmd.NETSTAT_INTERVAL))
+                        interfaces = [name for name in options.get("iface", "").split(",") if name] or None
+                        include_idle = "active" not in options
+                        if "once" in options:
+                            result = crud_cmd.network_throughput(interval, interfaces, include_idle)
+                        else:
+                            live = crud_cmd.netstat_stream(interval, interfaces, include_idle, stop_event=self.stop_event)
+                    except ValueError:
+                        result = "Error: interval must be a number"
                 
                 case "ping":
-                    if not args:
+                    # host [count] followed by named parameters or the "monitor" flag
+                    options = {}
+                    positional = []
+                    for arg in args.split():
+                        name, sep, value = arg.partition("=")
+                        if sep and name.lower() in ("count", "interval", "timeout", "method", "port"):
+                            options[name.lower()] = value
+                        elif arg.lower() == "monitor":
+                            options["monitor"] = True
+                        else:
+                            positional.append(arg)
+                    if not positional:
                         result = "Error: Please specify a host to ping"
                     else:
-                        result = crud_cmd.ping_host(args)
+                        try:
+                            count = int(positional[1]) if len(positional) > 1 else int(options.get("count", 4))
+                            stream = crud_cmd.ping_host_stream(
+                                positional[0],
+                                count=count,
+                                interval=float(options.get("interval", crud_cmd.PING_INTERVAL)),
+                                timeout=float(options.get("timeout", crud_cmd.PING_TIMEOUT)),
+                                method=options.get("method", "auto").lower(),
+                                tcp_port=int(options.get("port", crud_cmd.PING_TCP_PORT)),
+                                monitor=options.get("monitor", False),
+                                stop_event=self.stop_event
+                            )
+                        except ValueError:
+                            result = "Error: count, interval, timeout and port must be numbers"
                 
                 case "copy":
-                    parts = args.split(maxsplit=1)
+                    # Trailing named parameters tune bulk copies
+                    options = {}
+                    parts = args.split()
+                    while parts and parts[-1].partition("=")[0].lower() in ("skip", "workers") and "=" in parts[-1]:
+                        name, _, value = parts.pop().partition("=")
+                        options[name.lower()] = value
+                    parts = " ".join(parts).split(maxsplit=1)
                     if len(parts) != 2:
                         result = "Error: Please specify source and destination"
                     else:
                         source, destination = parts
-                        result = crud_cmd.copy_file(source, destination)
+                        try:
+                            result = crud_cmd.copy_file(
+                                source,
+                                destination,
+                                skip_identical=options.get("skip", "").lower() in ("true", "yes", "1"),
+                                max_workers=int(options.get("workers", crud_cmd.COPY_WORKERS)),
+                                progress=lambda message: self.root.after(0, self.status_var.set, message)
+                            )
+                        except ValueError:
+                            result = "Error: workers must be an integer"
                 
                 case "open":
                     parts = args.split(maxsplit=1)
@@ -303,71 +480,183 @@ class TerminalGUI:
                         host, port, timeout = parts
                         result = crud_cmd.telnet(host, port, int(timeout))
                 
+                case "check" | "connectivity":
+                    words = args.split()
+                    options = {}
+                    targets = []
+                    for word in words:
+                        name, sep, value = word.partition("=")
+                        if sep and name.lower() in ("port", "timeout", "concurrency", "format"):
+                            options[name.lower()] = value
+                        else:
+                            targets.append(word)
+                    if not targets:
+                        result = "Error: Please specify host:port targets or @targetsfile"
+                    else:
+                        try:
+                            result = crud_cmd.check_connectivity(
+                                ",".join(targets),
+                                port=int(options.get("port", 23)),
+                                timeout=float(options.get("timeout", 3)),
+                                concurrency=int(options.get("concurrency", crud_cmd.DEFAULT_SCAN_CONCURRENCY)),
+                                format=options.get("format", "text").lower()
+                            )
+                        except ValueError:
+                            result = "Error: port, timeout and concurrency must be numbers"
+                
                 case "traceroute" | "trace":
-                    if not args:
+                    options = {}
+                    positional = []
+                    for arg in args.split():
+                        name, sep, value = arg.partition("=")
+                        if sep and name.lower() in ("mode", "port", "hops", "probes", "timeout", "names"):
+                            options[name.lower()] = value
+                        else:
+                            positional.append(arg)
+                    if not positional:
                         result = "Error: Please specify a host to trace"
                     else:
-                        result = crud_cmd.traceroute(args)
+                        try:
+                            stream = crud_cmd.traceroute_stream(
+                                positional[0],
+                                mode=options.get("mode", "udp").lower(),
+                                max_hops=int(options.get("hops", crud_cmd.TRACE_MAX_HOPS)),
+                                probes=int(options.get("probes", crud_cmd.TRACE_PROBES)),
+                                timeout=float(options.get("timeout", crud_cmd.TRACE_TIMEOUT)),
+                                port=int(options["port"]) if options.get("port") else None,
+                                resolve_names=options.get("names", "").lower() in ("true", "yes", "1"),
+                                stop_event=self.stop_event
+                            )
+                        except ValueError:
+                            result = "Error: hops, probes, timeout and port must be numbers"
                 
                 case "scan" | "ports" | "scanports":
-                    parts = args.split(maxsplit=3)
                     if not args:
                         result = "Error: Please specify a host to scan"
-                    elif len(parts) == 1:
-                        # Scan host with default ports (1-1024)
-                        result = crud_cmd.scan_ports(parts[0])
-                    elif len(parts) == 2:
-                        # Scan with start port
-                        host, start_port = parts
-                        try:
-                            start_port = int(start_port)
-                            result = crud_cmd.scan_ports(host, start_port=start_port)
-                        except ValueError:
-                            result = "Error: Port must be an integer"
-                    elif len(parts) == 3:
-                        # Scan with start and end ports
-                        host, start_port, end_port = parts
-                        try:
-                            start_port = int(start_port)
-                            end_port = int(end_port)
-                            result = crud_cmd.scan_ports(host, start_port=start_port, end_port=end_port)
-                        except ValueError:
-                            result = "Error: Ports must be integers"
                     else:
-                        # Scan with start, end ports and timeout
-                        host, start_port, end_port, timeout = parts
+                        # Separate named parameters from positional host/port/timeout values
+                        positional = []
+                        options = {}
+                        for arg in args.split():
+                            if arg.lower().startswith("concurrency="):
+                                options["concurrency"] = arg.split("=")[1]
+                            elif arg.lower().startswith("rate="):
+                                options["rate_limit"] = arg.split("=")[1]
+                            elif arg.lower().startswith("ports="):
+                                options["ports"] = arg.split("=")[1]
+                            elif arg.lower().startswith("format="):
+                                options["format"] = arg.split("=")[1].lower()
+                            else:
+                                positional.append(arg)
                         try:
-                            start_port = int(start_port)
-                            end_port = int(end_port)
-                            timeout = float(timeout)
-                            result = crud_cmd.scan_ports(host, start_port=start_port, end_port=end_port, timeout=timeout)
-                        except ValueError:
+                            kwargs = {}
+                            if "concurrency" in options:
+                                kwargs["concurrency"] = int(options["concurrency"])
+                            if "rate_limit" in options:
+                                kwargs["rate_limit"] = float(options["rate_limit"])
+                            if "ports" in options:
+                                # Explicit port list: scan as a host x port table
+                                if len(positional) > 1:
+                                    kwargs["timeout"] = float(positional[1])
+                                result = crud_cmd.sweep_ports(positional[0], options["ports"],
+                                                              format=options.get("format", "text"), **kwargs)
+                            else:
+                                if len(positional) > 1:
+                                    kwargs["start_port"] = int(positional[1])
+                                if len(positional) > 2:
+                                    kwargs["end_port"] = int(positional[2])
+                                if len(positional) > 3:
+                                    kwargs["timeout"] = float(positional[3])
+                                if "format" in options:
+                                    # Structured output is rendered once the scan completes
+                                    result = crud_cmd.scan_ports(positional[0], format=options["format"], **kwargs)
+                                else:
+                                    stream = crud_cmd.scan_ports_stream(positional[0], stop_event=self.stop_event, **kwargs)
+                        except (ValueError, IndexError):
                             result = "Error: Invalid parameters"
                 
+                case "top":
+                    options = {}
+                    for arg in args.split():
+                        name, _, value = arg.partition("=")
+                        options[name.lower()] = value
+                    try:
+                        sort_by = options.get("sort", "cpu").lower()
+                        limit = int(options.get("n", 20))
+                        interval = float(options.get("interval", crud_cmd.TOP_INTERVAL))
+                        if "once" in options:
+                            result = crud_cmd.top_processes(sort_by, limit, options.get("name"), options.get("user"))
+                        else:
+                            live = crud_cmd.top_stream(sort_by, limit, options.get("name"), options.get("user"),
+                                                       interval, stop_event=self.stop_event)
+                    except ValueError:
+                        result = "Error: n and interval must be numbers"
+                
+                case "record":
+                    # record <pid> | record stop [pid] | record show [pid] | record export <pid> <file> [format=json]
+                    parts = args.split()
+                    options = {}
+                    while parts and "=" in parts[-1]:
+                        name, _, value = parts.pop().partition("=")
+                        options[name.lower()] = value
+                    action = parts[0].lower() if parts else "show"
+                    try:
+                        if action == "stop":
+                            result = crud_cmd.stop_recording(parts[1] if len(parts) > 1 else None)
+                        elif action == "show":
+                            result = crud_cmd.recording_report(parts[1] if len(parts) > 1 else None)
+                        elif action == "export":
+                            if len(parts) < 3:
+                                result = "Error: Usage: record export <pid> <file> [format=csv|json]"
+                            else:
+                                result = crud_cmd.export_recording(parts[1], " ".join(parts[2:]), options.get("format"))
+                        else:
+                            result = crud_cmd.start_recording(
+                                parts[0],
+                                interval=float(options.get("interval", crud_cmd.RECORD_INTERVAL)),
+                                capacity=int(options.get("samples", crud_cmd.RECORD_CAPACITY))
+                            )
+                    except ValueError:
+                        result = "Error: pid, interval and samples must be numbers"
+                
                 case "processes" | "ps" | "tasklist":
-                    result = crud_cmd.list_processes()
+                    # "ps json", "ps csv" or "ps format=json" return structured rows
+                    output_format = args.strip().lower().removeprefix("format=") or "text"
+                    result = crud_cmd.list_processes(format=output_format)
                 
                 case "get" | "http_get":
+                    # A trailing "nocache" bypasses the HTTP response cache; "json" or "csv" selects the format
+                    use_cache = True
+                    output_format = "text"
+                    while args.lower().endswith((" nocache", " json", " csv")):
+                        args, _, flag = args.rpartition(" ")
+                        args = args.rstrip()
+                        if flag.lower() == "nocache":
+                            use_cache = False
+                        else:
+                            output_format = flag.lower()
                     parts = args.split(maxsplit=3)
                     if not args:
                         result = "Error: Please specify a URL for the GET request"
                     elif len(parts) == 1:
                         # Simple GET request with just URL
-                        result = crud_cmd.http_get_request(parts[0])
+                        result = crud_cmd.http_get_request(parts[0], use_cache=use_cache, format=output_format)
                     elif len(parts) == 2:
                         # GET request with URL and params
                         url, params = parts
-                        result = crud_cmd.http_get_request(url, params=params)
+                        result = crud_cmd.http_get_request(url, params=params, use_cache=use_cache, format=output_format)
                     elif len(parts) == 3:
                         # GET request with URL, params, and headers
                         url, params, headers = parts
-                        result = crud_cmd.http_get_request(url, params=params, headers=headers)
+                        result = crud_cmd.http_get_request(url, params=params, headers=headers, use_cache=use_cache,
+                                                           format=output_format)
                     else:
                         # GET request with URL, params, headers, and timeout
                         url, params, headers, timeout = parts
                         try:
                             timeout = int(timeout)
-                            result = crud_cmd.http_get_request(url, params=params, headers=headers, timeout=timeout)
+                            result = crud_cmd.http_get_request(url, params=params, headers=headers, timeout=timeout,
+                                                               use_cache=use_cache, format=output_format)
                         except ValueError:
                             result = "Error: Timeout must be an integer value in seconds"
                 
@@ -403,6 +692,95 @@ class TerminalGUI:
                         except ValueError:
                             result = "Error: Timeout must be an integer value in seconds"
                 
+                case "download" | "wget":
+                    # Named parameters may appear anywhere after the URL
+                    options = {}
+                    positional = []
+                    for arg in args.split():
+                        name, sep, value = arg.partition("=")
+                        if sep and name.lower() in ("segments", "resume", "headers", "timeout"):
+                            options[name.lower()] = value
+                        else:
+                            positional.append(arg)
+                    if not positional:
+                        result = "Error: Please specify a URL to download"
+                    else:
+                        try:
+                            result = crud_cmd.download_file(
+                                positional[0],
+                                destination=" ".join(positional[1:]) or None,
+                                segments=int(options.get("segments", crud_cmd.DOWNLOAD_SEGMENTS)),
+                                resume=options.get("resume", "true").lower() not in ("false", "no", "0"),
+                                headers=options.get("headers"),
+                                timeout=float(options.get("timeout", 30)),
+                                progress=lambda message: self.root.after(0, self.status_var.set, message),
+                                stop_event=self.stop_event
+                            )
+                        except ValueError:
+                            result = "Error: segments and timeout must be numbers"
+                
+                case "bench" | "http_bench":
+                    parts = args.split()
+                    if not parts:
+                        result = "Error: Please specify a URL to benchmark"
+                    else:
+                        url = parts[0]
+                        options = {}
+                        for arg in parts[1:]:
+                            name, _, value = arg.partition("=")
+                            options[name.lower()] = value
+                        try:
+                            result = crud_cmd.http_benchmark(
+                                url,
+                                requests_count=int(options.get("n", 100)),
+                                concurrency=int(options.get("c", 10)),
+                                rate=float(options["rate"]) if options.get("rate") else None,
+                                method=options.get("method", "GET"),
+                                data=options.get("data"),
+                                headers=options.get("headers"),
+                                timeout=float(options.get("timeout", 30))
+                            )
+                        except ValueError:
+                            result = "Error: n, c, rate and timeout must be numbers"
+                
+                case "sessions" | "http_sessions":
+                    if not args:
+                        result = crud_cmd.get_http_session_stats()
+                    else:
+                        options = dict(arg.partition("=")[::2] for arg in args.split())
+                        try:
+                            result = crud_cmd.configure_http_sessions(
+                                pool_size=options.get("pool"),
+                                retries=options.get("retries"),
+                                backoff_factor=options.get("backoff"),
+                                idle_timeout=options.get("idle")
+                            )
+                        except ValueError:
+                            result = "Error: Invalid session settings"
+                
+                case "httpcache" | "http_cache":
+                    if args.strip().lower() == "clear":
+                        result = crud_cmd.clear_http_cache()
+                    else:
+                        result = crud_cmd.get_http_cache_stats()
+                
+                case "dns" | "resolve":
+                    words = args.split()
+                    options = dict(word.partition("=")[::2] for word in words if "=" in word)
+                    hosts = [word for word in words if "=" not in word]
+                    if hosts == ["clear"]:
+                        result = crud_cmd.configure_dns_cache(clear=True)
+                    elif hosts:
+                        result = crud_cmd.resolve_hosts(",".join(hosts))
+                    else:
+                        try:
+                            result = crud_cmd.configure_dns_cache(
+                                ttl=options.get("ttl"),
+                                negative_ttl=options.get("negative")
+                            )
+                        except ValueError:
+                            result = "Error: ttl and negative must be numbers"
+                
                 case "findstr" | "searchtext" | "findtext" | "grep":
                     if not args:
                         result = "Error: Please provide search text and optional parameters"
@@ -415,6 +793,8 @@ class TerminalGUI:
                         recursive = False
                         case_sensitive = False
                         whole_word = False
+                        regex = False
+                        use_index = False
                         
                         # Process remaining arguments
                         for i in range(1, len(parts)):
@@ -427,6 +807,10 @@ class TerminalGUI:
                                 case_sensitive = arg.split("=")[1].lower() in ("true", "yes", "1")
                             elif arg.lower().startswith("whole_word="):
                                 whole_word = arg.split("=")[1].lower() in ("true", "yes", "1")
+                            elif arg.lower().startswith("index="):
+                                use_index = arg.split("=")[1].lower() in ("true", "yes", "1")
+                            elif arg.lower().startswith("regex="):
+                                regex = arg.split("=")[1].lower() in ("true", "yes", "1")
                             elif arg.lower().startswith("pattern="):
                                 file_pattern = arg.split("=")[1]
                             # If not a named parameter, check if it's a directory or file pattern
@@ -439,15 +823,23 @@ class TerminalGUI:
                                 directory = arg
                         
                         # Call the function with all parameters
-                        result = crud_cmd.find_text_in_files(
+                        stream = crud_cmd.find_text_in_files_stream(
                             text, 
                             directory=directory,
                             file_pattern=file_pattern,
                             recursive=recursive,
                             case_sensitive=case_sensitive,
-                            whole_word=whole_word
+                            whole_word=whole_word,
+                            regex=regex,
+                            use_index=use_index
                         )
                 
+                case "catalog":
+                    result = crud_cmd.refresh_file_catalog(args or ".")
+                
+                case "index":
+                    result = crud_cmd.build_text_index(args or ".")
+                
                 case "kill":
                     if not args:
                         result = "Error: Please specify a process ID to kill"
@@ -461,39 +853,95 @@ class TerminalGUI:
                 case "help":
                     result = """Available commands:
 list/ls/dir/directory/show [directory] - List files in directory
+  Named parameters:
+  - sort=name|size|mtime|type - Sort entries (reverse=true for descending)
+  - limit=100 offset=0 - Show one page of a large directory
+  - hidden=true - Include hidden files
+  - format=json|csv - Return structured rows instead of text
+  Example: ls /var/spool sort=mtime reverse=true limit=50
 find/search [directory] pattern - Find files matching pattern
 findstr/searchtext/findtext/grep text [dir] [pattern] - Search text in files
   Named parameters:
   - recursive=true - Search in subdirectories
   - case_sensitive=true - Case-sensitive search
   - whole_word=true - Match whole words only
-  - pattern=*.py - Specify file pattern to search
+  - regex=true - Treat text as a regular expression
+  - index=true - Use the directory's trigram index (see the index command)
+  - pattern=*.py - Specify file pattern to search (several: pattern=*.py;*.txt)
   Example: findstr import . *.py
   Example with params: findstr lysi recursive=true pattern=*.py
-read filename - Read file contents
+catalog [directory] - Build or revalidate the filename catalog used by find and tree
+index [directory] - Build or refresh the trigram index used by findstr index=true (checks every file)
+read filename [start-end] - Read file contents, or only lines start to end
+head filename [count] - Show the first lines of a file (default: 10)
+tail filename [count] - Show the last lines of a file (default: 10)
+follow/tail -f filename [count] - Show new lines as they are appended (Stop or Escape to end)
 tree/structure [directory] - Show directory structure recursively
+  Named parameters:
+  - depth=2 - Limit the number of levels shown
+  - exclude=.git,node_modules - Skip names matching these patterns
+  - links=true - Follow symlinked directories (loops are detected)
+  - summary=true - Show file counts and sizes per directory
+  Example: tree /mnt/share depth=3 exclude=.git summary=true
 disk/storage [path] - Show disk usage information
-sysinfo/system - Show system information
-network - Show network interfaces
-ping host - Ping a host
-copy source destination - Copy a file from source to destination
+du/usage [directory] [top=10] [apparent=true] [workers=N] [verify=true] - Find the largest directories and files
+sysinfo/system [disks] [users] [sensors] [details] [all] [json] [refresh] - Show system information
+network [json] - Show network interfaces, addresses, link state and counters
+netstat/bandwidth [interval=1] [iface=eth0,wlan0] [active] [once] - Live per-interface throughput
+ping host [count] [interval=1] [timeout=1] [method=auto|icmp|tcp] [port=80] [monitor]
+  - Ping one or many hosts concurrently; host may be a CIDR range, list or @hostsfile
+  - monitor keeps pinging until stopped and reports hosts going up or down
+copy source destination - Copy a file, directory or glob (e.g. logs/*.log) to destination
+  Named parameters:
+  - skip=true - Skip files whose copy has the same size and modification time
+  - workers=8 - Number of files copied at once
 open filename [application] - Open file with default or specified application
 cd/chdir/changedir [directory] - Change current directory
 pwd/cwd - Show current working directory
 whoami/user/userinfo - Show username and computer name
 create filename [content] - Create a new file with optional content
-telnet host [port] [timeout] - Connect to host via telnet
-traceroute/trace host - Trace route to host
+telnet host[:port] [port] [timeout] - Connect to host via telnet (host may be a CIDR range, list or @hostsfile)
+check/connectivity host:port,host:port|@targetsfile [port=23] [timeout=3] [concurrency=500] [format=json|csv]
+  - Connect to every target at once; shows connect latency and error class (refused, timeout, ...)
+traceroute/trace host [mode=udp|tcp] [port=N] [hops=30] [probes=3] [timeout=2] [names=true]
+  - Trace route to host, probing all hops at once
 scan/ports/scanports host [start_port] [end_port] [timeout] - Scan ports on a host
-processes/ps/tasklist - List running processes
-get/http_get url [params] [headers] [timeout] - Send HTTP GET request
+  Named parameters:
+  - concurrency=500 - Maximum simultaneous connection attempts
+  - rate=1000 - Maximum connection attempts per host per second
+  - ports=22,80,8000-8100 - Scan a port list and show a host x port table
+  - format=json|csv - Return structured rows of open ports
+  Hosts may be a CIDR range, a comma-separated list or @hostsfile
+  Example: scan 127.0.0.1 1 65535 0.5 concurrency=1000
+  Example: scan 10.0.0.0/24 ports=22,80,443
+processes/ps/tasklist [json|csv] - List running processes
+top [sort=cpu|rss|io|threads|pid|name] [n=20] [name=pattern] [user=name] [interval=2] [once]
+  - Live process monitor refreshed in place until stopped; once prints a single table
+record pid [interval=1] [samples=600] - Record a process's CPU, RSS, open files and threads in the background
+record show [pid] - Show min/avg/max and sparklines of recordings
+record stop [pid] - Stop recording one or all processes
+record export pid file [format=csv|json] - Export recorded samples
+get/http_get url [params] [headers] [timeout] [nocache] [json|csv] - Send HTTP GET request (cached per Cache-Control)
 post/http_post url [data] [headers] [timeout] - Send HTTP POST request
+download/wget url [destination] [segments=4] [resume=false] [headers=...] [timeout=30]
+  - Save a URL to disk; large files use parallel Range requests, partial downloads resume
+bench/http_bench url [n=100] [c=10] [rate=50] [method=post] [data=...] [headers=...] [timeout=30]
+  - Load-test an endpoint: throughput, latency percentiles, status codes and errors
+sessions [pool=10] [retries=3] [backoff=0.3] [idle=300] - Show or configure pooled HTTP sessions
+httpcache [clear] - Show HTTP cache statistics or empty the cache
+dns [host,host|@hostsfile] [clear] [ttl=300] [negative=30] - Resolve hosts in bulk, or show/configure the shared DNS cache
 kill pid - Kill a process by its ID
 help - Show this help message"""
                 
                 case _:
                     result = f"Unknown command: {cmd}. Type 'help' for available commands."
             
+            # Forward streamed output to the widget as it is produced
+            if stream is not None:
+                result = self.stream_output(stream)
+            elif live is not None:
+                result = self.live_output(live)
+            
             # Log the result
             with open(log_file, "w", encoding="utf-8") as f:
                 f.write(f"Command: {command}\n")
@@ -501,7 +949,8 @@ help - Show this help message"""
                 f.write(f"Result:\n{result}\n")
             
             # Update UI with the result
-            self.root.after(0, self.update_output, f"{result}\n")
+            if stream is None and live is None:
+                self.root.after(0, self.update_output, f"{result}\n")
             self.root.after(0, self.status_var.set, f"Ready - Command completed in {(datetime.datetime.now() - start_time).total_seconds():.2f}s")
             
         except Exception as e:
@@ -516,6 +965,82 @@ help - Show this help message"""
         finally:
             self.command_running = False
     
+    def stream_output(self, lines):
+        """Forward lines from a generator to the output widget while they are produced.
+        Returns the complete output for logging."""
+        collected = []
+        try:
+            for line in lines:
+                collected.append(line)
+                self.queue_output(f"{line}\n")
+                if self.stop_event.is_set():
+                    break
+        finally:
+            lines.close()
+        if self.stop_event.is_set():
+            collected.append("Command stopped.")
+            self.queue_output("Command stopped.\n")
+        return "\n".join(collected)
+    
+    def live_output(self, frames):
+        """Show frames from a generator in place, rewriting only the lines that changed.
+        Returns the last frame for logging."""
+        previous = []
+        self.root.after(0, self.start_live_region)
+        try:
+            for frame in frames:
+                changes = [(i, line) for i, line in enumerate(frame) if i >= len(previous) or previous[i] != line]
+                if changes or len(frame) != len(previous):
+                    self.root.after(0, self.apply_live_frame, changes, len(frame))
+                previous = frame
+                if self.stop_event.is_set():
+                    break
+        finally:
+            frames.close()
+        if self.stop_event.is_set():
+            self.queue_output("Command stopped.\n")
+        return "\n".join(previous)
+    
+    def start_live_region(self):
+        """Mark the end of the output as the start of an in-place display"""
+        self.flush_output()
+        self.output_text.mark_set("live_start", "end-1c")
+        self.output_text.mark_gravity("live_start", tk.LEFT)
+        self.live_lines = 0
+    
+    def apply_live_frame(self, changes, length):
+        """Replace changed lines of the in-place display, appending or trimming lines as needed"""
+        text = self.output_text
+        first = int(text.index("live_start").split(".")[0])
+        for i, line in changes:
+            if i < self.live_lines:
+                text.delete(f"{first + i}.0", f"{first + i}.end")
+                text.insert(f"{first + i}.0", line)
+            else:
+                text.insert("end-1c", f"{line}\n")
+        if length < self.live_lines:
+            text.delete(f"{first + length}.0", f"{first + self.live_lines}.0")
+        self.live_lines = length
+        text.see(tk.END)
+    
+    def queue_output(self, text):
+        """Queue text for the output widget from a worker thread, batching rapid updates"""
+        with self.output_lock:
+            self.pending_output.append(text)
+            if self.flush_scheduled:
+                return
+            self.flush_scheduled = True
+        self.root.after(50, self.flush_output)
+    
+    def flush_output(self):
+        """Write all queued output to the widget in a single insert"""
+        with self.output_lock:
+            text = "".join(self.pending_output)
+            self.pending_output.clear()
+            self.flush_scheduled = False
+        if text:
+            self.update_output(text)
+    
     def update_output(self, text):
         """Update the output text widget"""
         self.output_text.config(state=tk.NORMAL)
@@ -554,12 +1079,16 @@ help - Show this help message"""
     
     def kill_command(self):
         """Kill the currently running command"""
-        if self.command_running and self.current_process:
-            try:
+        if not self.command_running:
+            return
+        self.stop_event.set()
+        self.status_var.set("Stopping command...")
+        try:
+            if self.current_process:
                 self.current_process.terminate()
-                self.update_output("Command terminated.\n")
-            except Exception as e:
-                self.update_output(f"Error terminating command: {str(e)}\n")
+            crud_cmd.stop_current_process()
+        except Exception as e:
+            self.update_output(f"Error terminating command: {str(e)}\n")
     
     def kill_process(self, pid):
         """Kill a process by its PID"""
@@ -0,0 +1,105 @@
+import http.server
+import os
+import socket
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crud_cmd
+
+
+class _StandInHandler(http.server.BaseHTTPRequestHandler):
+    """Keep-alive HTTP/1.1 handler that records each request's method, Host header and body"""
+
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status, body=b"ok"):
+        length = int(self.headers.get("Content-Length", 0))
+        received = self.rfile.read(length) if length else b""
+        self.server.seen.append((self.command, self.headers.get("Host"), received))
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply(404 if self.path == "/missing" else 200)
+
+    def do_POST(self):
+        self._reply(201)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StandInServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+
+def _start_server(address="127.0.0.1", family=socket.AF_INET):
+    server_class = type("Server", (_StandInServer,), {"address_family": family})
+    server = server_class((address, 0), _StandInHandler)
+    server.seen = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class HTTPBenchmarkTest(unittest.TestCase):
+    def setUp(self):
+        self.server = _start_server()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_get_requests_reuse_connections(self):
+        report = crud_cmd.http_benchmark(f"{self.base}/health", requests_count=40, concurrency=4)
+        self.assertIn("Requests: 40 (concurrency 4", report)
+        self.assertIn("Connections opened: 4", report)
+        self.assertIn("  200: 40", report)
+        self.assertIn("Errors: 0 (0.0%)", report)
+        self.assertEqual(len(self.server.seen), 40)
+        self.assertTrue(all(host == f"127.0.0.1:{self.server.server_address[1]}" for _, host, _ in self.server.seen))
+
+    def test_post_sends_json_body(self):
+        report = crud_cmd.http_benchmark(f"{self.base}/submit", requests_count=5, concurrency=2,
+                                         method="post", data='{"ping": 1}')
+        self.assertIn("  201: 5", report)
+        self.assertEqual({(method, body) for method, _, body in self.server.seen}, {("POST", b'{"ping": 1}')})
+
+    def test_status_breakdown_and_rate(self):
+        report = crud_cmd.http_benchmark(f"{self.base}/missing", requests_count=10, concurrency=2, rate=100)
+        self.assertIn("rate 100/s", report)
+        self.assertIn("  404: 10", report)
+
+    def test_connection_errors_are_counted(self):
+        with socket.socket() as unused:
+            unused.bind(("127.0.0.1", 0))
+            port = unused.getsockname()[1]
+        report = crud_cmd.http_benchmark(f"http://127.0.0.1:{port}/", requests_count=3, concurrency=1, timeout=2)
+        self.assertIn("Errors: 3 (100.0%)", report)
+        self.assertIn("ConnectionRefusedError: 3", report)
+
+
+@unittest.skipUnless(socket.has_ipv6, "IPv6 is not available")
+class HTTPBenchmarkIPv6Test(unittest.TestCase):
+    def test_ipv6_host_header_is_bracketed(self):
+        try:
+            server = _start_server("::1", socket.AF_INET6)
+        except OSError:
+            self.skipTest("cannot listen on ::1")
+        try:
+            port = server.server_address[1]
+            report = crud_cmd.http_benchmark(f"http://[::1]:{port}/", requests_count=2, concurrency=1)
+            self.assertIn("  200: 2", report)
+            self.assertEqual({host for _, host, _ in server.seen}, {f"[::1]:{port}"})
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()